@@ -0,0 +1,292 @@
+import json
+import base64
+import logging
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import select, func, and_, or_, false, exists
+from sqlalchemy.orm import selectinload, load_only
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from shared.database_models import AggregatedConcert, ConcertRecording
+from shared.projection import CONCERT_FIELDS, RECORDING_FIELDS
+
+logger = logging.getLogger(__name__)
+
+# Sort orders for concerts served from the ingested catalog. Every order ends
+# in the primary key so keyset cursors are unambiguous, and each one is backed
+# by an index in shared/database_models.py. (column, nullable)
+SORT_COLUMNS = {
+    "date": [(AggregatedConcert.date, False), (AggregatedConcert.id, False)],
+    "artist": [(AggregatedConcert.artist, False), (AggregatedConcert.date, False), (AggregatedConcert.id, False)],
+    "venue": [(AggregatedConcert.venue, True), (AggregatedConcert.date, False), (AggregatedConcert.id, False)],
+}
+
+class InvalidCursor(ValueError):
+    """Cursor is malformed or was issued for a different sort order"""
+
+def date_range_start(date_range: str) -> datetime:
+    """Start of a relative date range ('7d', '30d', '90d', '1y'; defaults to 30 days)"""
+    days = {'7d': 7, '30d': 30, '90d': 90, '1y': 365}.get(date_range, 30)
+    return datetime.utcnow() - timedelta(days=days)
+
+def encode_cursor(sort_by: str, sort_order: str, concert: AggregatedConcert) -> str:
+    """Opaque cursor holding the sort key of the last concert on a page"""
+    values = []
+    for column, _ in SORT_COLUMNS[sort_by]:
+        value = getattr(concert, column.key)
+        values.append(value.isoformat() if isinstance(value, datetime) else value)
+    payload = json.dumps({"s": sort_by, "o": sort_order, "v": values}, separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+def decode_cursor(cursor: str, sort_by: str, sort_order: str) -> List[Any]:
+    """Decode a cursor back into sort key values"""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()).decode())
+        values = payload["v"]
+    except Exception:
+        raise InvalidCursor("Malformed cursor")
+    if payload.get("s") != sort_by or payload.get("o") != sort_order or len(values) != len(SORT_COLUMNS[sort_by]):
+        raise InvalidCursor("Cursor was issued for a different sort order")
+
+    decoded = []
+    for (column, _), value in zip(SORT_COLUMNS[sort_by], values):
+        if value is not None and column.key == "date":
+            value = datetime.fromisoformat(value)
+        decoded.append(value)
+    return decoded
+
+def keyset_condition(sort_by: str, values: List[Any], descending: bool):
+    """Rows strictly after the cursor in (col1, col2, ..., id) order
+
+    SQLite sorts NULL first, so for nullable columns NULL is the smallest value.
+    """
+    columns = SORT_COLUMNS[sort_by]
+    clauses = []
+    for i, (column, nullable) in enumerate(columns):
+        equal_prefix = [
+            prev.is_(None) if value is None else prev == value
+            for (prev, _), value in zip(columns[:i], values[:i])
+        ]
+        value = values[i]
+        if descending:
+            if value is None:
+                after = false()
+            elif nullable:
+                after = or_(column < value, column.is_(None))
+            else:
+                after = column < value
+        else:
+            after = column.is_not(None) if value is None else column > value
+        clauses.append(and_(*equal_prefix, after))
+    return or_(*clauses)
+
+def concert_filters(
+    query: Optional[str],
+    artist: Optional[str],
+    venue: Optional[str],
+    date_range: Optional[str],
+    filter_by_concert_date: bool
+) -> list:
+    """WHERE clauses matching the browse-service parameters"""
+    filters = []
+    if query:
+        pattern = f"%{query}%"
+        filters.append(or_(
+            AggregatedConcert.title.ilike(pattern),
+            AggregatedConcert.artist.ilike(pattern),
+            AggregatedConcert.venue.ilike(pattern),
+            AggregatedConcert.location.ilike(pattern)
+        ))
+    if artist:
+        filters.append(AggregatedConcert.artist == artist)
+    if venue:
+        filters.append(AggregatedConcert.venue == venue)
+    if date_range:
+        start_date = date_range_start(date_range)
+        if filter_by_concert_date:
+            filters.append(AggregatedConcert.date >= start_date)
+            filters.append(AggregatedConcert.date <= datetime.utcnow())
+        else:
+            # Upload date: any recording added to IA in the range
+            filters.append(exists().where(
+                ConcertRecording.concert_id == AggregatedConcert.id,
+                ConcertRecording.added_at >= start_date
+            ))
+    return filters
+
+# Serialized concert/recording fields (the shape of ConcertGroup.materialize).
+# Projections read only the columns their fields need.
+def iso(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+CONCERT_VALUES = {
+    "id": lambda c: c.concert_key,  # Use concert_key as id for frontend compatibility
+    "concert_key": lambda c: c.concert_key,
+    "artist": lambda c: c.artist,
+    "date": lambda c: c.date,
+    "venue": lambda c: c.venue,
+    "location": lambda c: c.location,
+    "title": lambda c: c.title,
+    "description": lambda c: c.description,
+    "source": lambda c: c.source,
+    "taper": lambda c: c.taper,
+    "lineage": lambda c: c.lineage,
+    "total_recordings": lambda c: c.total_recordings or 0,
+    "total_tracks": lambda c: c.total_tracks or 0,
+    "total_size": lambda c: c.total_size or 0,
+    "total_downloads": lambda c: c.total_downloads or 0,
+    "indexed_at": lambda c: iso(c.indexed_at),
+    "last_updated": lambda c: iso(c.last_updated),
+}
+RECORDING_VALUES = {
+    "id": lambda r: r.archive_identifier,  # Use identifier as id for frontend compatibility
+    "archive_identifier": lambda r: r.archive_identifier,
+    "title": lambda r: r.title,
+    "description": lambda r: r.description,
+    "source": lambda r: r.source,
+    "taper": lambda r: r.taper,
+    "lineage": lambda r: r.lineage,
+    "total_tracks": lambda r: r.total_tracks or 0,
+    "total_size": lambda r: r.total_size or 0,
+    "tracks": lambda r: json.loads(r.tracks) if r.tracks else None,
+    "downloads": lambda r: r.downloads or 0,
+    "created_at": lambda r: iso(r.created_at),
+}
+
+def recording_to_dict(recording: ConcertRecording, fields: Optional[Tuple[str, ...]] = None) -> Dict[str, Any]:
+    """Serialize a stored recording"""
+    return {name: RECORDING_VALUES[name](recording) for name in fields or RECORDING_FIELDS}
+
+def concert_to_dict(
+    concert: AggregatedConcert,
+    fields: Optional[Tuple[str, ...]] = None,
+    recording_fields: Optional[Tuple[str, ...]] = None
+) -> Dict[str, Any]:
+    """Serialize a stored concert in the same shape as ConcertGroup.materialize"""
+    data = {}
+    for name in fields or CONCERT_FIELDS:
+        if name == "recordings":
+            data[name] = [recording_to_dict(r, recording_fields) for r in concert.recordings]
+        else:
+            data[name] = CONCERT_VALUES[name](concert)
+    return data
+
+def column_for(model, name: str):
+    """Mapped column behind a serialized field"""
+    if name == "id":
+        return model.concert_key if model is AggregatedConcert else model.archive_identifier
+    return getattr(model, name)
+
+def concert_load_options(
+    sort_by: str,
+    fields: Optional[Tuple[str, ...]],
+    recording_fields: Optional[Tuple[str, ...]]
+) -> list:
+    """Loader options reading only the projected columns (and recordings only if needed)"""
+    options = []
+    if fields is not None:
+        columns = {column_for(AggregatedConcert, name) for name in fields if name != "recordings"}
+        columns.update(column for column, _ in SORT_COLUMNS[sort_by])  # cursor values
+        options.append(load_only(*columns))
+    if fields is None or "recordings" in fields:
+        recordings = selectinload(AggregatedConcert.recordings)
+        if recording_fields is not None:
+            recordings = recordings.load_only(*{column_for(ConcertRecording, name) for name in recording_fields})
+        options.append(recordings)
+    return options
+
+async def query_concerts(
+    db: AsyncSession,
+    query: Optional[str] = None,
+    artist: Optional[str] = None,
+    venue: Optional[str] = None,
+    date_range: Optional[str] = None,
+    filter_by_concert_date: bool = False,
+    page: int = 1,
+    per_page: int = 20,
+    sort_by: str = "date",
+    sort_order: str = "desc",
+    cursor: Optional[str] = None,
+    fields: Optional[Tuple[str, ...]] = None,
+    recording_fields: Optional[Tuple[str, ...]] = None
+) -> Dict[str, Any]:
+    """One page of concerts from the ingested catalog with an exact total
+
+    With a cursor the page is located by keyset (index seek). Page numbers
+    without a cursor skip rows on an index-only scan of concert ids and then
+    load just that page, so deep pages don't decode skipped rows. Projections
+    (see shared/projection.py) only read the columns they return.
+    """
+    sort_by = sort_by if sort_by in SORT_COLUMNS else "date"
+    descending = sort_order != "asc"
+    sort_order = "desc" if descending else "asc"
+    order_by = [column.desc() if descending else column.asc() for column, _ in SORT_COLUMNS[sort_by]]
+    filters = concert_filters(query, artist, venue, date_range, filter_by_concert_date)
+    options = concert_load_options(sort_by, fields, recording_fields)
+
+    total = (await db.execute(
+        select(func.count(AggregatedConcert.id)).where(*filters)
+    )).scalar() or 0
+
+    if cursor:
+        values = decode_cursor(cursor, sort_by, sort_order)
+        result = await db.execute(
+            select(AggregatedConcert)
+            .where(*filters, keyset_condition(sort_by, values, descending))
+            .order_by(*order_by)
+            .limit(per_page)
+            .options(*options)
+        )
+        concerts = result.scalars().all()
+    else:
+        id_result = await db.execute(
+            select(AggregatedConcert.id)
+            .where(*filters)
+            .order_by(*order_by)
+            .offset((page - 1) * per_page)
+            .limit(per_page)
+        )
+        ids = id_result.scalars().all()
+        result = await db.execute(
+            select(AggregatedConcert)
+            .where(AggregatedConcert.id.in_(ids))
+            .options(*options)
+        )
+        by_id = {concert.id: concert for concert in result.scalars().all()}
+        concerts = [by_id[concert_id] for concert_id in ids if concert_id in by_id]
+
+    next_cursor = None
+    if len(concerts) == per_page:
+        next_cursor = encode_cursor(sort_by, sort_order, concerts[-1])
+
+    return {
+        "total": total,
+        "page": page,
+        "per_page": per_page,
+        "total_pages": (total + per_page - 1) // per_page,
+        "next_cursor": next_cursor,
+        "source": "local",
+        "results": [concert_to_dict(concert, fields, recording_fields) for concert in concerts]
+    }
+
+async def get_concert(db: AsyncSession, concert_key: str) -> Optional[Dict[str, Any]]:
+    """Look up one stored concert by key (unique index)"""
+    result = await db.execute(
+        select(AggregatedConcert)
+        .where(AggregatedConcert.concert_key == concert_key)
+        .options(selectinload(AggregatedConcert.recordings))
+    )
+    concert = result.scalar_one_or_none()
+    return concert_to_dict(concert) if concert else None
+
+async def get_concert_for_recording(db: AsyncSession, identifier: str) -> Optional[Dict[str, Any]]:
+    """Look up the stored concert containing a recording"""
+    result = await db.execute(
+        select(AggregatedConcert)
+        .join(ConcertRecording, ConcertRecording.concert_id == AggregatedConcert.id)
+        .where(ConcertRecording.archive_identifier == identifier)
+        .options(selectinload(AggregatedConcert.recordings))
+    )
+    concert = result.scalar_one_or_none()
+    return concert_to_dict(concert) if concert else None
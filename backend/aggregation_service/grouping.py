@@ -0,0 +1,264 @@
+import time
+from collections import Counter, OrderedDict
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from shared.models import ArchiveItem
+
+def extract_concert_key(item: ArchiveItem) -> str:
+    """Extract a unique concert key from an archive item"""
+    artist = item.artist or "Unknown Artist"
+    
+    if item.date:
+        if hasattr(item.date, 'strftime'):
+            date_str = item.date.strftime("%Y-%m-%d")
+        else:
+            date_str = str(item.date)[:10]  # Take first 10 chars for YYYY-MM-DD
+    else:
+        date_str = "unknown"
+    
+    # Only use artist and date for grouping - omit venue to group recordings properly
+    return f"{artist}|{date_str}"
+
+class ConcertGroup:
+    """One concert's recordings with running aggregates
+
+    Totals and venue counts are adjusted as recordings are added or replaced,
+    and the materialized concert dict is rebuilt only after a change.
+    """
+    
+    def __init__(self, key: str, artist: str, date: datetime):
+        self.key = key
+        self.artist = artist
+        self.date = date
+        self.recordings: Dict[str, ArchiveItem] = {}  # identifier -> item, in arrival order
+        self.added_at: Dict[str, str] = {}
+        self.venue_counts = Counter()
+        self.total_tracks = 0
+        self.total_size = 0
+        self.total_downloads = 0
+        self.indexed_at = datetime.utcnow().isoformat()
+        self.last_updated = self.indexed_at
+        self.refreshed_at = time.monotonic()  # Last time upstream data was merged
+        self._materialized: Optional[Dict[str, Any]] = None
+    
+    def _apply(self, item: ArchiveItem, sign: int):
+        """Add (sign=1) or remove (sign=-1) an item's contribution to the aggregates"""
+        self.total_tracks += sign * item.total_tracks
+        self.total_size += sign * item.total_size
+        self.total_downloads += sign * item.downloads
+        if item.venue and item.venue != "Unknown Venue":
+            self.venue_counts[item.venue] += sign
+            if self.venue_counts[item.venue] <= 0:
+                del self.venue_counts[item.venue]
+    
+    def add(self, item: ArchiveItem) -> bool:
+        """Merge a recording; returns whether anything changed"""
+        existing = self.recordings.get(item.identifier)
+        if existing is not None:
+            if existing == item:
+                return False
+            self._apply(existing, -1)
+        else:
+            self.added_at[item.identifier] = datetime.utcnow().isoformat()
+        
+        self.recordings[item.identifier] = item
+        self._apply(item, 1)
+        self.last_updated = datetime.utcnow().isoformat()
+        self._materialized = None
+        return True
+    
+    def remove(self, identifier: str):
+        """Drop a recording (it moved to another concert)"""
+        item = self.recordings.pop(identifier, None)
+        if item is not None:
+            self.added_at.pop(identifier, None)
+            self._apply(item, -1)
+            self.last_updated = datetime.utcnow().isoformat()
+            self._materialized = None
+    
+    @property
+    def is_materialized(self) -> bool:
+        return self._materialized is not None
+    
+    def materialize(self) -> Dict[str, Any]:
+        """Concert dict for API responses (cached until the group changes)"""
+        if self._materialized is not None:
+            return self._materialized
+        
+        # Use first recording for base metadata
+        base_recording = next(iter(self.recordings.values()))
+        
+        # Use the most common venue (first seen wins ties), or None
+        venue = self.venue_counts.most_common(1)[0][0] if self.venue_counts else None
+        
+        # Format title as ARTIST-VENUE-LOCATION (omit venue if missing or unknown)
+        title_parts = [self.artist]
+        if venue:
+            title_parts.append(venue)
+        if base_recording.location:
+            title_parts.append(base_recording.location)
+        
+        self._materialized = {
+            "id": self.key,  # Use concert_key as id for frontend compatibility
+            "concert_key": self.key,
+            "artist": self.artist,
+            "date": self.date,
+            "venue": venue,
+            "location": base_recording.location,
+            "title": "-".join(title_parts),
+            "description": base_recording.description or f"Live performance by {self.artist}",
+            "source": base_recording.source or "Multiple sources available",
+            "taper": base_recording.taper or None,
+            "lineage": base_recording.lineage or None,
+            "total_recordings": len(self.recordings),
+            "total_tracks": self.total_tracks,
+            "total_size": self.total_size,
+            "total_downloads": self.total_downloads,
+            "indexed_at": self.indexed_at,
+            "last_updated": self.last_updated,
+            "recordings": [
+                {
+                    "id": r.identifier,  # Use identifier as id for frontend compatibility
+                    "archive_identifier": r.identifier,
+                    "title": r.title,
+                    "description": r.description,
+                    "source": r.source,
+                    "taper": r.taper,
+                    "lineage": r.lineage,
+                    "total_tracks": r.total_tracks,
+                    "total_size": r.total_size,
+                    "tracks": r.tracks,
+                    "downloads": r.downloads,
+                    "created_at": self.added_at[r.identifier]
+                }
+                for r in self.recordings.values()
+            ]
+        }
+        return self._materialized
+
+class ConcertGroupingIndex:
+    """Persistent concert groups keyed by extract_concert_key
+    
+    Merging a page of recordings only touches the groups those recordings
+    belong to; recordings already merged unchanged cost a dict lookup.
+    Least recently used concerts are dropped past max_concerts.
+    """
+    
+    def __init__(self, max_concerts: Optional[int] = None):
+        self.max_concerts = max_concerts
+        self.groups: "OrderedDict[str, ConcertGroup]" = OrderedDict()
+        self.identifier_keys: Dict[str, str] = {}  # recording identifier -> concert key
+        self.merged = 0
+        self.unchanged = 0
+        self.materializations = 0
+        self.evictions = 0
+    
+    def merge(self, items: List[ArchiveItem]) -> List[Dict[str, Any]]:
+        """Merge recordings and return their concerts in first-appearance order"""
+        keys = []
+        seen = set()
+        for item in items:
+            # Fast path: recording already merged unchanged
+            key = self.identifier_keys.get(item.identifier)
+            group = self.groups.get(key) if key is not None else None
+            if group is not None and group.recordings.get(item.identifier) == item:
+                self.groups.move_to_end(key)
+                group.refreshed_at = time.monotonic()
+                self.unchanged += 1
+                if key not in seen:
+                    seen.add(key)
+                    keys.append(key)
+                continue
+            
+            key = extract_concert_key(item)
+            group = self.groups.get(key)
+            if group is None:
+                artist, _, date_str = key.partition("|")
+                try:
+                    concert_date = datetime.strptime(date_str, "%Y-%m-%d")
+                except ValueError:
+                    continue
+                group = ConcertGroup(key, artist, concert_date)
+                self.groups[key] = group
+            else:
+                self.groups.move_to_end(key)
+            
+            # Recording's artist/date changed: take it out of its old concert
+            previous_key = self.identifier_keys.get(item.identifier)
+            if previous_key is not None and previous_key != key:
+                self._remove_from(previous_key, item.identifier)
+            
+            group.refreshed_at = time.monotonic()
+            if group.add(item):
+                self.merged += 1
+            else:
+                self.unchanged += 1
+            self.identifier_keys[item.identifier] = key
+            
+            if key not in seen:
+                seen.add(key)
+                keys.append(key)
+        
+        concerts = []
+        for key in keys:
+            group = self.groups.get(key)
+            if group is not None and group.recordings:
+                if not group.is_materialized:
+                    self.materializations += 1
+                concerts.append(group.materialize())
+        
+        self._evict()
+        return concerts
+    
+    def _remove_from(self, key: str, identifier: str):
+        """Remove a recording from a concert, dropping the concert if it empties"""
+        group = self.groups.get(key)
+        if group is None:
+            return
+        group.remove(identifier)
+        if not group.recordings:
+            del self.groups[key]
+    
+    def _evict(self):
+        """Drop least recently used concerts beyond max_concerts"""
+        if not self.max_concerts:
+            return
+        while len(self.groups) > self.max_concerts:
+            key, group = self.groups.popitem(last=False)
+            for identifier in group.recordings:
+                if self.identifier_keys.get(identifier) == key:
+                    del self.identifier_keys[identifier]
+            self.evictions += 1
+    
+    def get(self, key: str, max_age: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Materialized concert for a key, if indexed (and refreshed within max_age seconds)"""
+        group = self.groups.get(key)
+        if group is None or not group.recordings:
+            return None
+        if max_age is not None and time.monotonic() - group.refreshed_at > max_age:
+            return None
+        self.groups.move_to_end(key)
+        return group.materialize()
+    
+    def get_by_identifier(self, identifier: str, max_age: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """Materialized concert containing a recording, if indexed"""
+        key = self.identifier_keys.get(identifier)
+        return self.get(key, max_age) if key is not None else None
+    
+    def clear(self):
+        """Forget every concert"""
+        self.groups.clear()
+        self.identifier_keys.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        """Get index size and merge statistics"""
+        return {
+            "concerts": len(self.groups),
+            "recordings": len(self.identifier_keys),
+            "max_concerts": self.max_concerts,
+            "merged": self.merged,
+            "unchanged": self.unchanged,
+            "materializations": self.materializations,
+            "evictions": self.evictions
+        }
@@ -0,0 +1,373 @@
+import os
+import uuid
+import asyncio
+import logging
+from collections import Counter, defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import select, delete, func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from shared.database import AsyncSessionLocal
+from shared.database_models import AggregatedConcert, ConcertRecording, IngestCheckpoint
+from shared.http import get_http_client, ARCHIVE
+from shared.models import ArchiveItem
+from shared.venue_parser import parse_venue_location
+from backend.aggregation_service.grouping import extract_concert_key
+
+logger = logging.getLogger(__name__)
+
+# Internet Archive scrape API (cursor-based bulk retrieval). Point IA_SCRAPE_URL
+# at benchmarks/ia_scrape_stub.py to run ingestion against a local stub.
+IA_SCRAPE_URL = os.getenv("IA_SCRAPE_URL", "https://archive.org/services/search/v1/scrape")
+INGEST_QUERY = os.getenv("INGEST_QUERY", "collection:etree AND NOT collection:stream_only")
+INGEST_PAGE_SIZE = int(os.getenv("INGEST_PAGE_SIZE", "5000"))  # IA accepts 100-10000
+INGEST_INTERVAL_SECONDS = int(os.getenv("INGEST_INTERVAL_SECONDS", "0"))  # 0 disables scheduled runs
+INGEST_CHECKPOINT = "etree"
+INGEST_FIELDS = [
+    "identifier", "title", "creator", "date", "venue", "coverage", "description",
+    "source", "taper", "lineage", "downloads", "addeddate"
+]
+IA_DATETIME_FORMAT = "%Y-%m-%dT%H:%M:%SZ"
+
+ingest_lock = asyncio.Lock()
+ingest_stats = {"runs": 0, "pages": 0, "items": 0, "concerts_touched": 0, "last_run_seconds": None}
+ingest_state = {"catalog_ready": False}
+
+def first_value(value: Any) -> Optional[str]:
+    """Scrape API fields can be repeated; take the first value as a string"""
+    if isinstance(value, list):
+        value = value[0] if value else None
+    return str(value) if value is not None else None
+
+def parse_ia_datetime(value: Any) -> Optional[datetime]:
+    """Parse an IA date or timestamp (YYYY, YYYY-MM-DD or ISO 8601)"""
+    value = first_value(value)
+    if not value:
+        return None
+    try:
+        if len(value) == 4:
+            return datetime.strptime(value, "%Y")
+        if len(value) >= 19:
+            return datetime.strptime(value[:19], "%Y-%m-%dT%H:%M:%S")
+        return datetime.strptime(value[:10], "%Y-%m-%d")
+    except ValueError:
+        return None
+
+def normalize_scrape_doc(doc: Dict[str, Any]) -> Optional[ArchiveItem]:
+    """Build an ArchiveItem from a scrape API document"""
+    identifier = doc.get("identifier")
+    if not identifier:
+        return None
+
+    title = first_value(doc.get("title")) or "Unknown Title"
+    venue = first_value(doc.get("venue"))
+    location = first_value(doc.get("coverage"))
+    if not venue:
+        venue, parsed_location = parse_venue_location(title, doc.get("description"))
+        location = location or parsed_location
+
+    description = doc.get("description")
+    if isinstance(description, list):
+        description = "\n".join(str(d) for d in description)
+
+    try:
+        downloads = int(doc.get("downloads") or 0)
+    except (TypeError, ValueError):
+        downloads = 0
+
+    return ArchiveItem(
+        identifier=identifier,
+        title=title,
+        artist=first_value(doc.get("creator")),
+        date=parse_ia_datetime(doc.get("date")),
+        venue=venue,
+        location=location,
+        description=description,
+        source=first_value(doc.get("source")),
+        taper=first_value(doc.get("taper")),
+        lineage=first_value(doc.get("lineage")),
+        downloads=max(downloads, 0)
+    )
+
+def build_scrape_query(since: Optional[datetime]) -> str:
+    """Catalog query, limited to items added since the checkpoint for incremental runs"""
+    if since:
+        return f"{INGEST_QUERY} AND addeddate:[{since.strftime(IA_DATETIME_FORMAT)} TO null]"
+    return INGEST_QUERY
+
+async def fetch_scrape_page(query: str, cursor: Optional[str]) -> Dict[str, Any]:
+    """Fetch one page of the scrape API"""
+    params = {"q": query, "fields": ",".join(INGEST_FIELDS), "count": INGEST_PAGE_SIZE}
+    if cursor:
+        params["cursor"] = cursor
+    client = get_http_client(ARCHIVE)
+    response = await client.get(IA_SCRAPE_URL, params=params)
+    response.raise_for_status()
+    return response.json()
+
+async def get_checkpoint(db: AsyncSession) -> IngestCheckpoint:
+    """Load the ingestion checkpoint, creating it on first use"""
+    checkpoint = await db.get(IngestCheckpoint, INGEST_CHECKPOINT)
+    if checkpoint is None:
+        checkpoint = IngestCheckpoint(name=INGEST_CHECKPOINT, status="idle", run_items=0, total_items=0)
+        db.add(checkpoint)
+        await db.commit()
+    return checkpoint
+
+def concert_title(artist: str, venue: Optional[str], location: Optional[str]) -> str:
+    """Format a concert title as ARTIST-VENUE-LOCATION (omitting missing parts)"""
+    return "-".join(part for part in (artist, venue, location) if part)
+
+async def write_batch(db: AsyncSession, items: List[ArchiveItem], added: Dict[str, Optional[datetime]]) -> int:
+    """Upsert one page of recordings and re-aggregate the concerts it touches (the caller commits)"""
+    groups = defaultdict(list)
+    for item in items:
+        if item.date:  # Concerts need a date
+            groups[extract_concert_key(item)].append(item)
+    if not groups:
+        return 0
+
+    # Create missing concerts, then resolve every key to its id
+    now = datetime.utcnow()
+    new_concerts = []
+    for key, recordings in groups.items():
+        base = recordings[0]
+        artist = key.split("|", 1)[0]
+        new_concerts.append({
+            "id": str(uuid.uuid4()),
+            "concert_key": key,
+            "artist": artist,
+            "date": datetime.strptime(key.split("|", 1)[1], "%Y-%m-%d"),
+            "venue": base.venue,
+            "location": base.location,
+            "title": concert_title(artist, base.venue, base.location),
+            "description": base.description or f"Live performance by {artist}",
+            "source": base.source or "Multiple sources available",
+            "taper": base.taper,
+            "lineage": base.lineage,
+            "indexed_at": now,
+            "last_updated": now
+        })
+    await db.execute(
+        sqlite_insert(AggregatedConcert).on_conflict_do_nothing(index_elements=[AggregatedConcert.concert_key]),
+        new_concerts
+    )
+    result = await db.execute(
+        select(AggregatedConcert.concert_key, AggregatedConcert.id)
+        .where(AggregatedConcert.concert_key.in_(list(groups)))
+    )
+    concert_ids = dict(result.all())
+
+    # Recordings whose date/artist changed move concerts; re-aggregate the old one too
+    identifiers = [item.identifier for recordings in groups.values() for item in recordings]
+    result = await db.execute(
+        select(ConcertRecording.concert_id)
+        .where(ConcertRecording.archive_identifier.in_(identifiers))
+    )
+    touched = set(result.scalars().all()) | set(concert_ids.values())
+
+    rows = []
+    for key, recordings in groups.items():
+        for item in recordings:
+            rows.append({
+                "id": str(uuid.uuid4()),
+                "concert_id": concert_ids[key],
+                "archive_identifier": item.identifier,
+                "title": item.title,
+                "description": item.description,
+                "source": item.source,
+                "taper": item.taper,
+                "lineage": item.lineage,
+                "venue": item.venue,
+                "location": item.location,
+                "total_tracks": item.total_tracks,
+                "total_size": item.total_size,
+                "downloads": item.downloads,
+                "added_at": added.get(item.identifier)
+            })
+    stmt = sqlite_insert(ConcertRecording)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ConcertRecording.archive_identifier],
+        set_={
+            column: stmt.excluded[column]
+            for column in ("concert_id", "title", "description", "source", "taper", "lineage",
+                           "venue", "location", "downloads", "added_at")
+        }
+    )
+    await db.execute(stmt, rows)
+
+    await refresh_concert_aggregates(db, touched)
+    return len(touched)
+
+async def refresh_concert_aggregates(db: AsyncSession, concert_ids: set):
+    """Recompute totals and the most common venue for concerts from their recordings"""
+    concert_ids = list(concert_ids)
+    result = await db.execute(
+        select(
+            ConcertRecording.concert_id,
+            func.count(ConcertRecording.id),
+            func.coalesce(func.sum(ConcertRecording.total_tracks), 0),
+            func.coalesce(func.sum(ConcertRecording.total_size), 0),
+            func.coalesce(func.sum(ConcertRecording.downloads), 0)
+        )
+        .where(ConcertRecording.concert_id.in_(concert_ids))
+        .group_by(ConcertRecording.concert_id)
+    )
+    totals = {row[0]: row[1:] for row in result.all()}
+
+    result = await db.execute(
+        select(ConcertRecording.concert_id, ConcertRecording.venue, func.count())
+        .where(ConcertRecording.concert_id.in_(concert_ids))
+        .where(ConcertRecording.venue.is_not(None))
+        .where(ConcertRecording.venue != "Unknown Venue")
+        .group_by(ConcertRecording.concert_id, ConcertRecording.venue)
+    )
+    venue_counts = defaultdict(Counter)
+    for concert_id, venue, count in result.all():
+        venue_counts[concert_id][venue] = count
+
+    empty = [concert_id for concert_id in concert_ids if concert_id not in totals]
+    if empty:
+        await db.execute(delete(AggregatedConcert).where(AggregatedConcert.id.in_(empty)))
+
+    result = await db.execute(select(AggregatedConcert).where(AggregatedConcert.id.in_(list(totals))))
+    for concert in result.scalars().all():
+        recordings, tracks, size, downloads = totals[concert.id]
+        concert.total_recordings = recordings
+        concert.total_tracks = tracks
+        concert.total_size = size
+        concert.total_downloads = downloads
+        if venue_counts[concert.id]:
+            concert.venue = venue_counts[concert.id].most_common(1)[0][0]
+        concert.title = concert_title(concert.artist, concert.venue, concert.location)
+        concert.last_updated = datetime.utcnow()
+
+async def run_ingest(full: bool = False) -> Dict[str, Any]:
+    """Walk the catalog with the scrape API, resuming from the persisted cursor
+
+    Each page is written in one transaction together with the next cursor, so
+    an interrupted run continues where it stopped. Completed runs advance the
+    addeddate high-water mark that the next incremental run starts from.
+    """
+    async with ingest_lock:
+        started = datetime.utcnow()
+        pages = 0
+        items_written = 0
+        concerts_touched = 0
+
+        async with AsyncSessionLocal() as db:
+            checkpoint = await get_checkpoint(db)
+            if checkpoint.status == "running" and checkpoint.cursor and not full:
+                logger.info(f"Resuming ingestion from cursor (since {checkpoint.since})")
+            else:
+                checkpoint.status = "running"
+                checkpoint.cursor = None
+                checkpoint.since = None if full else checkpoint.high_water
+                checkpoint.run_high_water = None
+                checkpoint.run_items = 0
+                checkpoint.started_at = started
+                checkpoint.last_error = None
+                await db.commit()
+                logger.info(f"Starting {'full' if checkpoint.since is None else 'incremental'} ingestion (since {checkpoint.since})")
+
+            query = build_scrape_query(checkpoint.since)
+            try:
+                while True:
+                    page = await fetch_scrape_page(query, checkpoint.cursor)
+                    docs = page.get("items", [])
+
+                    items = []
+                    added = {}
+                    for doc in docs:
+                        item = normalize_scrape_doc(doc)
+                        if item:
+                            items.append(item)
+                            added[item.identifier] = parse_ia_datetime(doc.get("addeddate"))
+
+                    concerts_touched += await write_batch(db, items, added)
+
+                    newest = max((a for a in added.values() if a), default=None)
+                    if newest and (checkpoint.run_high_water is None or newest > checkpoint.run_high_water):
+                        checkpoint.run_high_water = newest
+                    checkpoint.cursor = page.get("cursor")
+                    checkpoint.run_items = (checkpoint.run_items or 0) + len(items)
+                    checkpoint.total_items = (checkpoint.total_items or 0) + len(items)
+                    if not checkpoint.cursor:
+                        checkpoint.status = "completed"
+                        checkpoint.completed_at = datetime.utcnow()
+                        checkpoint.last_error = None  # A resumed run may have failed earlier
+                        checkpoint.high_water = checkpoint.run_high_water or checkpoint.high_water
+                    await db.commit()
+
+                    pages += 1
+                    items_written += len(items)
+                    logger.info(f"Ingested page {pages}: {len(items)} items ({checkpoint.run_items} this run)")
+                    if not checkpoint.cursor:
+                        ingest_state["catalog_ready"] = True
+                        break
+            except Exception as e:
+                await db.rollback()
+                checkpoint = await get_checkpoint(db)
+                checkpoint.last_error = str(e)
+                await db.commit()
+                logger.error(f"Ingestion stopped, will resume from last cursor: {e}")
+                raise
+            finally:
+                elapsed = (datetime.utcnow() - started).total_seconds()
+                ingest_stats["runs"] += 1
+                ingest_stats["pages"] += pages
+                ingest_stats["items"] += items_written
+                ingest_stats["concerts_touched"] += concerts_touched
+                ingest_stats["last_run_seconds"] = elapsed
+
+            return {
+                "status": checkpoint.status,
+                "pages": pages,
+                "items": items_written,
+                "concerts_touched": concerts_touched,
+                "high_water": checkpoint.high_water.isoformat() if checkpoint.high_water else None,
+                "elapsed_seconds": elapsed
+            }
+
+async def catalog_ready(db: AsyncSession) -> bool:
+    """Whether at least one ingestion run has completed"""
+    if not ingest_state["catalog_ready"]:
+        result = await db.execute(
+            select(IngestCheckpoint.high_water).where(IngestCheckpoint.name == INGEST_CHECKPOINT)
+        )
+        ingest_state["catalog_ready"] = result.scalar() is not None
+    return ingest_state["catalog_ready"]
+
+async def get_ingest_status() -> Dict[str, Any]:
+    """Checkpoint state plus catalog counts"""
+    async with AsyncSessionLocal() as db:
+        checkpoint = await get_checkpoint(db)
+        concerts = (await db.execute(select(func.count(AggregatedConcert.id)))).scalar() or 0
+        recordings = (await db.execute(select(func.count(ConcertRecording.id)))).scalar() or 0
+    return {
+        "running": ingest_lock.locked(),
+        "status": checkpoint.status,
+        "resumable": checkpoint.status == "running" and bool(checkpoint.cursor),
+        "since": checkpoint.since.isoformat() if checkpoint.since else None,
+        "high_water": checkpoint.high_water.isoformat() if checkpoint.high_water else None,
+        "run_items": checkpoint.run_items,
+        "total_items": checkpoint.total_items,
+        "last_error": checkpoint.last_error,
+        "started_at": checkpoint.started_at.isoformat() if checkpoint.started_at else None,
+        "completed_at": checkpoint.completed_at.isoformat() if checkpoint.completed_at else None,
+        "concerts": concerts,
+        "recordings": recordings,
+        "stats": ingest_stats
+    }
+
+async def ingest_loop():
+    """Run incremental ingestion on a fixed interval"""
+    while True:
+        try:
+            await run_ingest()
+        except Exception as e:
+            logger.error(f"Scheduled ingestion failed: {e}")
+        await asyncio.sleep(INGEST_INTERVAL_SECONDS)
@@ -3,18 +3,28 @@ import asyncio
 import logging
 import json
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, HTTPException, Query, Depends
+from fastapi import FastAPI, HTTPException, Query, Depends, Header
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.ext.asyncio import AsyncSession
 from typing import List, Optional, Dict, Any
 from datetime import datetime, timedelta
 import httpx
-from collections import defaultdict
 
 from shared.database import get_db, init_db, close_db
+from shared.cache import InMemoryCache
+from shared.http import start_http_clients, close_http_clients, get_http_client, BROWSE, ARCHIVE
 from shared.models import (
     ArchiveItem, ArchiveTrack, ArchiveSearchResponse, HealthCheckResponse, StatsResponse
 )
+from shared.projection import concert_projection, project_concert
+from shared.ndjson import NDJSON_MEDIA_TYPE, wants_ndjson, ndjson_response, iter_ndjson
+from backend.aggregation_service.grouping import ConcertGroupingIndex
+from backend.aggregation_service.ingest import (
+    run_ingest, get_ingest_status, ingest_loop, ingest_lock, catalog_ready, INGEST_INTERVAL_SECONDS
+)
+from backend.aggregation_service.catalog import (
+    query_concerts, get_concert, get_concert_for_recording, InvalidCursor
+)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -23,9 +33,29 @@ logger = logging.getLogger(__name__)
 # Service URLs
 BROWSE_SERVICE_URL = os.getenv("BROWSE_SERVICE_URL", "http://127.0.0.1:8001")
 
-# In-memory cache for browse results
-browse_cache = {}
+# Where /concerts comes from: 'local' (ingested AggregatedConcert tables),
+# 'live' (browse service fan-out) or 'auto' (local once an ingestion run completed)
+CONCERTS_SOURCE = os.getenv("CONCERTS_SOURCE", "auto")
+
+# In-memory cache for grouped browse results: LRU bounded by approximate
+# (pickled) size, with expired entries swept on a timer
 CACHE_DURATION = 300  # 5 minutes
+BROWSE_CACHE_MAX_BYTES = int(os.getenv("AGGREGATION_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+BROWSE_CACHE_MAX_ENTRIES = int(os.getenv("AGGREGATION_CACHE_MAX_ENTRIES", "1000"))
+BROWSE_CACHE_SWEEP_SECONDS = int(os.getenv("AGGREGATION_CACHE_SWEEP_SECONDS", "30"))
+browse_cache = InMemoryCache(
+    max_entries=BROWSE_CACHE_MAX_ENTRIES,
+    max_bytes=BROWSE_CACHE_MAX_BYTES,
+    cleanup_interval=BROWSE_CACHE_SWEEP_SECONDS
+)
+
+# Concert groups persist across requests; each browse page only merges its new recordings
+GROUPING_INDEX_MAX_CONCERTS = int(os.getenv("GROUPING_INDEX_MAX_CONCERTS", "50000"))
+grouping_index = ConcertGroupingIndex(max_concerts=GROUPING_INDEX_MAX_CONCERTS)
+STREAM_MERGE_BATCH = int(os.getenv("AGGREGATION_STREAM_MERGE_BATCH", "50"))  # Recordings per grouping merge while streaming
+
+# Catalog ingestion started through the API (kept so the task isn't garbage collected)
+ingest_tasks = set()
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
@@ -33,9 +63,15 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting Aggregation Service...")
     await init_db()
+    start_http_clients(BROWSE, ARCHIVE)
+    if INGEST_INTERVAL_SECONDS > 0:
+        ingest_tasks.add(asyncio.create_task(ingest_loop()))
     yield
     # Shutdown
     logger.info("Shutting down Aggregation Service...")
+    for task in list(ingest_tasks):
+        task.cancel()
+    await close_http_clients()
     await close_db()
 
 # Create FastAPI app
@@ -55,135 +91,29 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-def extract_concert_key(item: ArchiveItem) -> str:
-    """Extract a unique concert key from an archive item"""
-    artist = item.artist or "Unknown Artist"
-    
-    if item.date:
-        if hasattr(item.date, 'strftime'):
-            date_str = item.date.strftime("%Y-%m-%d")
-        else:
-            date_str = str(item.date)[:10]  # Take first 10 chars for YYYY-MM-DD
-    else:
-        date_str = "unknown"
-    
-    # Only use artist and date for grouping - omit venue to group recordings properly
-    return f"{artist}|{date_str}"
-
-def group_recordings_by_concert(items: List[ArchiveItem]) -> List[Dict[str, Any]]:
-    """Group archive items by concert key and return concert instances"""
-    concert_groups = defaultdict(list)
-    
-    # Group items by concert key
-    for item in items:
-        key = extract_concert_key(item)
-        concert_groups[key].append(item)
-    
-    # Create concert instances
-    concerts = []
-    for key, recordings in concert_groups.items():
-        if not recordings:
-            continue
-            
-        # Parse concert key
-        parts = key.split("|")
-        if len(parts) != 2:
-            continue
-            
-        artist, date_str = parts
-        
-        try:
-            concert_date = datetime.strptime(date_str, "%Y-%m-%d")
-        except ValueError:
-            continue
-        
-        # Use first recording for base metadata
-        base_recording = recordings[0]
-        
-        # Determine venue from recordings (use the most common venue if multiple exist)
-        venue_counts = {}
-        for recording in recordings:
-            if recording.venue and recording.venue != "Unknown Venue":
-                venue_counts[recording.venue] = venue_counts.get(recording.venue, 0) + 1
-        
-        # Use the most common venue, or the first non-unknown venue, or None
-        venue = None
-        if venue_counts:
-            venue = max(venue_counts, key=venue_counts.get)
-        else:
-            # Look for any non-unknown venue
-            for recording in recordings:
-                if recording.venue and recording.venue != "Unknown Venue":
-                    venue = recording.venue
-                    break
-        
-        # Format title as ARTIST-VENUE-LOCATION (omit venue if missing or unknown)
-        title_parts = [artist]
-        if venue:
-            title_parts.append(venue)
-        if base_recording.location:
-            title_parts.append(base_recording.location)
-        title = "-".join(title_parts)
-        
-        description = base_recording.description or f"Live performance by {artist}"
-        source = base_recording.source or "Multiple sources available"
-        taper = base_recording.taper or None
-        lineage = base_recording.lineage or None
-        
-        # Create concert instance
-        concert = {
-            "id": key,  # Use concert_key as id for frontend compatibility
-            "concert_key": key,
-            "artist": artist,
-            "date": concert_date,
-            "venue": venue,
-            "location": base_recording.location,
-            "title": title,
-            "description": description,
-            "source": source,
-            "taper": taper,
-            "lineage": lineage,
-            "total_recordings": len(recordings),
-            "total_tracks": sum(r.total_tracks for r in recordings),
-            "total_size": sum(r.total_size for r in recordings),
-            "total_downloads": sum(r.downloads for r in recordings),
-            "indexed_at": datetime.utcnow().isoformat(),
-            "last_updated": datetime.utcnow().isoformat(),
-            "recordings": [
-                {
-                    "id": r.identifier,  # Use identifier as id for frontend compatibility
-                    "archive_identifier": r.identifier,
-                    "title": r.title,
-                    "description": r.description,
-                    "source": r.source,
-                    "taper": r.taper,
-                    "lineage": r.lineage,
-                    "total_tracks": r.total_tracks,
-                    "total_size": r.total_size,
-                    "tracks": r.tracks,
-                    "downloads": r.downloads,  # Add download count
-                    "created_at": datetime.utcnow().isoformat()  # Add required field
-                }
-                for r in recordings
-            ]
-        }
-        concerts.append(concert)
-    
-    return concerts
-
 def get_cache_key(params: Dict[str, Any]) -> str:
     """Generate a cache key from request parameters"""
     # Sort parameters for consistent cache keys
     sorted_params = sorted(params.items())
     return json.dumps(sorted_params)
 
-def is_cache_valid(cache_entry: Dict[str, Any]) -> bool:
-    """Check if cache entry is still valid"""
-    if not cache_entry:
-        return False
-    
-    cache_time = cache_entry.get("timestamp", 0)
-    return (datetime.utcnow().timestamp() - cache_time) < CACHE_DURATION
+def get_cache_info_dict() -> Dict[str, Any]:
+    """Browse cache size, budget and hit/miss/eviction counters"""
+    info = browse_cache.info()
+    return {
+        "total_entries": info.get("total_keys", 0),
+        "valid_entries": info.get("active_keys", 0),
+        "expired_entries": info.get("expired_keys", 0),
+        "cache_duration_seconds": CACHE_DURATION,
+        "memory_usage_bytes": info.get("memory_usage", 0),
+        "max_bytes": info.get("max_bytes"),
+        "max_entries": info.get("max_entries"),
+        "hits": info.get("hits", 0),
+        "misses": info.get("misses", 0),
+        "evictions": info.get("evictions", 0),
+        "expirations": info.get("expirations", 0),
+        "sweep_interval_seconds": BROWSE_CACHE_SWEEP_SECONDS
+    }
 
 @app.get("/health", response_model=HealthCheckResponse)
 async def health_check():
@@ -199,18 +129,14 @@ async def health_check():
 async def get_stats(db: AsyncSession = Depends(get_db)):
     """Get service statistics"""
     try:
-        cache_size = len(browse_cache)
-        cache_entries = sum(1 for entry in browse_cache.values() if is_cache_valid(entry))
-        
         return StatsResponse(
             total_users=0,
             total_downloads=0,
             total_concerts=0,
             total_recordings=0,
             cache_stats={
-                "cache_size": cache_size,
-                "valid_entries": cache_entries,
-                "cache_duration_seconds": CACHE_DURATION
+                **get_cache_info_dict(),
+                "grouping_index": grouping_index.stats()
             },
             download_stats={}
         )
@@ -218,6 +144,78 @@ async def get_stats(db: AsyncSession = Depends(get_db)):
         logger.error(f"Error getting stats: {e}")
         raise HTTPException(status_code=500, detail="Failed to get stats")
 
+@app.post("/ingest")
+async def start_ingest(
+    full: bool = Query(False, description="Re-walk the whole catalog instead of items added since the last run")
+):
+    """Start catalog ingestion in the background (resumes an interrupted run)"""
+    if ingest_lock.locked():
+        raise HTTPException(status_code=409, detail="Ingestion already running")
+    
+    async def run():
+        try:
+            await run_ingest(full=full)
+        except Exception as e:
+            logger.error(f"Ingestion failed: {e}")
+    
+    task = asyncio.create_task(run())
+    ingest_tasks.add(task)
+    task.add_done_callback(ingest_tasks.discard)
+    return {"message": "Ingestion started", "full": full}
+
+@app.get("/ingest")
+async def get_ingest():
+    """Get catalog ingestion status"""
+    try:
+        return await get_ingest_status()
+    except Exception as e:
+        logger.error(f"Error getting ingestion status: {e}")
+        raise HTTPException(status_code=500, detail="Failed to get ingestion status")
+
+async def fetch_browse_concerts(params: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Stream recordings from the browse service, merging them into concert groups as they arrive
+
+    Recordings are merged in batches while the page is still being read, so
+    the full browse response is never held as one document.
+    """
+    client = get_http_client(BROWSE)
+    concerts = {}
+    batch = []
+    received = 0
+    
+    def merge_batch():
+        for concert in grouping_index.merge(batch):
+            concerts[concert["concert_key"]] = concert  # Later batches may add recordings
+        batch.clear()
+    
+    def add(item: dict):
+        nonlocal received
+        batch.append(ArchiveItem(**item))
+        received += 1
+        if len(batch) >= STREAM_MERGE_BATCH:
+            merge_batch()
+    
+    async with client.stream(
+        "GET", f"{BROWSE_SERVICE_URL}/browse", params=params, headers={"Accept": NDJSON_MEDIA_TYPE}
+    ) as response:
+        response.raise_for_status()
+        if response.headers.get("content-type", "").startswith(NDJSON_MEDIA_TYPE):
+            lines = iter_ndjson(response)
+            if await anext(lines, None) is None:  # Page header
+                logger.error("Browse service returned an empty NDJSON stream")
+                raise HTTPException(status_code=502, detail="Browse service returned an empty response")
+            async for item in lines:
+                add(item)
+        else:
+            # Browse service without streaming support: one JSON document
+            await response.aread()
+            for item in response.json().get("results", []):
+                add(item)
+    merge_batch()
+    
+    logger.info(f"Fetched {received} recordings from browse service")
+    return list(concerts.values())
+
 @app.get("/concerts")
 async def browse_concerts(
     query: Optional[str] = Query(None, description="Search query"),
@@ -229,10 +227,34 @@ async def browse_concerts(
     sort_by: Optional[str] = Query("date", description="Sort by field (date, artist, venue)"),
     sort_order: Optional[str] = Query("desc", description="Sort order (asc, desc)"),
     filter_by_concert_date: Optional[bool] = Query(False, description="Filter by concert date instead of upload date"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page (local source only)"),
+    source: Optional[str] = Query(None, description="Concert source (local, live); defaults to CONCERTS_SOURCE"),
+    view: Optional[str] = Query("full", description="Concert view (compact, full); compact drops descriptions and track lists"),
+    fields: Optional[str] = Query(None, description="Comma-separated concert fields to return (overrides view)"),
+    accept: Optional[str] = Header(None, description="application/x-ndjson streams the header line, then one concert per line"),
     db: AsyncSession = Depends(get_db)
 ):
     """Browse concerts (grouped recordings) from Internet Archive with smart caching"""
+    stream = wants_ndjson(accept)
+    try:
+        concert_fields, recording_fields = concert_projection(view, fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
     try:
+        source = source or CONCERTS_SOURCE
+        if source == "local" or (source == "auto" and await catalog_ready(db)):
+            result = await query_concerts(
+                db, query=query, artist=artist, venue=venue, date_range=date_range,
+                filter_by_concert_date=bool(filter_by_concert_date), page=page, per_page=per_page,
+                sort_by=sort_by, sort_order=sort_order, cursor=cursor,
+                fields=concert_fields, recording_fields=recording_fields
+            )
+            if stream:
+                results = result.pop("results")
+                return ndjson_response(result, results)
+            return result
+        
         # Build parameters for browse service
         params = {
             "query": query,
@@ -248,26 +270,16 @@ async def browse_concerts(
         
         # Check cache first
         cache_key = get_cache_key(params)
-        cache_entry = browse_cache.get(cache_key)
+        cached_concerts = browse_cache.get(cache_key)
         
-        if is_cache_valid(cache_entry):
+        if cached_concerts is not None:
             logger.info(f"Using cached data for key: {cache_key[:50]}...")
-            concerts = cache_entry["data"]
+            concerts = cached_concerts
         else:
             logger.info(f"Fetching fresh data with params: {params}")
             
-            # Fetch from browse service
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(f"{BROWSE_SERVICE_URL}/browse", params=params)
-                response.raise_for_status()
-                browse_data = response.json()
-            
-            # Parse archive items
-            raw_items = [ArchiveItem(**item) for item in browse_data.get("results", [])]
-            logger.info(f"Fetched {len(raw_items)} recordings from browse service")
-            
-            # Group by concert
-            concerts = group_recordings_by_concert(raw_items)
+            # Stream recordings from the browse service into the persistent concert groups
+            concerts = await fetch_browse_concerts(params)
             logger.info(f"Grouped into {len(concerts)} concerts")
             
             # Filter by concert date if date_range is specified and filter_by_concert_date is True
@@ -304,15 +316,8 @@ async def browse_concerts(
                 # Keep upload date filtering from browse service
                 logger.info(f"Using upload date filtering from browse service")
             
-            # Cache the results
-            browse_cache[cache_key] = {
-                "data": concerts,
-                "timestamp": datetime.utcnow().timestamp(),
-                "raw_items": raw_items  # Store raw items for concert details
-            }
-            
-            # Clean up old cache entries
-            cleanup_cache()
+            # Cache the grouped results (raw items live in the grouping index)
+            browse_cache.set(cache_key, concerts, expire=CACHE_DURATION)
         
         # Sort concerts based on parameters
         if sort_by == "date":
@@ -330,14 +335,21 @@ async def browse_concerts(
         end_idx = start_idx + per_page
         paginated_concerts = concerts[start_idx:end_idx]
         
-        return {
+        header = {
             "total": len(concerts),
             "page": page,
             "per_page": per_page,
-            "total_pages": (len(concerts) + per_page - 1) // per_page,
-            "results": paginated_concerts
+            "total_pages": (len(concerts) + per_page - 1) // per_page
         }
+        results = (project_concert(concert, concert_fields, recording_fields) for concert in paginated_concerts)
+        if stream:
+            return ndjson_response(header, results)
+        return {**header, "results": list(results)}
         
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except HTTPException:
+        raise
     except httpx.HTTPStatusError as e:
         logger.error(f"Browse service error: {e}")
         raise HTTPException(status_code=502, detail="Browse service unavailable")
@@ -350,77 +362,46 @@ async def get_concert_details(
     concert_key: str,
     db: AsyncSession = Depends(get_db)
 ):
-    """Get detailed information about a specific concert from cache"""
+    """Get detailed information about a specific concert"""
     try:
-        # Find the concert in our cache
-        concert = None
-        for cache_entry in browse_cache.values():
-            if not is_cache_valid(cache_entry):
-                continue
-                
-            for cached_concert in cache_entry["data"]:
-                if cached_concert["concert_key"] == concert_key:
-                    concert = cached_concert
-                    break
-            
+        # Parse concert key to get search parameters
+        parts = concert_key.split("|")
+        if len(parts) != 2:
+            raise HTTPException(status_code=400, detail="Invalid concert key format")
+        
+        artist, date_str = parts
+        try:
+            datetime.strptime(date_str, "%Y-%m-%d")
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid date format")
+        
+        # O(1) lookup in the concert index kept up to date by aggregation
+        concert = grouping_index.get(concert_key, max_age=CACHE_DURATION)
+        if concert:
+            return concert
+        
+        if CONCERTS_SOURCE != "live" and await catalog_ready(db):
+            concert = await get_concert(db, concert_key)
+            if concert:
+                return concert
+        
+        # Not indexed: fetch just this artist on this date
+        logger.info(f"Concert {concert_key} not indexed, searching...")
+        try:
+            raw_items = await fetch_concert_recordings(artist, date_str)
+        except (httpx.HTTPStatusError, httpx.TimeoutException) as e:
+            # Serve an expired index entry rather than failing
+            concert = grouping_index.get(concert_key)
             if concert:
-                break
+                logger.warning(f"Serving stale concert {concert_key}: {e}")
+                return concert
+            logger.error(f"Browse service error: {e}")
+            raise HTTPException(status_code=502, detail="Browse service unavailable")
         
+        grouping_index.merge(raw_items)
+        concert = grouping_index.get(concert_key)
         if not concert:
-            # If not in cache, we need to search for it
-            logger.info(f"Concert {concert_key} not in cache, searching...")
-            
-            # Parse concert key to get search parameters
-            parts = concert_key.split("|")
-            if len(parts) != 2:
-                raise HTTPException(status_code=400, detail="Invalid concert key format")
-            
-            artist, date_str = parts
-            
-            # Search for this specific concert
-            params = {
-                "artist": artist,
-                "per_page": 100  # Get more recordings to ensure we find the concert
-            }
-            
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(f"{BROWSE_SERVICE_URL}/browse", params=params)
-                response.raise_for_status()
-                browse_data = response.json()
-            
-            # Parse and group recordings
-            raw_items = [ArchiveItem(**item) for item in browse_data.get("results", [])]
-            
-            # Filter for the specific date
-            try:
-                target_date = datetime.strptime(date_str, "%Y-%m-%d").date()
-                matching_items = []
-                for item in raw_items:
-                    if item.date:
-                        item_date = item.date
-                        if hasattr(item_date, 'date'):
-                            item_date = item_date.date()
-                        elif isinstance(item_date, str):
-                            try:
-                                item_date = datetime.strptime(item_date, "%Y-%m-%d").date()
-                            except ValueError:
-                                continue
-                        
-                        if item_date == target_date:
-                            matching_items.append(item)
-                
-                if not matching_items:
-                    raise HTTPException(status_code=404, detail="Concert not found")
-                
-                # Group the matching items
-                concerts = group_recordings_by_concert(matching_items)
-                concert = next((c for c in concerts if c["concert_key"] == concert_key), None)
-                
-                if not concert:
-                    raise HTTPException(status_code=404, detail="Concert not found")
-                    
-            except ValueError:
-                raise HTTPException(status_code=400, detail="Invalid date format")
+            raise HTTPException(status_code=404, detail="Concert not found")
         
         return concert
         
@@ -430,39 +411,47 @@ async def get_concert_details(
         logger.error(f"Error getting concert details: {e}")
         raise HTTPException(status_code=500, detail="Failed to get concert details")
 
-def cleanup_cache():
-    """Remove expired cache entries"""
-    current_time = datetime.utcnow().timestamp()
-    expired_keys = [
-        key for key, entry in browse_cache.items()
-        if (current_time - entry.get("timestamp", 0)) >= CACHE_DURATION
-    ]
-    
-    for key in expired_keys:
-        del browse_cache[key]
-    
-    if expired_keys:
-        logger.info(f"Cleaned up {len(expired_keys)} expired cache entries")
+@app.get("/recordings/{identifier}/concert")
+async def get_recording_concert(
+    identifier: str,
+    db: AsyncSession = Depends(get_db)
+):
+    """Get the concert a recording belongs to"""
+    try:
+        concert = grouping_index.get_by_identifier(identifier)
+        if not concert and CONCERTS_SOURCE != "live" and await catalog_ready(db):
+            concert = await get_concert_for_recording(db, identifier)
+        if not concert:
+            raise HTTPException(status_code=404, detail="Recording not indexed")
+        return concert
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting concert for recording: {e}")
+        raise HTTPException(status_code=500, detail="Failed to get concert for recording")
+
+async def fetch_concert_recordings(artist: str, date_str: str) -> List[ArchiveItem]:
+    """Query the browse service for one artist's recordings on one date"""
+    params = {
+        "artist": artist,
+        "query": f"date:[{date_str} TO {date_str}]",
+        "per_page": 100
+    }
+    client = get_http_client(BROWSE)
+    response = await client.get(f"{BROWSE_SERVICE_URL}/browse", params=params)
+    response.raise_for_status()
+    return [ArchiveItem(**item) for item in response.json().get("results", [])]
 
 @app.delete("/cache")
 async def clear_cache():
     """Clear all cached data"""
-    global browse_cache
-    cache_size = len(browse_cache)
-    browse_cache = {}
+    cache_size = browse_cache.info().get("total_keys", 0)
+    browse_cache.flush()
+    grouping_index.clear()
     logger.info(f"Cleared {cache_size} cache entries")
     return {"message": f"Cleared {cache_size} cache entries"}
 
 @app.get("/cache")
 async def get_cache_info():
     """Get cache information"""
-    current_time = datetime.utcnow().timestamp()
-    valid_entries = sum(1 for entry in browse_cache.values() if is_cache_valid(entry))
-    expired_entries = len(browse_cache) - valid_entries
-    
-    return {
-        "total_entries": len(browse_cache),
-        "valid_entries": valid_entries,
-        "expired_entries": expired_entries,
-        "cache_duration_seconds": CACHE_DURATION
-    }
+    return get_cache_info_dict()
@@ -0,0 +1,136 @@
+import os
+import logging
+from datetime import datetime
+from typing import Dict, List, Tuple
+from sqlalchemy import select, delete, func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from shared.cache import InMemoryCache
+from shared.database_models import ArchiveItemRecord
+from shared.serialization import encode_payload, decode_payload
+from backend.browse_service.search_index import index_items, unindex_missing_items, clear_search_index
+
+logger = logging.getLogger(__name__)
+
+# Normalized ArchiveItem records, stored once per identifier. Search pages only
+# cache ordered identifier lists and are assembled from this store.
+ITEM_MEMORY_MAX_ENTRIES = int(os.getenv("BROWSE_ITEM_MEMORY_MAX_ENTRIES", "20000"))
+item_memory = InMemoryCache(max_entries=ITEM_MEMORY_MAX_ENTRIES)
+
+# Search results carry no file listing, so they must not clobber track data
+# fetched from the metadata API
+TRACK_FIELDS = ("tracks", "total_tracks", "total_size")
+
+def merge_item(existing: dict, existing_detail: str, new: dict, new_detail: str) -> Tuple[dict, str]:
+    """Merge a freshly fetched item into the stored record"""
+    merged = dict(existing)
+    for field, value in new.items():
+        if value is not None:
+            merged[field] = value
+    
+    if existing_detail == "metadata" and new_detail == "search":
+        for field in TRACK_FIELDS:
+            merged[field] = existing.get(field)
+        detail = "metadata"
+    else:
+        detail = new_detail
+    
+    # The metadata API doesn't report download counts
+    merged["downloads"] = max(existing.get("downloads") or 0, new.get("downloads") or 0)
+    return merged, detail
+
+async def store_items(db: AsyncSession, items: List[dict], detail: str) -> List[dict]:
+    """Merge items into the store with one batched read and one upsert; returns merged items"""
+    if not items:
+        return []
+    
+    identifiers = [item["identifier"] for item in items]
+    result = await db.execute(
+        select(ArchiveItemRecord).where(ArchiveItemRecord.identifier.in_(identifiers))
+    )
+    existing = {record.identifier: record for record in result.scalars().all()}
+    
+    now = datetime.utcnow()
+    merged_items = []
+    rows = []
+    for item in items:
+        record = existing.get(item["identifier"])
+        if record:
+            merged, merged_detail = merge_item(decode_payload(record.item_data), record.detail, item, detail)
+        else:
+            merged, merged_detail = item, detail
+        merged_items.append(merged)
+        rows.append({
+            "identifier": merged["identifier"],
+            "item_data": encode_payload(merged),
+            "detail": merged_detail,
+            "updated_at": now
+        })
+    
+    stmt = sqlite_insert(ArchiveItemRecord)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ArchiveItemRecord.identifier],
+        set_={
+            "item_data": stmt.excluded.item_data,
+            "detail": stmt.excluded.detail,
+            "updated_at": stmt.excluded.updated_at
+        }
+    )
+    await db.execute(stmt, rows)
+    await index_items(db, merged_items)
+    await db.commit()
+    
+    for merged in merged_items:
+        item_memory.set(merged["identifier"], merged)
+    
+    return merged_items
+
+async def load_items(db: AsyncSession, identifiers: List[str]) -> Dict[str, dict]:
+    """Batched lookup: in-process tier first, then a single SQL IN query for the rest"""
+    items = {}
+    missing = []
+    for identifier in identifiers:
+        item = item_memory.get(identifier)
+        if item is not None:
+            items[identifier] = item
+        else:
+            missing.append(identifier)
+    
+    if missing:
+        result = await db.execute(
+            select(ArchiveItemRecord.identifier, ArchiveItemRecord.item_data)
+            .where(ArchiveItemRecord.identifier.in_(missing))
+        )
+        for identifier, item_data in result.all():
+            item = decode_payload(item_data)
+            items[identifier] = item
+            item_memory.set(identifier, item)
+    
+    return items
+
+async def prune_items(db: AsyncSession, older_than: datetime) -> int:
+    """Delete records not refreshed since older_than (no live page can reference them)"""
+    result = await db.execute(
+        delete(ArchiveItemRecord)
+        .where(ArchiveItemRecord.updated_at < older_than)
+        .returning(ArchiveItemRecord.identifier)
+    )
+    pruned = result.scalars().all()
+    await db.commit()
+    # The memory tier would otherwise keep serving them until evicted
+    for identifier in pruned:
+        item_memory.delete(identifier)
+    await unindex_missing_items(db)
+    return len(pruned)
+
+async def clear_items(db: AsyncSession):
+    """Delete every stored item"""
+    await db.execute(delete(ArchiveItemRecord))
+    await clear_search_index(db)
+    item_memory.flush()
+
+async def count_items(db: AsyncSession) -> int:
+    """Number of stored items"""
+    result = await db.execute(select(func.count(ArchiveItemRecord.identifier)))
+    return result.scalar() or 0
@@ -4,15 +4,24 @@ import logging
 import json
 import hashlib
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, HTTPException, Query, Depends
+from fastapi import FastAPI, HTTPException, Query, Depends, Header
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, and_
-from typing import List, Optional
+from sqlalchemy import select, func, and_, update, delete
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from typing import List, Optional, Callable, Awaitable, Tuple
 from datetime import datetime, timedelta
 import httpx
 
-from shared.database import get_db, init_db, close_db, AsyncSessionLocal
+from shared.database import get_db, init_db, close_db, AsyncSessionLocal, DatabaseUtils
+from shared.http import start_http_clients, close_http_clients, get_http_client, ARCHIVE
+from shared.singleflight import SingleFlight
+from shared.cache import InMemoryCache
+from shared.serialization import encode_payload, decode_payload, CACHE_SERIALIZER
+from shared.venue_parser import venue_parser_stats
+from shared.projection import item_projection, fetch_level, upstream_fields, project
+from shared.ndjson import wants_ndjson, ndjson_response
 from shared.models import (
     ArchiveItem, ArchiveTrack, ArchiveSearchResponse, CacheEntryResponse,
     HealthCheckResponse, StatsResponse
@@ -20,6 +29,15 @@ from shared.models import (
 from pydantic import BaseModel
 from typing import Dict, Any
 from shared.database_models import CacheEntry
+from backend.browse_service.item_store import (
+    store_items, load_items, prune_items, clear_items, count_items, item_memory
+)
+from backend.browse_service.normalize import (
+    normalize_search_page, iter_search_page, normalize_item_metadata, build_item, shutdown_process_pool, normalize_stats
+)
+from backend.browse_service.search_index import (
+    ensure_search_index, search_items, count_indexed, search_index_state, LOCAL_SORT_FIELDS
+)
 
 # New models for directory browsing
 class ArchiveFile(BaseModel):
@@ -47,21 +65,81 @@ IA_API_BASE = "https://archive.org/advancedsearch.php"
 IA_METADATA_BASE = "https://archive.org/metadata"
 
 # Cache configuration
+# Entries are fresh until the soft TTL. Between the soft and hard TTL the stale
+# payload is served immediately while a single background refresh runs; after
+# the hard TTL the entry is a miss.
 CACHE_DURATION_MINUTES = {
-    'search': 30,      # Search results cache for 30 minutes
-    'metadata': 60,    # Item metadata cache for 1 hour
-    'item': 120        # Full item data cache for 2 hours
+    'search': {'soft': 30, 'hard': 360},      # Search results fresh for 30 minutes
+    'metadata': {'soft': 60, 'hard': 720},    # Item metadata fresh for 1 hour
+    'item': {'soft': 120, 'hard': 1440}       # Full item data fresh for 2 hours
+}
+DEFAULT_CACHE_DURATION_MINUTES = {'soft': 30, 'hard': 360}
+
+# Proactive refresh of hot keys shortly before they go stale
+HOT_KEY_MIN_ACCESSES = int(os.getenv("BROWSE_HOT_KEY_MIN_ACCESSES", "10"))
+HOT_KEY_REFRESH_AHEAD_SECONDS = int(os.getenv("BROWSE_HOT_KEY_REFRESH_AHEAD_SECONDS", "120"))
+HOT_KEY_SCAN_SECONDS = int(os.getenv("BROWSE_HOT_KEY_SCAN_SECONDS", "60"))
+HOT_KEY_MAX_REFRESHES_PER_SCAN = int(os.getenv("BROWSE_HOT_KEY_MAX_REFRESHES_PER_SCAN", "20"))
+
+# In-process LRU tier in front of the CacheEntry table (decoded payloads)
+MEMORY_CACHE_MAX_ENTRIES = int(os.getenv("BROWSE_MEMORY_CACHE_MAX_ENTRIES", "2000"))
+MEMORY_CACHE_MAX_BYTES = int(os.getenv("BROWSE_MEMORY_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+memory_cache = InMemoryCache(max_entries=MEMORY_CACHE_MAX_ENTRIES, max_bytes=MEMORY_CACHE_MAX_BYTES)
+
+# Cache hits are counted in memory and written back to SQL periodically
+ACCESS_STATS_FLUSH_SECONDS = int(os.getenv("BROWSE_ACCESS_STATS_FLUSH_SECONDS", "30"))
+pending_access_stats: Dict[str, list] = {}  # cache_key -> [hit count, last accessed]
+
+# Expired-row compaction (bulk DELETE + incremental VACUUM)
+COMPACTION_INTERVAL_SECONDS = int(os.getenv("BROWSE_COMPACTION_INTERVAL_SECONDS", "3600"))
+COMPACTION_BATCH_SIZE = int(os.getenv("BROWSE_COMPACTION_BATCH_SIZE", "5000"))
+compaction_stats = {
+    "runs": 0,
+    "last_run": None,
+    "last_rows_deleted": 0,
+    "last_bytes_reclaimed": 0,
+    "total_rows_deleted": 0,
+    "total_item_rows_deleted": 0,
+    "total_payload_bytes_deleted": 0,
+    "total_bytes_reclaimed": 0,
+    "incremental_vacuum": False
 }
 
+# Coalesces concurrent identical upstream fetches, keyed by cache key
+upstream_flight = SingleFlight("browse-upstream")
+
+# How to re-fetch each cache key (md5 keys are not reversible), for background refresh
+refresh_registry = InMemoryCache(max_entries=MEMORY_CACHE_MAX_ENTRIES * 2)
+background_refreshes = set()
+pending_refreshes = set()  # Keys with a refresh scheduled, claimed before its task first runs
+refresh_stats = {"stale_served": 0, "scheduled": 0, "proactive": 0, "failed": 0}
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan manager"""
     # Startup
     logger.info("Starting Browse Service...")
     await init_db()
+    await ensure_search_index()
+    start_http_clients(ARCHIVE)
+    try:
+        compaction_stats["incremental_vacuum"] = await DatabaseUtils.enable_incremental_vacuum()
+    except Exception as e:
+        logger.warning(f"Could not enable incremental vacuum: {e}")
+    flush_task = asyncio.create_task(access_stats_flush_loop())
+    hot_key_task = asyncio.create_task(hot_key_refresh_loop())
+    compaction_task = asyncio.create_task(compaction_loop())
     yield
     # Shutdown
     logger.info("Shutting down Browse Service...")
+    compaction_task.cancel()
+    hot_key_task.cancel()
+    flush_task.cancel()
+    for task in list(background_refreshes):
+        task.cancel()
+    await flush_access_stats()
+    shutdown_process_pool()
+    await close_http_clients()
     await close_db()
 
 # Create FastAPI app
@@ -112,6 +190,12 @@ async def get_stats(db: AsyncSession = Depends(get_db)):
         )
         total_cache_hits = cache_hits_result.scalar() or 0
         
+        # Get stored payload size
+        cache_bytes_result = await db.execute(
+            select(func.sum(func.length(CacheEntry.cache_data)))
+        )
+        total_cache_bytes = cache_bytes_result.scalar() or 0
+        
         return {
             "total_users": 0,  # Not tracked in browse service
             "total_downloads": 0,  # Not tracked in browse service
@@ -121,12 +205,31 @@ async def get_stats(db: AsyncSession = Depends(get_db)):
                 "total_entries": total_cache_entries,
                 "expired_entries": expired_cache_entries,
                 "total_hits": total_cache_hits,
-                "total_size_bytes": total_cache_hits * 1024,  # Estimate
+                "total_size_bytes": total_cache_bytes,
+                "serializer": CACHE_SERIALIZER,
                 "cache_types": {
                     "search": CACHE_DURATION_MINUTES['search'],
                     "metadata": CACHE_DURATION_MINUTES['metadata'],
                     "item": CACHE_DURATION_MINUTES['item']
-                }
+                },
+                "compaction": compaction_stats,
+                "background_refresh": {
+                    **refresh_stats,
+                    "in_progress": len(background_refreshes)
+                },
+                "memory_tier": memory_cache.info(),
+                "item_store": {
+                    "total_items": await count_items(db),
+                    "memory_tier": item_memory.info()
+                },
+                "search_index": {
+                    **search_index_state,
+                    "total_documents": await count_indexed(db) if search_index_state["available"] else 0
+                },
+                "venue_parser": venue_parser_stats(),
+                "normalization": normalize_stats,
+                "pending_access_updates": len(pending_access_stats),
+                "upstream_coalescing": upstream_flight.stats()
             },
             "download_stats": {"status": "not_handled_by_browse_service"}
         }
@@ -146,9 +249,18 @@ async def browse_archive(
     per_page: int = Query(20, ge=1, le=100, description="Items per page"),
     sort_by: Optional[str] = Query("relevance", description="Sort by field (date, addeddate, title, relevance)"),
     sort_order: Optional[str] = Query("desc", description="Sort order (asc, desc)"),
+    view: Optional[str] = Query("full", description="Item view (compact, full); compact drops description and tracks"),
+    fields: Optional[str] = Query(None, description="Comma-separated item fields to return (overrides view)"),
+    accept: Optional[str] = Header(None, description="application/x-ndjson streams the header line, then one item per line"),
     db: AsyncSession = Depends(get_db)
 ):
     """Browse Internet Archive for live music"""
+    stream = wants_ndjson(accept)
+    try:
+        projection = item_projection(view, fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
     try:
         # Build search query
         search_query = f'collection:{collection} AND NOT collection:{exclude_collection}'
@@ -179,14 +291,6 @@ async def browse_archive(
         if venue:
             search_query += f' AND venue:"{venue}"'
         
-        # Check cache first
-        cache_key = hashlib.md5(f"browse:{search_query}:{page}:{per_page}".encode()).hexdigest()
-        cached_result = await get_cached_data(db, cache_key, 'search')
-        
-        if cached_result:
-            logger.info(f"Cache hit for browse query: {search_query}")
-            return cached_result
-        
         # Build sorting parameters
         sort_field = sort_by if sort_by in ['date', 'addeddate', 'title', 'relevance'] else 'relevance'
         sort_direction = sort_order if sort_order in ['asc', 'desc'] else 'desc'
@@ -202,43 +306,52 @@ async def browse_archive(
         else:
             sort_param = f"sort[0]=title+{sort_direction}"
         
+        # Ask IA only for the fields the projection needs; pages are cached
+        # per field set
+        level = fetch_level(projection)
+        field_param = "&".join(f"fl[]={name}" for name in upstream_fields(level))
+        
         # Query Internet Archive
         if sort_param:
-            ia_url = f"{IA_API_BASE}?q={search_query}&output=json&rows={per_page}&page={page}&{sort_param}"
+            ia_url = f"{IA_API_BASE}?q={search_query}&{field_param}&output=json&rows={per_page}&page={page}&{sort_param}"
         else:
-            ia_url = f"{IA_API_BASE}?q={search_query}&output=json&rows={per_page}&page={page}"
+            ia_url = f"{IA_API_BASE}?q={search_query}&{field_param}&output=json&rows={per_page}&page={page}"
+        
+        # Check cache first (stale entries are served and refreshed in the background)
+        cache_key = hashlib.md5(f"browse:{search_query}:{page}:{per_page}:{sort_param}:{level}".encode()).hexdigest()
+        refresh = lambda: fetch_search_results(ia_url, cache_key, page, per_page)
+        cached_page = await get_cached_data(db, cache_key, 'search', refresh=refresh)
+        
+        if cached_page:
+            cached_result = await assemble_search_page(db, cached_page)
+            if cached_result:
+                logger.info(f"Cache hit for browse query: {search_query}")
+                if stream:
+                    return ndjson_response(
+                        {"success": True, "message": None, **search_page_header(cached_result["total"], page, per_page)},
+                        (project(item, projection) for item in cached_result["results"])
+                    )
+                return project_search_page(cached_result, projection)
+        
         logger.info(f"🌐 Querying Internet Archive: {ia_url}")
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(ia_url)
-            response.raise_for_status()
-            
-            data = response.json()
-            docs = data.get("response", {}).get("docs", [])
-            total = data.get("response", {}).get("numFound", 0)
-            
-            # Process results
-            items = []
-            for doc in docs:
-                item = await process_archive_item(doc)
-                if item:
-                    items.append(item)
-            
-            # Create response
-            result = ArchiveSearchResponse(
-                total=total,
-                page=page,
-                per_page=per_page,
-                total_pages=(total + per_page - 1) // per_page,
-                results=items
+        # Don't hold a pooled connection while waiting on the shared fetch,
+        # which needs its own connection to store the page
+        await release_connection(db)
+        
+        if stream:
+            # Upstream errors surface before the stream starts; items are then
+            # written as each chunk is normalized
+            docs, total = await upstream_flight.do(f"docs:{cache_key}", lambda: fetch_search_docs(ia_url))
+            header = search_page_header(total, page, per_page)
+            return ndjson_response(
+                {"success": True, "message": None, **header},
+                stream_search_results(docs, cache_key, header, projection)
             )
-            
-            # Cache the result
-            await cache_data(db, cache_key, 'search', result.model_dump())
-            
-            logger.info(f"Browse query returned {len(items)} items from {total} total")
-            return result
-            
+        
+        # Concurrent identical misses share a single upstream fetch
+        return project_search_page(await upstream_flight.do(cache_key, refresh), projection)
+        
     except httpx.TimeoutException:
         logger.error("Timeout while querying Internet Archive")
         raise HTTPException(status_code=504, detail="Internet Archive request timeout")
@@ -249,6 +362,67 @@ async def browse_archive(
         logger.error(f"Error browsing archive: {e}")
         raise HTTPException(status_code=500, detail="Failed to browse archive")
 
+@app.get("/search/local", response_model=ArchiveSearchResponse)
+async def search_local(
+    query: Optional[str] = Query(None, description="Search query (title, artist, venue, location, description)"),
+    artist: Optional[str] = Query(None, description="Filter by artist"),
+    venue: Optional[str] = Query(None, description="Filter by venue"),
+    date_from: Optional[str] = Query(None, pattern=r"^\d{4}(-\d{2}(-\d{2})?)?$", description="Earliest concert date (YYYY[-MM[-DD]])"),
+    date_to: Optional[str] = Query(None, pattern=r"^\d{4}(-\d{2}(-\d{2})?)?$", description="Latest concert date (YYYY[-MM[-DD]])"),
+    page: int = Query(1, ge=1, description="Page number"),
+    per_page: int = Query(20, ge=1, le=100, description="Items per page"),
+    sort_by: Optional[str] = Query("relevance", description="Sort by field (relevance, date, downloads)"),
+    sort_order: Optional[str] = Query("desc", description="Sort order (asc, desc)"),
+    fallback: bool = Query(False, description="Query Internet Archive when nothing matches locally"),
+    db: AsyncSession = Depends(get_db)
+):
+    """Search every item the browse service has seen, without contacting Internet Archive"""
+    if not search_index_state["available"]:
+        raise HTTPException(status_code=503, detail="Local search index unavailable")
+    
+    try:
+        sort_field = sort_by if sort_by in LOCAL_SORT_FIELDS else 'relevance'
+        sort_direction = sort_order if sort_order in ['asc', 'desc'] else 'desc'
+        # Partial dates cover the whole year/month
+        date_to_bound = f"{date_to}-99" if date_to and len(date_to) < 10 else date_to
+        search = lambda: search_items(
+            db, query=query, artist=artist, venue=venue,
+            date_from=date_from, date_to=date_to_bound,
+            page=page, per_page=per_page, sort_by=sort_field, sort_order=sort_direction
+        )
+        
+        total, identifiers = await search()
+        message = "local"
+        
+        if not total and fallback and (query or artist or venue):
+            # Cold query: fetch from IA through /browse (which indexes what it
+            # stores), then answer from the index so local filters still apply
+            search_index_state["fallbacks"] += 1
+            logger.info(f"No local matches, falling back to Internet Archive for: {query}")
+            await browse_archive(
+                query=query, collection="etree", exclude_collection="stream_only",
+                date_range=None, artist=artist, venue=venue, page=1, per_page=100,
+                sort_by="relevance", sort_order="desc", view="full", fields=None, accept=None, db=db
+            )
+            total, identifiers = await search()
+            message = "internet_archive"
+        
+        items = await load_items(db, identifiers)
+        return ArchiveSearchResponse(
+            message=message,
+            total=total,
+            page=page,
+            per_page=per_page,
+            total_pages=(total + per_page - 1) // per_page,
+            results=[items[identifier] for identifier in identifiers if identifier in items]
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error searching local index: {e}")
+        raise HTTPException(status_code=500, detail="Failed to search local index")
+
 @app.get("/item/{identifier}", response_model=ArchiveItem)
 async def get_item_details(
     identifier: str,
@@ -258,40 +432,27 @@ async def get_item_details(
     try:
         # Check cache first
         cache_key = hashlib.md5(f"item:{identifier}".encode()).hexdigest()
-        cached_result = await get_cached_data(db, cache_key, 'item')
+        refresh = lambda: fetch_item_details(identifier, cache_key)
+        cached_marker = await get_cached_data(db, cache_key, 'item', refresh=refresh)
         
-        if cached_result:
-            logger.info(f"Cache hit for item: {identifier}")
-            return cached_result
+        if cached_marker:
+            cached_items = await load_items(db, [identifier])
+            if identifier in cached_items:
+                logger.info(f"Cache hit for item: {identifier}")
+                return cached_items[identifier]
         
-        # Get item metadata from Internet Archive
-        metadata_url = f"{IA_METADATA_BASE}/{identifier}"
-        logger.info(f"🌐 Getting item metadata: {metadata_url}")
+        # Concurrent identical misses share a single upstream fetch
+        await release_connection(db)
+        return await upstream_flight.do(cache_key, refresh)
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(metadata_url)
-            response.raise_for_status()
-            
-            metadata = response.json()
-            
-            # Process item details
-            item = await process_item_metadata(identifier, metadata)
-            
-            if not item:
-                raise HTTPException(status_code=404, detail="Item not found")
-            
-            # Cache the result
-            await cache_data(db, cache_key, 'item', item.model_dump())
-            
-            logger.info(f"Retrieved item details for: {identifier}")
-            return item
-            
     except httpx.TimeoutException:
         logger.error(f"Timeout while getting item details for {identifier}")
         raise HTTPException(status_code=504, detail="Internet Archive request timeout")
     except httpx.HTTPStatusError as e:
         logger.error(f"HTTP error getting item details: {e}")
         raise HTTPException(status_code=502, detail="Internet Archive service error")
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error getting item details: {e}")
         raise HTTPException(status_code=500, detail="Failed to get item details")
@@ -335,11 +496,15 @@ async def clear_cache(
     try:
         if cache_type:
             await db.execute(
-                select(CacheEntry).where(CacheEntry.cache_type == cache_type).delete()
+                delete(CacheEntry).where(CacheEntry.cache_type == cache_type)
             )
+            for key in memory_cache.keys(memory_cache_key("*", cache_type)):
+                memory_cache.delete(key)
             logger.info(f"Cleared cache entries of type: {cache_type}")
         else:
-            await db.execute(select(CacheEntry).delete())
+            await db.execute(delete(CacheEntry))
+            await clear_items(db)
+            memory_cache.flush()
             logger.info("Cleared all cache entries")
         
         await db.commit()
@@ -348,219 +513,418 @@ async def clear_cache(
         logger.error(f"Error clearing cache: {e}")
         raise HTTPException(status_code=500, detail="Failed to clear cache")
 
+@app.post("/cache/compact")
+async def compact_cache_entries():
+    """Delete expired cache entries and reclaim database space now"""
+    try:
+        return await compact_cache()
+    except Exception as e:
+        logger.error(f"Error compacting cache: {e}")
+        raise HTTPException(status_code=500, detail="Failed to compact cache")
+
 # Helper functions
-async def get_cached_data(db: AsyncSession, cache_key: str, cache_type: str):
-    """Get cached data if it exists and is not expired"""
+async def release_connection(db: AsyncSession):
+    """End the request session's read transaction, returning its connection to the pool
+
+    Requests waiting on a single-flight fetch must not hold a connection: the
+    leader needs one to store its result, and enough waiters would otherwise
+    exhaust the pool. The session reconnects if it is used again.
+    """
+    await db.close()
+
+def memory_cache_key(cache_key: str, cache_type: str) -> str:
+    """Key for the in-process tier (namespaced by cache type)"""
+    return f"{cache_type}:{cache_key}"
+
+def record_cache_access(cache_key: str):
+    """Record a cache hit; counts are written back to SQL in batches"""
+    stats = pending_access_stats.get(cache_key)
+    if stats:
+        stats[0] += 1
+        stats[1] = datetime.utcnow()
+    else:
+        pending_access_stats[cache_key] = [1, datetime.utcnow()]
+
+async def flush_access_stats():
+    """Write batched access counts back to the CacheEntry table in one transaction"""
+    global pending_access_stats
+    if not pending_access_stats:
+        return
+    
+    batch, pending_access_stats = pending_access_stats, {}
     try:
-        result = await db.execute(
-            select(CacheEntry)
-            .where(
-                and_(
-                    CacheEntry.cache_key == cache_key,
-                    CacheEntry.cache_type == cache_type,
-                    CacheEntry.expires_at > datetime.utcnow()
+        async with AsyncSessionLocal() as db:
+            for cache_key, (count, last_accessed) in batch.items():
+                await db.execute(
+                    update(CacheEntry)
+                    .where(CacheEntry.cache_key == cache_key)
+                    .values(
+                        access_count=CacheEntry.access_count + count,
+                        last_accessed=last_accessed
+                    )
                 )
-            )
-        )
-        entry = result.scalar_one_or_none()
-        
-        if entry:
-            # Update access count and last accessed time
-            entry.access_count += 1
-            entry.last_accessed = datetime.utcnow()
             await db.commit()
-            
-            return json.loads(entry.cache_data)
-        
-        return None
+        logger.info(f"Flushed access stats for {len(batch)} cache entries")
     except Exception as e:
-        logger.error(f"Error getting cached data: {e}")
-        return None
+        logger.error(f"Error flushing cache access stats: {e}")
+
+async def access_stats_flush_loop():
+    """Periodically flush batched cache access statistics"""
+    while True:
+        await asyncio.sleep(ACCESS_STATS_FLUSH_SECONDS)
+        await flush_access_stats()
+
+def cache_durations(cache_type: str) -> dict:
+    """Soft and hard TTL (minutes) for a cache type"""
+    return CACHE_DURATION_MINUTES.get(cache_type, DEFAULT_CACHE_DURATION_MINUTES)
+
+def stale_window(cache_type: str) -> timedelta:
+    """Time between an entry going stale (soft TTL) and expiring (hard TTL)"""
+    durations = cache_durations(cache_type)
+    return timedelta(minutes=durations['hard'] - durations['soft'])
+
+def schedule_refresh(cache_key: str, refresh: Callable[[], Awaitable[Any]], proactive: bool = False):
+    """Refresh a cache entry in the background (at most one refresh per key)"""
+    if cache_key in pending_refreshes or upstream_flight.is_in_flight(cache_key):
+        return
+    pending_refreshes.add(cache_key)
+    
+    async def run_refresh():
+        try:
+            await upstream_flight.do(cache_key, refresh)
+        except Exception as e:
+            refresh_stats["failed"] += 1
+            logger.warning(f"Background refresh failed for key {cache_key}: {e}")
+        finally:
+            pending_refreshes.discard(cache_key)
+    
+    refresh_stats["proactive" if proactive else "scheduled"] += 1
+    task = asyncio.create_task(run_refresh())
+    background_refreshes.add(task)
+    task.add_done_callback(background_refreshes.discard)
+
+async def refresh_hot_keys():
+    """Refresh frequently accessed entries that are about to go stale"""
+    now = datetime.utcnow()
+    refresh_ahead = timedelta(seconds=HOT_KEY_REFRESH_AHEAD_SECONDS)
+    scheduled = 0
+    
+    async with AsyncSessionLocal() as db:
+        for cache_type in CACHE_DURATION_MINUTES:
+            # Soft deadline = expires_at - stale window
+            result = await db.execute(
+                select(CacheEntry.cache_key)
+                .where(
+                    and_(
+                        CacheEntry.cache_type == cache_type,
+                        CacheEntry.access_count >= HOT_KEY_MIN_ACCESSES,
+                        CacheEntry.expires_at > now,
+                        CacheEntry.expires_at < now + stale_window(cache_type) + refresh_ahead
+                    )
+                )
+                .order_by(CacheEntry.access_count.desc())
+                .limit(HOT_KEY_MAX_REFRESHES_PER_SCAN)
+            )
+            for cache_key in result.scalars().all():
+                if scheduled >= HOT_KEY_MAX_REFRESHES_PER_SCAN:
+                    return
+                refresh = refresh_registry.get(cache_key)
+                if refresh and cache_key not in pending_refreshes and not upstream_flight.is_in_flight(cache_key):
+                    schedule_refresh(cache_key, refresh, proactive=True)
+                    scheduled += 1
+    
+    if scheduled:
+        logger.info(f"Proactively refreshing {scheduled} hot cache entries")
+
+async def hot_key_refresh_loop():
+    """Periodically refresh hot keys ahead of their soft TTL"""
+    while True:
+        await asyncio.sleep(HOT_KEY_SCAN_SECONDS)
+        try:
+            await refresh_hot_keys()
+        except Exception as e:
+            logger.error(f"Error refreshing hot cache keys: {e}")
+
+async def get_cached_data(
+    db: AsyncSession,
+    cache_key: str,
+    cache_type: str,
+    refresh: Optional[Callable[[], Awaitable[Any]]] = None
+):
+    """Get cached data if it exists and has not passed its hard TTL
+    
+    Checks the in-process LRU tier first, then falls back to the CacheEntry
+    table (read-only) and promotes the decoded payload into memory. Stale
+    entries are returned as-is and, when a refresh callable is given, a
+    background refresh is scheduled.
+    """
+    if refresh:
+        refresh_registry.set(cache_key, refresh, expire=cache_durations(cache_type)['hard'] * 60)
+    
+    mem_key = memory_cache_key(cache_key, cache_type)
+    cached = memory_cache.get(mem_key)
+    if cached is None:
+        try:
+            result = await db.execute(
+                select(CacheEntry)
+                .where(
+                    and_(
+                        CacheEntry.cache_key == cache_key,
+                        CacheEntry.cache_type == cache_type,
+                        CacheEntry.expires_at > datetime.utcnow()
+                    )
+                )
+            )
+            entry = result.scalar_one_or_none()
+            if not entry:
+                return None
+            
+            cached = {
+                "data": decode_payload(entry.cache_data),
+                "fresh_until": entry.expires_at - stale_window(cache_type)
+            }
+            ttl = int((entry.expires_at - datetime.utcnow()).total_seconds())
+            if ttl > 0:
+                memory_cache.set(mem_key, cached, expire=ttl)
+        except Exception as e:
+            logger.error(f"Error getting cached data: {e}")
+            return None
+    
+    record_cache_access(cache_key)
+    
+    if datetime.utcnow() >= cached["fresh_until"]:
+        refresh_stats["stale_served"] += 1
+        if refresh:
+            schedule_refresh(cache_key, refresh)
+    
+    return cached["data"]
 
 async def cache_data(db: AsyncSession, cache_key: str, cache_type: str, data: dict):
-    """Cache data with appropriate expiration"""
+    """Cache data with soft (fresh) and hard (servable) expiration"""
     try:
-        # Calculate expiration time
-        duration_minutes = CACHE_DURATION_MINUTES.get(cache_type, 30)
-        expires_at = datetime.utcnow() + timedelta(minutes=duration_minutes)
+        # Calculate expiration times
+        durations = cache_durations(cache_type)
+        now = datetime.utcnow()
+        fresh_until = now + timedelta(minutes=durations['soft'])
+        expires_at = now + timedelta(minutes=durations['hard'])
+        
+        payload = encode_payload(data)
+        memory_cache.set(
+            memory_cache_key(cache_key, cache_type),
+            {"data": data, "fresh_until": fresh_until},
+            expire=durations['hard'] * 60
+        )
         
-        # Create or update cache entry
-        cache_entry = CacheEntry(
+        # Upsert on cache_key so stale or expired rows are replaced in place
+        stmt = sqlite_insert(CacheEntry).values(
             cache_key=cache_key,
-            cache_data=json.dumps(data),
+            cache_data=payload,
             cache_type=cache_type,
             expires_at=expires_at
         )
-        
-        db.add(cache_entry)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[CacheEntry.cache_key],
+            set_={
+                "cache_data": stmt.excluded.cache_data,
+                "cache_type": stmt.excluded.cache_type,
+                "expires_at": stmt.excluded.expires_at,
+                "created_at": func.now()
+            }
+        )
+        await db.execute(stmt)
         await db.commit()
         
         logger.info(f"Cached data for key: {cache_key}, type: {cache_type}")
     except Exception as e:
         logger.error(f"Error caching data: {e}")
 
-async def process_archive_item(doc: dict) -> Optional[ArchiveItem]:
-    """Process a single Internet Archive item from search results"""
-    try:
-        identifier = doc.get("identifier")
-        if not identifier:
-            return None
-        
-        # Extract basic information
-        title = doc.get("title", "Unknown Title")
-        artist = doc.get("creator")
-        date_str = doc.get("date")
-        
-        # Parse date
-        date = None
-        if date_str:
-            try:
-                if len(str(date_str)) == 4:  # Just year
-                    date = datetime.strptime(str(date_str), "%Y")
-                elif len(str(date_str)) >= 10:  # Full date
-                    date = datetime.strptime(str(date_str)[:10], "%Y-%m-%d")
-            except ValueError:
-                pass
-        
-        # Extract venue and location from title and description
-        # Internet Archive doesn't have dedicated venue/location fields, so we need to parse them
-        title_text = doc.get("title", "")
-        description_text = doc.get("description", "")
-        
-        venue = None
-        location = None
-        
-        # Extract venue and location from title
-        # Pattern: "Artist Live at VENUE, LOCATION on DATE"
-        import re
-        
-        # Simple approach: find everything between "at" and "on" (or end of string)
-        at_pattern = r"(?:Live\s+)?at\s+(.+?)(?:\s+on\s+\d{4}-\d{2}-\d{2}|\s*$)"
-        match = re.search(at_pattern, title_text, re.IGNORECASE)
-        
-        if match:
-            venue_location_part = match.group(1).strip()
-            
-            # Split by first comma to separate venue and location
-            if "," in venue_location_part:
-                parts = venue_location_part.split(",", 1)
-                venue = parts[0].strip()
-                location = parts[1].strip()
-            else:
-                venue = venue_location_part
-                location = None
-        
-        # If venue not found in title, try description
-        if not venue and description_text:
-            # Look for venue in description (often mentioned in first few lines)
-            lines = description_text.split('\n')
-            for line in lines[:3]:  # Check first 3 lines
-                venue_match = re.search(r'([A-Z][a-z\s]+(?:Amphitheater|Theater|Arena|Stadium|Center|Hall|Club|Bar|Resort|Festival))', line)
-                if venue_match:
-                    venue = venue_match.group(1).strip()
-                    break
-        
-        # Clean up venue name
-        if venue:
-            # Remove common suffixes and clean up
-            venue = re.sub(r'\s+on\s+\d{4}-\d{2}-\d{2}$', '', venue)
-            venue = re.sub(r'\s*-\s*[^-]+$', '', venue)  # Remove city/state suffix
-            venue = venue.strip()
+async def compact_cache() -> dict:
+    """Delete expired cache rows in batches and return freed pages to the filesystem"""
+    started = datetime.utcnow()
+    pages_before = await DatabaseUtils.get_page_stats()
+    rows_deleted = 0
+    payload_bytes = 0
+    
+    async with AsyncSessionLocal() as db:
+        while True:
+            expired_ids = select(CacheEntry.id).where(
+                CacheEntry.expires_at < started
+            ).limit(COMPACTION_BATCH_SIZE).scalar_subquery()
             
-            # Remove common words that aren't part of venue name
-            venue = re.sub(r'\b(?:Festival|Resort|Resort)\b', '', venue).strip()
-        
-        # Get file information
-        files = doc.get("files", [])
-        audio_files = [f for f in files if f.get("format") in ["VBR MP3", "Flac", "Ogg Vorbis", "WAVE"]]
-        
-        # Create tracks list
-        tracks = []
-        for file_info in audio_files[:10]:  # Limit to first 10 tracks for preview
-            track = ArchiveTrack(
-                title=file_info.get("title", file_info.get("name", "Unknown Track")),
-                filename=file_info.get("name", ""),
-                file_format=file_info.get("format"),
-                file_size=file_info.get("size"),
-                duration=file_info.get("length"),
-                download_url=f"https://archive.org/download/{identifier}/{file_info.get('name', '')}"
+            size_result = await db.execute(
+                select(func.count(), func.coalesce(func.sum(func.length(CacheEntry.cache_data)), 0))
+                .where(CacheEntry.id.in_(expired_ids))
             )
-            tracks.append(track)
-        
-        return ArchiveItem(
-            identifier=identifier,
-            title=title,
-            artist=artist,
-            date=date,
-            venue=venue,
-            location=location,
-            description=doc.get("description"),
-            source=doc.get("source"),
-            taper=doc.get("taper"),
-            lineage=doc.get("lineage"),
-            total_tracks=len(audio_files),
-            total_size=sum(f.get("size", 0) for f in audio_files),
-            tracks=tracks if tracks else None,
-            # Add engagement statistics
-            downloads=doc.get("downloads", 0)
-        )
+            batch_rows, batch_bytes = size_result.one()
+            if not batch_rows:
+                break
+            
+            await db.execute(delete(CacheEntry).where(CacheEntry.id.in_(expired_ids)))
+            await db.commit()
+            rows_deleted += batch_rows
+            payload_bytes += batch_bytes
+            
+            if batch_rows < COMPACTION_BATCH_SIZE:
+                break
         
+        # Items older than the longest hard TTL can't be referenced by a live page
+        max_hard_minutes = max(d['hard'] for d in CACHE_DURATION_MINUTES.values())
+        item_rows_deleted = await prune_items(db, started - timedelta(minutes=max_hard_minutes))
+    
+    if compaction_stats["incremental_vacuum"]:
+        await DatabaseUtils.incremental_vacuum()
+    pages_after = await DatabaseUtils.get_page_stats()
+    file_bytes = max(0, pages_before["file_size_bytes"] - pages_after["file_size_bytes"])
+    
+    compaction_stats["runs"] += 1
+    compaction_stats["last_run"] = started.isoformat()
+    compaction_stats["last_rows_deleted"] = rows_deleted
+    compaction_stats["last_bytes_reclaimed"] = file_bytes
+    compaction_stats["total_rows_deleted"] += rows_deleted
+    compaction_stats["total_item_rows_deleted"] += item_rows_deleted
+    compaction_stats["total_payload_bytes_deleted"] += payload_bytes
+    compaction_stats["total_bytes_reclaimed"] += file_bytes
+    
+    logger.info(f"Cache compaction removed {rows_deleted} expired rows and {item_rows_deleted} items, reclaimed {file_bytes} bytes")
+    return {
+        "rows_deleted": rows_deleted,
+        "item_rows_deleted": item_rows_deleted,
+        "payload_bytes_deleted": payload_bytes,
+        "bytes_reclaimed": file_bytes
+    }
+
+async def compaction_loop():
+    """Periodically compact the cache table"""
+    while True:
+        await asyncio.sleep(COMPACTION_INTERVAL_SECONDS)
+        try:
+            await compact_cache()
+        except Exception as e:
+            logger.error(f"Error compacting cache: {e}")
+
+async def assemble_search_page(db: AsyncSession, page: dict) -> Optional[dict]:
+    """Build a search response from a cached identifier list with one batched item lookup"""
+    if "identifiers" not in page:
+        return page  # Entry written before the normalized item store
+    
+    identifiers = page["identifiers"]
+    items = await load_items(db, identifiers)
+    if len(items) < len(set(identifiers)):
+        return None  # Item records pruned; treat as a miss
+    
+    result = {key: value for key, value in page.items() if key != "identifiers"}
+    result["results"] = [items[identifier] for identifier in identifiers]
+    return result
+
+def project_search_page(page, projection: Optional[tuple]):
+    """Apply a field projection to a search page
+
+    Projected pages skip response_model validation (their items may omit
+    required fields) and are returned as plain JSON.
+    """
+    if projection is None:
+        return page
+    if isinstance(page, BaseModel):
+        page = page.model_dump(mode="json")
+    result = {"success": True, "message": None, **page}
+    result["results"] = [project(item, projection) for item in page["results"]]
+    return JSONResponse(content=result)
+
+# Upstream fetches (run under single-flight, so they use their own DB session)
+async def fetch_item_metadata(identifier: str) -> dict:
+    """Fetch raw item metadata from Internet Archive"""
+    client = get_http_client(ARCHIVE)
+    response = await client.get(f"{IA_METADATA_BASE}/{identifier}")
+    response.raise_for_status()
+    return response.json()
+
+async def fetch_search_docs(ia_url: str) -> Tuple[List[dict], int]:
+    """Query Internet Archive advancedsearch; returns (docs, total)"""
+    client = get_http_client(ARCHIVE)
+    response = await client.get(ia_url)
+    response.raise_for_status()
+    
+    data = response.json()
+    return data.get("response", {}).get("docs", []), data.get("response", {}).get("numFound", 0)
+
+def search_page_header(total: int, page: int, per_page: int) -> dict:
+    """Page fields of a search response (everything but the results)"""
+    return {
+        "total": total,
+        "page": page,
+        "per_page": per_page,
+        "total_pages": (total + per_page - 1) // per_page
+    }
+
+async def store_search_page(cache_key: str, header: dict, items: List[dict]):
+    """Store items once by identifier; the page caches only the ordered identifiers
+
+    Best effort, like cache_data: a failed write is logged and the fetched
+    page is still served.
+    """
+    try:
+        async with AsyncSessionLocal() as db:
+            await store_items(db, items, 'search')
+            await cache_data(db, cache_key, 'search', {**header, "identifiers": [item["identifier"] for item in items]})
     except Exception as e:
-        logger.error(f"Error processing archive item: {e}")
-        return None
+        logger.error(f"Error storing search page: {e}")
+
+async def fetch_search_results(ia_url: str, cache_key: str, page: int, per_page: int) -> ArchiveSearchResponse:
+    """Query Internet Archive advancedsearch and cache the processed page"""
+    docs, total = await fetch_search_docs(ia_url)
+    
+    # Process results in one batch (offloaded to worker processes for large pages)
+    items = await normalize_search_page(docs)
+    
+    # Create response
+    header = search_page_header(total, page, per_page)
+    result = ArchiveSearchResponse(**header, results=items)
+    await store_search_page(cache_key, header, [item.model_dump(mode="json") for item in items])
+    
+    logger.info(f"Browse query returned {len(items)} items from {total} total")
+    return result
+
+async def stream_search_results(docs: List[dict], cache_key: str, header: dict, projection: Optional[tuple]):
+    """Yield items as their chunk is normalized, then cache the page"""
+    items = []
+    async for batch in iter_search_page(docs):
+        for item in batch:
+            data = item.model_dump(mode="json")
+            items.append(data)
+            yield project(data, projection)
+    
+    await store_search_page(cache_key, header, items)
+    logger.info(f"Browse query streamed {len(items)} items from {header['total']} total")
+
+async def fetch_item_details(identifier: str, cache_key: str) -> ArchiveItem:
+    """Fetch item metadata from Internet Archive and cache the processed item"""
+    logger.info(f"🌐 Getting item metadata: {IA_METADATA_BASE}/{identifier}")
+    metadata = await fetch_item_metadata(identifier)
+    
+    # Process item details
+    item = await process_item_metadata(identifier, metadata)
+    
+    if not item:
+        raise HTTPException(status_code=404, detail="Item not found")
+    
+    # Update the shared item record (every cached page referencing it sees the
+    # new data); the cache entry only tracks freshness
+    try:
+        async with AsyncSessionLocal() as db:
+            merged = await store_items(db, [item.model_dump(mode="json")], 'metadata')
+            await cache_data(db, cache_key, 'item', {"identifier": identifier})
+    except Exception as e:
+        # Best effort: serve the fetched item even if it couldn't be stored
+        logger.error(f"Error storing item {identifier}: {e}")
+        return item
+    
+    logger.info(f"Retrieved item details for: {identifier}")
+    return merged[0]
 
 async def process_item_metadata(identifier: str, metadata: dict) -> Optional[ArchiveItem]:
     """Process detailed item metadata from Internet Archive"""
     try:
-        files = metadata.get("files", [])
-        audio_files = [f for f in files if f.get("format") in ["VBR MP3", "Flac", "Ogg Vorbis", "WAVE"]]
-        
-        # Extract metadata
-        item_metadata = metadata.get("metadata", {})
-        title = item_metadata.get("title", "Unknown Title")
-        artist = item_metadata.get("creator")
-        date_str = item_metadata.get("date")
-        
-        # Parse date
-        date = None
-        if date_str:
-            try:
-                if len(str(date_str)) == 4:  # Just year
-                    date = datetime.strptime(str(date_str), "%Y")
-                elif len(str(date_str)) >= 10:  # Full date
-                    date = datetime.strptime(str(date_str)[:10], "%Y-%m-%d")
-            except ValueError:
-                pass
-        
-        # Create tracks list
-        tracks = []
-        for file_info in audio_files:
-            track = ArchiveTrack(
-                title=file_info.get("title", file_info.get("name", "Unknown Track")),
-                filename=file_info.get("name", ""),
-                file_format=file_info.get("format"),
-                file_size=file_info.get("size"),
-                duration=file_info.get("length"),
-                download_url=f"https://archive.org/download/{identifier}/{file_info.get('name', '')}"
-            )
-            tracks.append(track)
-        
-        return ArchiveItem(
-            identifier=identifier,
-            title=title,
-            artist=artist,
-            date=date,
-            venue=item_metadata.get("venue"),
-            location=item_metadata.get("location"),
-            description=item_metadata.get("description"),
-            source=item_metadata.get("source"),
-            taper=item_metadata.get("taper"),
-            lineage=item_metadata.get("lineage"),
-            total_tracks=len(audio_files),
-            total_size=sum(f.get("size", 0) for f in audio_files),
-            tracks=tracks
-        )
-        
+        return build_item(normalize_item_metadata(identifier, metadata))
     except Exception as e:
         logger.error(f"Error processing item metadata: {e}")
         return None
@@ -594,11 +958,13 @@ async def get_directory_structure(
     try:
         logger.info(f"Fetching directory structure for {identifier}")
         
-        # Fetch metadata from Internet Archive
-        async with httpx.AsyncClient() as client:
-            response = await client.get(f"{IA_METADATA_BASE}/{identifier}")
-            response.raise_for_status()
-            metadata = response.json()
+        # Fetch metadata from Internet Archive, sharing concurrent identical fetches
+        flight_key = hashlib.md5(f"directory:{identifier}".encode()).hexdigest()
+        await release_connection(db)
+        metadata = await upstream_flight.do(
+            flight_key,
+            lambda: fetch_item_metadata(identifier)
+        )
         
         files_data = metadata.get("files", [])
         logger.info(f"Found {len(files_data)} files for {identifier}")
@@ -0,0 +1,220 @@
+import os
+import asyncio
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional
+
+from shared.models import ArchiveItem
+from shared.venue_parser import parse_venue_locations
+
+logger = logging.getLogger(__name__)
+
+# Pages with at least this many docs are normalized in worker processes so the
+# event loop keeps serving other requests; 0 disables offloading
+NORMALIZE_PROCESS_THRESHOLD = int(os.getenv("BROWSE_NORMALIZE_PROCESS_THRESHOLD", "100"))
+NORMALIZE_PROCESS_WORKERS = int(os.getenv("BROWSE_NORMALIZE_PROCESS_WORKERS", str(min(4, os.cpu_count() or 1))))
+NORMALIZE_CHUNK_SIZE = int(os.getenv("BROWSE_NORMALIZE_CHUNK_SIZE", "50"))
+
+AUDIO_FORMATS = ("VBR MP3", "Flac", "Ogg Vorbis", "WAVE")
+SEARCH_TRACK_PREVIEW = 10  # Search results list at most this many tracks
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+normalize_stats = {"pages": 0, "docs": 0, "offloaded_pages": 0, "skipped_docs": 0}
+
+# Field coercion: IA returns repeated fields as lists and numbers as strings
+def first_text(value: Any, default: Optional[str] = None) -> Optional[str]:
+    if isinstance(value, list):
+        value = value[0] if value else None
+    return str(value) if value is not None else default
+
+def joined_text(value: Any) -> Optional[str]:
+    if isinstance(value, list):
+        return "\n".join(str(v) for v in value) if value else None
+    return str(value) if value is not None else None
+
+def to_int(value: Any) -> Optional[int]:
+    """Non-negative int from an int/float/numeric string, else None"""
+    if type(value) is int:
+        return value if value >= 0 else None
+    try:
+        number = int(float(value))
+    except (TypeError, ValueError):
+        return None
+    return number if number >= 0 else None
+
+def parse_duration(value: Any) -> Optional[int]:
+    """Track length in seconds from '312.45', '5:12' or '1:02:03'"""
+    if value is None:
+        return None
+    text = str(value)
+    if ":" in text:
+        seconds = 0
+        try:
+            for part in text.split(":"):
+                seconds = seconds * 60 + float(part)
+        except ValueError:
+            return None
+        return int(seconds)
+    return to_int(text)
+
+def parse_item_date(value: Any) -> Optional[datetime]:
+    """Concert date from YYYY or YYYY-MM-DD[...]"""
+    date_str = first_text(value)
+    if not date_str:
+        return None
+    try:
+        if len(date_str) == 4:  # Just year
+            return datetime(int(date_str), 1, 1)
+        if len(date_str) >= 10:  # Full date
+            return datetime(int(date_str[0:4]), int(date_str[5:7]), int(date_str[8:10]))
+    except ValueError:
+        pass
+    return None
+
+def normalize_tracks(identifier: str, files: List[dict], limit: Optional[int] = None) -> tuple:
+    """Audio tracks as ArchiveTrack field dicts, plus total count and size"""
+    audio_files = [f for f in files if f.get("format") in AUDIO_FORMATS]
+    tracks = []
+    for file_info in audio_files[:limit] if limit else audio_files:
+        name = first_text(file_info.get("name"), "")
+        tracks.append({
+            "track_number": None,
+            "title": first_text(file_info.get("title")) or name or "Unknown Track",
+            "filename": name,
+            "file_format": file_info.get("format"),
+            "file_size": to_int(file_info.get("size")),
+            "duration": parse_duration(file_info.get("length")),
+            "download_url": f"https://archive.org/download/{identifier}/{name}"
+        })
+    total_size = sum(to_int(f.get("size")) or 0 for f in audio_files)
+    return tracks, len(audio_files), total_size
+
+def normalize_search_doc(doc: dict, identifier: str, venue: Optional[str], location: Optional[str]) -> Dict[str, Any]:
+    """ArchiveItem field dicts for one advancedsearch doc"""
+    tracks, total_tracks, total_size = normalize_tracks(
+        identifier, doc.get("files") or [], limit=SEARCH_TRACK_PREVIEW
+    )
+    return {
+        "identifier": identifier,
+        "title": first_text(doc.get("title"), "Unknown Title"),
+        "artist": first_text(doc.get("creator")),
+        "date": parse_item_date(doc.get("date")),
+        "venue": venue or first_text(doc.get("venue")),
+        "location": location or first_text(doc.get("coverage")),
+        "description": joined_text(doc.get("description")),
+        "source": first_text(doc.get("source")),
+        "taper": first_text(doc.get("taper")),
+        "lineage": first_text(doc.get("lineage")),
+        "total_tracks": total_tracks,
+        "total_size": total_size,
+        "tracks": tracks or None,
+        "downloads": to_int(doc.get("downloads")) or 0
+    }
+
+def normalize_search_docs(docs: List[dict]) -> List[Dict[str, Any]]:
+    """Turn a page of advancedsearch docs into ArchiveItem field dicts in one pass
+
+    Plain data in and out, so it can run in a worker process. Docs that
+    can't be normalized are logged and left out.
+    """
+    items = []
+    docs = [doc for doc in docs if isinstance(doc, dict)]
+    for doc, (venue, location) in zip(docs, parse_venue_locations(docs)):
+        identifier = first_text(doc.get("identifier"))
+        if not identifier:
+            continue
+        try:
+            items.append(normalize_search_doc(doc, identifier, venue, location))
+        except Exception as e:
+            logger.error(f"Error processing archive item {identifier}: {e}")
+    return items
+
+def normalize_item_metadata(identifier: str, metadata: dict) -> Dict[str, Any]:
+    """Turn a metadata API response into ArchiveItem field dicts"""
+    item_metadata = metadata.get("metadata", {})
+    tracks, total_tracks, total_size = normalize_tracks(identifier, metadata.get("files", []))
+    return {
+        "identifier": identifier,
+        "title": first_text(item_metadata.get("title"), "Unknown Title"),
+        "artist": first_text(item_metadata.get("creator")),
+        "date": parse_item_date(item_metadata.get("date")),
+        "venue": first_text(item_metadata.get("venue")),
+        "location": first_text(item_metadata.get("location")),
+        "description": joined_text(item_metadata.get("description")),
+        "source": first_text(item_metadata.get("source")),
+        "taper": first_text(item_metadata.get("taper")),
+        "lineage": first_text(item_metadata.get("lineage")),
+        "total_tracks": total_tracks,
+        "total_size": total_size,
+        "tracks": tracks,
+        "downloads": 0
+    }
+
+def build_item(fields: Dict[str, Any]) -> ArchiveItem:
+    """ArchiveItem from normalized fields
+
+    Fields are already coerced, so validation is a straight pass through
+    pydantic-core; that measured faster than model_construct, whose per-field
+    Python loop costs more than the compiled validator (benchmarks/bench_normalize.py).
+    """
+    return ArchiveItem.model_validate(fields)
+
+def build_items(fields_list: List[Dict[str, Any]]) -> List[ArchiveItem]:
+    """ArchiveItems from normalized fields, logging and leaving out any that don't validate"""
+    items = []
+    for fields in fields_list:
+        try:
+            items.append(build_item(fields))
+        except Exception as e:
+            logger.error(f"Error processing archive item {fields.get('identifier')}: {e}")
+    return items
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """Worker pool, started on first offloaded page"""
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(max_workers=NORMALIZE_PROCESS_WORKERS)
+        logger.info(f"Started normalization pool with {NORMALIZE_PROCESS_WORKERS} workers")
+    return _process_pool
+
+def shutdown_process_pool():
+    """Stop the worker pool"""
+    global _process_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=False, cancel_futures=True)
+        _process_pool = None
+
+async def iter_search_page(docs: List[dict]) -> AsyncIterator[List[ArchiveItem]]:
+    """Normalize a page of docs chunk by chunk, in worker processes for large pages
+
+    Chunks are yielded in order as soon as each is ready, so callers can
+    stream results before the whole page is done.
+    """
+    normalize_stats["pages"] += 1
+    normalize_stats["docs"] += len(docs)
+    chunks = [docs[i:i + NORMALIZE_CHUNK_SIZE] for i in range(0, len(docs), NORMALIZE_CHUNK_SIZE)]
+
+    pending = None
+    if NORMALIZE_PROCESS_THRESHOLD and len(docs) >= NORMALIZE_PROCESS_THRESHOLD:
+        normalize_stats["offloaded_pages"] += 1
+        loop = asyncio.get_running_loop()
+        pool = get_process_pool()
+        pending = [loop.run_in_executor(pool, normalize_search_docs, chunk) for chunk in chunks]
+
+    for index, chunk in enumerate(chunks):
+        fields = await pending[index] if pending else normalize_search_docs(chunk)
+        # Model building stays in this process; yield to the loop between
+        # chunks so other requests aren't stalled behind a large page
+        items = build_items(fields)
+        normalize_stats["skipped_docs"] += len(chunk) - len(items)
+        yield items
+        if len(chunks) > 1:
+            await asyncio.sleep(0)
+
+async def normalize_search_page(docs: List[dict]) -> List[ArchiveItem]:
+    """Normalize a page of docs, in worker processes for large pages"""
+    items = []
+    async for batch in iter_search_page(docs):
+        items.extend(batch)
+    return items
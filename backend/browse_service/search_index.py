@@ -0,0 +1,241 @@
+import re
+import logging
+from typing import List, Optional, Tuple
+from sqlalchemy import select, delete, func, text, bindparam
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from shared.database import engine, AsyncSessionLocal
+from shared.database_models import ArchiveItemRecord, ArchiveSearchDocument
+from shared.serialization import decode_payload
+
+logger = logging.getLogger(__name__)
+
+# Full-text index over every item the browse service has stored. Filterable
+# fields live in archive_search_documents; the FTS5 table shares its rowids.
+FTS_TABLE = "archive_search_fts"
+FTS_COLUMNS = ("title", "creator", "venue", "location", "description")
+# bm25 column weights, in FTS_COLUMNS order
+FTS_WEIGHTS = (10.0, 5.0, 3.0, 2.0, 1.0)
+REBUILD_BATCH_SIZE = 500
+
+search_index_state = {"available": False, "queries": 0, "fallbacks": 0}
+
+LOCAL_SORT_FIELDS = ("relevance", "date", "downloads")
+
+async def ensure_search_index() -> bool:
+    """Create the FTS5 table and backfill it from the item store if it is empty"""
+    try:
+        async with engine.begin() as conn:
+            await conn.execute(text(
+                f"CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5("
+                f"{', '.join(FTS_COLUMNS)}, tokenize='unicode61 remove_diacritics 2')"
+            ))
+    except Exception as e:
+        logger.warning(f"SQLite FTS5 unavailable, local search disabled: {e}")
+        search_index_state["available"] = False
+        return False
+
+    search_index_state["available"] = True
+    async with AsyncSessionLocal() as db:
+        indexed = await count_indexed(db)
+        stored = (await db.execute(select(func.count(ArchiveItemRecord.identifier)))).scalar() or 0
+        if stored and not indexed:
+            await rebuild_search_index(db)
+    return True
+
+async def rebuild_search_index(db: AsyncSession) -> int:
+    """Re-index every stored item"""
+    await clear_search_index(db)
+    indexed = 0
+    last_identifier = ""
+    while True:
+        result = await db.execute(
+            select(ArchiveItemRecord.identifier, ArchiveItemRecord.item_data)
+            .where(ArchiveItemRecord.identifier > last_identifier)
+            .order_by(ArchiveItemRecord.identifier)
+            .limit(REBUILD_BATCH_SIZE)
+        )
+        rows = result.all()
+        if not rows:
+            break
+        await index_items(db, [decode_payload(item_data) for _, item_data in rows])
+        await db.commit()
+        indexed += len(rows)
+        last_identifier = rows[-1][0]
+
+    logger.info(f"Rebuilt local search index with {indexed} items")
+    return indexed
+
+def document_fields(item: dict) -> dict:
+    """Filterable columns for an item"""
+    return {
+        "identifier": item["identifier"],
+        "artist": item.get("artist"),
+        "venue": item.get("venue"),
+        "date": (item.get("date") or "")[:10] or None,
+        "downloads": item.get("downloads") or 0
+    }
+
+async def index_items(db: AsyncSession, items: List[dict]):
+    """Add or replace items in the index (the caller commits)"""
+    if not items or not search_index_state["available"]:
+        return
+
+    identifiers = [item["identifier"] for item in items]
+    delete_fts = text(f"DELETE FROM {FTS_TABLE} WHERE rowid IN :ids").bindparams(
+        bindparam("ids", expanding=True)
+    )
+    existing = await db.execute(
+        select(ArchiveSearchDocument.id).where(ArchiveSearchDocument.identifier.in_(identifiers))
+    )
+    existing_ids = existing.scalars().all()
+    if existing_ids:
+        await db.execute(delete_fts, {"ids": existing_ids})
+
+    stmt = sqlite_insert(ArchiveSearchDocument)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[ArchiveSearchDocument.identifier],
+        set_={
+            "artist": stmt.excluded.artist,
+            "venue": stmt.excluded.venue,
+            "date": stmt.excluded.date,
+            "downloads": stmt.excluded.downloads,
+            "indexed_at": func.now()
+        }
+    )
+    await db.execute(stmt, [document_fields(item) for item in items])
+
+    result = await db.execute(
+        select(ArchiveSearchDocument.identifier, ArchiveSearchDocument.id)
+        .where(ArchiveSearchDocument.identifier.in_(identifiers))
+    )
+    rowids = dict(result.all())
+    await db.execute(
+        text(f"INSERT INTO {FTS_TABLE} (rowid, {', '.join(FTS_COLUMNS)}) "
+             f"VALUES (:rowid, :title, :creator, :venue, :location, :description)"),
+        [
+            {
+                "rowid": rowids[item["identifier"]],
+                "title": item.get("title") or "",
+                "creator": item.get("artist") or "",
+                "venue": item.get("venue") or "",
+                "location": item.get("location") or "",
+                "description": item.get("description") or ""
+            }
+            for item in items
+        ]
+    )
+
+async def unindex_missing_items(db: AsyncSession) -> int:
+    """Drop index entries whose item record was pruned"""
+    if not search_index_state["available"]:
+        return 0
+
+    orphans = select(ArchiveSearchDocument.id).where(
+        ArchiveSearchDocument.identifier.not_in(select(ArchiveItemRecord.identifier))
+    )
+    orphan_ids = (await db.execute(orphans)).scalars().all()
+    if orphan_ids:
+        await db.execute(
+            text(f"DELETE FROM {FTS_TABLE} WHERE rowid IN :ids").bindparams(bindparam("ids", expanding=True)),
+            {"ids": orphan_ids}
+        )
+        await db.execute(delete(ArchiveSearchDocument).where(ArchiveSearchDocument.id.in_(orphan_ids)))
+    await db.commit()
+    return len(orphan_ids)
+
+async def count_indexed(db: AsyncSession) -> int:
+    """Number of indexed items"""
+    result = await db.execute(select(func.count(ArchiveSearchDocument.id)))
+    return result.scalar() or 0
+
+async def clear_search_index(db: AsyncSession):
+    """Delete every index entry (the caller commits)"""
+    if not search_index_state["available"]:
+        return
+    await db.execute(text(f"DELETE FROM {FTS_TABLE}"))
+    await db.execute(delete(ArchiveSearchDocument))
+
+def fts_phrase(value: str, prefix: bool = False) -> Optional[str]:
+    """Quote the words of value as FTS5 strings so user input can't inject query syntax"""
+    words = re.findall(r"\w+", value)
+    if not words:
+        return None
+    terms = [f'"{word}"' for word in words]
+    if prefix:
+        terms[-1] += "*"  # Match partially typed last word
+    return " ".join(terms)
+
+def build_match_expression(query: Optional[str], artist: Optional[str], venue: Optional[str]) -> Optional[str]:
+    """Combine the free-text query with column-scoped artist/venue filters"""
+    clauses = []
+    if query:
+        terms = fts_phrase(query, prefix=True)
+        if terms:
+            clauses.append(f"({terms})")
+    if artist:
+        phrase = fts_phrase(artist)
+        if phrase:
+            clauses.append(f'creator : ({phrase})')
+    if venue:
+        phrase = fts_phrase(venue)
+        if phrase:
+            clauses.append(f'venue : ({phrase})')
+    return " AND ".join(clauses) or None
+
+async def search_items(
+    db: AsyncSession,
+    query: Optional[str] = None,
+    artist: Optional[str] = None,
+    venue: Optional[str] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    page: int = 1,
+    per_page: int = 20,
+    sort_by: str = "relevance",
+    sort_order: str = "desc"
+) -> Tuple[int, List[str]]:
+    """Run a ranked local query; returns (total matches, identifiers for the page)"""
+    search_index_state["queries"] += 1
+    match = build_match_expression(query, artist, venue)
+
+    conditions = []
+    params = {"limit": per_page, "offset": (page - 1) * per_page}
+    if match:
+        conditions.append(f"{FTS_TABLE} MATCH :match")
+        params["match"] = match
+    if date_from:
+        conditions.append("d.date >= :date_from")
+        params["date_from"] = date_from
+    if date_to:
+        conditions.append("d.date <= :date_to")
+        params["date_to"] = date_to
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+    if match:
+        source = f"{FTS_TABLE} JOIN archive_search_documents d ON d.id = {FTS_TABLE}.rowid"
+    else:
+        source = "archive_search_documents d"
+
+    direction = "ASC" if sort_order == "asc" else "DESC"
+    if sort_by == "date":
+        order = f"d.date {direction}, d.downloads DESC"
+    elif sort_by == "downloads":
+        order = f"d.downloads {direction}"
+    elif match:
+        # bm25 is lower for better matches
+        weights = ", ".join(str(w) for w in FTS_WEIGHTS)
+        order = f"bm25({FTS_TABLE}, {weights}), d.downloads DESC"
+    else:
+        order = "d.downloads DESC"
+
+    total = (await db.execute(text(f"SELECT COUNT(*) FROM {source} {where}"), params)).scalar() or 0
+    if not total:
+        return 0, []
+
+    result = await db.execute(
+        text(f"SELECT d.identifier FROM {source} {where} ORDER BY {order} LIMIT :limit OFFSET :offset"),
+        params
+    )
+    return total, result.scalars().all()
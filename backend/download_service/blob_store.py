@@ -0,0 +1,183 @@
+import os
+import json
+import time
+import asyncio
+import hashlib
+import logging
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+# Downloaded files are stored once per (identifier, filename, version) under
+# blobs/<key[:2]>/<key>, and each user's copy is a hardlink to the blob
+# (or the blob path itself where hardlinks aren't possible). A file being
+# fetched for one user is shared with every other download of it: they wait on
+# the same upstream stream and receive its progress. A fetch nobody is waiting
+# on anymore is cancelled, keeping its partial file to resume from.
+#
+# How much of a blob's .part file can be trusted (bytes, validator, segments)
+# is kept beside it in <key>.part.json, not on any one download's row, so
+# whichever download fetches the blob next resumes from it. The record is
+# written every BLOB_RESUME_SAVE_SECONDS and when a fetch stops; it only
+# ever lags the bytes on disk.
+BLOB_RESUME_SAVE_SECONDS = float(os.getenv("DOWNLOAD_BLOB_RESUME_SAVE_SECONDS", "2"))
+
+def blob_key(identifier: str, filename: str, version: str) -> str:
+    """Content address of a version of an archive.org file"""
+    return hashlib.sha256(f"{identifier}\0{filename}\0{version}".encode()).hexdigest()
+
+class BlobStore:
+    """Content-addressed file store with coalesced in-flight fetches"""
+
+    def __init__(self, root: Path):
+        self.root = root
+        self._fetches: Dict[str, asyncio.Task] = {}
+        self._stopping: Dict[str, asyncio.Task] = {}  # Cancelled fetches still winding down
+        self._watchers: Dict[str, Set[Callable[..., Awaitable[None]]]] = {}
+        self._resume: Dict[str, Dict[str, Any]] = {}  # Latest resume state of running fetches
+        self._resume_saved_at: Dict[str, float] = {}
+        self.fetched = 0
+        self.joined = 0
+        self.abandoned = 0
+        self.reused = 0
+        self.linked = 0
+        self.referenced = 0
+
+    def path_for(self, key: str) -> Path:
+        return self.root / key[:2] / key
+
+    def resume_path_for(self, key: str) -> Path:
+        return self.path_for(key).with_name(f"{key}.part.json")
+
+    def resume_state(self, key: str) -> Dict[str, Any]:
+        """What the blob's .part file can be resumed from ({} if nothing is trusted)"""
+        try:
+            return json.loads(self.resume_path_for(key).read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def _save_resume_state(self, key: str):
+        state = self._resume.get(key)
+        if state is None:
+            return
+        path = self.resume_path_for(key)
+        tmp_path = path.with_name(path.name + ".tmp")
+        try:
+            tmp_path.write_text(json.dumps(state))
+            os.replace(tmp_path, path)
+            self._resume_saved_at[key] = time.monotonic()
+        except OSError as e:
+            logger.warning(f"Could not save the resume state of blob {key}: {e}")
+
+    def exists(self, key: str) -> bool:
+        return self.path_for(key).exists()
+
+    async def fetch(self, key: str, fetch_blob: Callable[[Path], Awaitable[Any]]):
+        """Store a blob with fetch_blob(path), or join the fetch already running for it"""
+        stopping = self._stopping.get(key)
+        if stopping is not None:
+            await asyncio.wait([stopping])  # Don't write the partial file while it still does
+
+        task = self._fetches.get(key)
+        if task is not None:
+            self.joined += 1
+            logger.info(f"Joined in-flight fetch of blob {key}")
+        else:
+            if self.exists(key):
+                self.reused += 1
+                return
+            path = self.path_for(key)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self.fetched += 1
+            task = asyncio.create_task(fetch_blob(path))
+            self._fetches[key] = task
+            task.add_done_callback(lambda t: self._fetch_done(key, t))
+
+        # A caller leaving doesn't cancel the fetch; its last watcher leaving does
+        await asyncio.shield(task)
+
+    def _fetch_done(self, key: str, task: asyncio.Task):
+        """Forget a finished fetch, keeping its resume state if it stopped short"""
+        for fetches in (self._fetches, self._stopping):
+            if fetches.get(key) is task:
+                del fetches[key]
+        if task.cancelled() or task.exception() is not None:
+            self._save_resume_state(key)
+        else:
+            self.resume_path_for(key).unlink(missing_ok=True)
+        self._resume.pop(key, None)
+        self._resume_saved_at.pop(key, None)
+
+    def _abandon(self, key: str):
+        """Cancel the fetch of key, which nobody is waiting on anymore"""
+        task = self._fetches.pop(key, None)
+        if task is not None and not task.done():
+            logger.info(f"Cancelling fetch of blob {key}: no downloads are waiting on it")
+            task.cancel()
+            self._stopping[key] = task
+            self.abandoned += 1
+
+    async def shutdown(self):
+        """Cancel every running fetch (partial files are kept to resume from)"""
+        tasks = list(self._fetches.values()) + list(self._stopping.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    @contextmanager
+    def watch(self, key: str, on_progress: Callable[..., Awaitable[None]]):
+        """Receive progress of the fetch of key while inside the block"""
+        self._watchers.setdefault(key, set()).add(on_progress)
+        try:
+            yield
+        finally:
+            watchers = self._watchers.get(key)
+            if watchers is not None:
+                watchers.discard(on_progress)
+                if not watchers:
+                    del self._watchers[key]
+                    self._abandon(key)
+
+    def progress_callback(self, key: str) -> Callable[..., Awaitable[None]]:
+        """Progress callback for a fetch that records its resume state and fans out to everyone watching key"""
+        async def on_progress(
+            bytes_on_disk: int, total: Optional[int], validator: Optional[str], segments: Optional[List[List[int]]]
+        ):
+            self._resume[key] = {"bytes": bytes_on_disk, "validator": validator, "segments": segments}
+            if time.monotonic() - self._resume_saved_at.get(key, 0.0) >= BLOB_RESUME_SAVE_SECONDS:
+                self._save_resume_state(key)
+            for watcher in list(self._watchers.get(key, ())):
+                await watcher(bytes_on_disk, total, validator, segments)
+        return on_progress
+
+    def link(self, key: str, dest: Path) -> Path:
+        """Give dest the blob's contents; returns the path holding them"""
+        blob = self.path_for(key)
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        if dest.exists():
+            if dest.stat().st_ino == blob.stat().st_ino:
+                return dest
+            dest.unlink()
+        try:
+            os.link(blob, dest)
+            self.linked += 1
+            return dest
+        except OSError as e:
+            # e.g. the user directory is on another filesystem
+            logger.warning(f"Could not hardlink {dest} to {blob}: {e}; referencing the blob")
+            self.referenced += 1
+            return blob
+
+    def stats(self) -> Dict[str, Any]:
+        """Sharing statistics"""
+        return {
+            "fetches_in_flight": len(self._fetches),
+            "fetches": self.fetched,
+            "joined_in_flight": self.joined,
+            "abandoned": self.abandoned,
+            "reused_stored": self.reused,
+            "hardlinks": self.linked,
+            "references": self.referenced,
+        }
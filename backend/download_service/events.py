@@ -0,0 +1,82 @@
+import asyncio
+import logging
+from typing import Any, Dict, List, Set
+
+logger = logging.getLogger(__name__)
+
+# In-process pub/sub for download state. Download workers publish progress,
+# completion and failure per user; each websocket subscribes to its user.
+# A subscriber holds at most one pending event per download (newer events
+# replace older ones), so a slow consumer gets the latest state when it
+# catches up instead of a growing backlog.
+
+class Subscription:
+    """One consumer's coalesced view of a user's download events"""
+
+    def __init__(self, bus: "DownloadEventBus", user_id: str):
+        self.bus = bus
+        self.user_id = user_id
+        self._pending: Dict[str, Dict[str, Any]] = {}
+        self._ready = asyncio.Event()
+        self.coalesced = 0
+
+    def push(self, event: Dict[str, Any]):
+        if event["download_id"] in self._pending:
+            self.coalesced += 1
+        self._pending[event["download_id"]] = event
+        self._ready.set()
+
+    async def next_events(self) -> List[Dict[str, Any]]:
+        """Wait for and take the latest event of every download that changed"""
+        await self._ready.wait()
+        self._ready.clear()
+        events, self._pending = list(self._pending.values()), {}
+        return events
+
+    def close(self):
+        self.bus.unsubscribe(self)
+
+    def __enter__(self) -> "Subscription":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class DownloadEventBus:
+    """Fan download events out to the subscribers of each user"""
+
+    def __init__(self):
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+        self.published = 0
+        self.delivered = 0
+
+    def subscribe(self, user_id: str) -> Subscription:
+        subscription = Subscription(self, user_id)
+        self._subscribers.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        subscribers = self._subscribers.get(subscription.user_id)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[subscription.user_id]
+
+    def has_subscribers(self, user_id: str) -> bool:
+        return user_id in self._subscribers
+
+    def publish(self, user_id: str, event: Dict[str, Any]):
+        """Deliver an event (a dict with download_id) to the user's subscribers; never blocks"""
+        self.published += 1
+        for subscription in self._subscribers.get(user_id, ()):
+            subscription.push(event)
+            self.delivered += 1
+
+    def stats(self) -> Dict[str, int]:
+        """Subscriber and delivery statistics"""
+        return {
+            "users": len(self._subscribers),
+            "subscribers": sum(len(s) for s in self._subscribers.values()),
+            "published": self.published,
+            "delivered": self.delivered,
+        }
@@ -0,0 +1,79 @@
+import os
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+import httpx
+
+from shared.cache import InMemoryCache
+from shared.http import get_http_client, ARCHIVE, ARCHIVE_DOWNLOAD
+from shared.singleflight import SingleFlight
+from backend.download_service.transfer import probe
+
+logger = logging.getLogger(__name__)
+
+# File listings of archive.org items (names, formats, sizes, checksums),
+# fetched once per item and shared by every download from it
+IA_METADATA_BASE = "https://archive.org/metadata"
+FILE_LIST_CACHE_SECONDS = int(os.getenv("DOWNLOAD_FILE_LIST_CACHE_SECONDS", "3600"))
+FILE_LIST_CACHE_MAX_ENTRIES = int(os.getenv("DOWNLOAD_FILE_LIST_CACHE_MAX_ENTRIES", "1000"))
+
+# Audio formats a whole-recording download picks from, best first
+DOWNLOAD_FORMAT_PREFERENCE = os.getenv("DOWNLOAD_FORMAT_PREFERENCE", "Flac,24bit Flac,VBR MP3,Ogg Vorbis,MP3")
+
+file_lists = InMemoryCache(max_entries=FILE_LIST_CACHE_MAX_ENTRIES)
+file_list_flight = SingleFlight("file-lists")
+
+async def fetch_item_files(identifier: str) -> List[Dict[str, Any]]:
+    """Fetch an item's file list from Internet Archive"""
+    client = get_http_client(ARCHIVE)
+    response = await client.get(f"{IA_METADATA_BASE}/{identifier}/files")
+    response.raise_for_status()
+    files = response.json().get("result") or []
+    file_lists.set(identifier, files, expire=FILE_LIST_CACHE_SECONDS)
+    return files
+
+async def get_item_files(identifier: str) -> List[Dict[str, Any]]:
+    """An item's file list, from memory or one coalesced upstream fetch"""
+    files = file_lists.get(identifier)
+    if files is not None:
+        return files
+    return await file_list_flight.do(identifier, lambda: fetch_item_files(identifier))
+
+async def file_checksum(identifier: str, filename: str) -> Optional[str]:
+    """SHA-1 (or MD5) Internet Archive lists for a file; None if unavailable"""
+    try:
+        files = await get_item_files(identifier)
+    except Exception as e:
+        logger.warning(f"Could not get the file list of {identifier}: {e}")
+        return None
+    for file in files:
+        if file.get("name") == filename:
+            return file.get("sha1") or file.get("md5")
+    return None
+
+async def file_version(identifier: str, filename: str, url: str) -> Optional[str]:
+    """What identifies the upstream version of a file: its IA checksum, else its
+    size and strong validator from a HEAD request; None if neither is available
+    """
+    checksum = await file_checksum(identifier, filename)
+    if checksum:
+        return checksum
+    try:
+        size, _, validator = await probe(get_http_client(ARCHIVE_DOWNLOAD), url)
+    except httpx.HTTPError as e:
+        logger.warning(f"Could not probe {url}: {e}")
+        return None
+    if size is None or not validator:
+        return None
+    return f"{size}:{validator}"
+
+def select_audio_files(files: List[Dict[str, Any]], preference: List[str]) -> Tuple[Optional[str], List[Dict[str, Any]]]:
+    """(format, files) for the first preferred format the item has, in filename order"""
+    by_format: Dict[str, List[Dict[str, Any]]] = {}
+    for file in files:
+        by_format.setdefault((file.get("format") or "").lower(), []).append(file)
+    for name in preference:
+        matches = by_format.get(name.strip().lower())
+        if matches:
+            return matches[0]["format"], sorted(matches, key=lambda file: file.get("name", ""))
+    return None, []
@@ -1,26 +1,35 @@
 import os
+import uuid
 import asyncio
 import logging
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, HTTPException, Depends, WebSocket, WebSocketDisconnect
+from fastapi import FastAPI, HTTPException, Depends, Query, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 from typing import List, Optional
 from datetime import datetime
 import httpx
-import aiofiles
 from pathlib import Path
 
 from shared.database import get_db, init_db, close_db, AsyncSessionLocal
+from shared.http import start_http_clients, close_http_clients, get_http_client, ARCHIVE, ARCHIVE_DOWNLOAD, ARCHIVE_SEGMENT
 from shared.models import (
-    DownloadCreate, DownloadResponse, DownloadProgress,
+    DownloadCreate, DownloadResponse, DownloadProgress, DownloadJobResponse,
     HealthCheckResponse, StatsResponse
 )
 from pydantic import BaseModel
 from typing import Dict, Any
-from shared.database_models import Download, User
+from shared.database_models import Download, DownloadJob, DownloadJobFile, User
 from shared.auth import AuthDependencies
+from backend.download_service.transfer import download_resumable
+from backend.download_service.scheduler import DownloadScheduler
+from backend.download_service.progress import ProgressTracker
+from backend.download_service.events import DownloadEventBus
+from backend.download_service.blob_store import BlobStore, blob_key
+from backend.download_service.item_files import (
+    file_version, get_item_files, select_audio_files, DOWNLOAD_FORMAT_PREFERENCE
+)
 
 # New models for directory browsing
 class ArchiveFile(BaseModel):
@@ -47,15 +56,35 @@ logger = logging.getLogger(__name__)
 DOWNLOAD_DIR = Path("./downloads")
 DOWNLOAD_DIR.mkdir(exist_ok=True)
 
+# One stored copy per unique file; users' files are hardlinks into it
+blob_store = BlobStore(DOWNLOAD_DIR / "blobs")
+
+# Bounded, fair-share pool that runs process_download
+download_scheduler = DownloadScheduler(lambda download_id: process_download(download_id))
+
+# Live progress of running downloads, written to the database in batches
+progress_tracker = ProgressTracker()
+
+# Download state changes pushed to websocket subscribers
+download_events = DownloadEventBus()
+WS_PUSH_INTERVAL = float(os.getenv("DOWNLOAD_WS_PUSH_INTERVAL", "0.5"))
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan manager"""
     # Startup
     logger.info("Starting Download Service...")
     await init_db()
+    start_http_clients(ARCHIVE, ARCHIVE_DOWNLOAD, ARCHIVE_SEGMENT)
+    progress_tracker.start()
+    await resume_interrupted_downloads()
     yield
     # Shutdown
     logger.info("Shutting down Download Service...")
+    await download_scheduler.shutdown()
+    await blob_store.shutdown()
+    await progress_tracker.stop()
+    await close_http_clients()
     await close_db()
 
 # Create FastAPI app
@@ -114,6 +143,13 @@ async def get_stats(db: AsyncSession = Depends(get_db)):
         )
         total_size = total_size_result.scalar() or 0
         
+        # Unique stored files behind the completed downloads
+        unique_files_result = await db.execute(
+            select(func.count(func.distinct(Download.blob_key)))
+            .where(Download.status == "completed")
+        )
+        unique_files = unique_files_result.scalar() or 0
+        
         return StatsResponse(
             total_users=0,  # Not tracked in download service
             total_downloads=total_downloads,
@@ -124,7 +160,12 @@ async def get_stats(db: AsyncSession = Depends(get_db)):
                 "total_downloads": total_downloads,
                 "completed_downloads": completed_downloads,
                 "failed_downloads": failed_downloads,
-                "total_size_bytes": total_size
+                "total_size_bytes": total_size,
+                "unique_files": unique_files,
+                "storage": blob_store.stats(),
+                "scheduler": download_scheduler.stats(),
+                "progress_writes": progress_tracker.stats(),
+                "events": download_events.stats()
             }
         )
     except Exception as e:
@@ -214,6 +255,33 @@ async def start_download(
                     error_message=existing_download.error_message,
                     created_at=existing_download.created_at
                 )
+            elif existing_download.status in ["failed", "cancelled"] or (
+                existing_download.status == "pending" and download_request.priority > (existing_download.priority or 0)
+            ):
+                # Retry (continuing from the bytes already on disk) or move up the queue
+                existing_download.status = "pending"
+                existing_download.priority = download_request.priority
+                existing_download.error_message = None
+                existing_download.download_completed_at = None
+                await db.commit()
+                start_download_task(existing_download.id, existing_download.user_id, existing_download.priority)
+                publish_download_event(existing_download, "pending", existing_download.progress or 0.0)
+                return DownloadResponse(
+                    id=existing_download.id,
+                    user_id=existing_download.user_id,
+                    archive_identifier=existing_download.archive_identifier,
+                    filename=existing_download.filename,
+                    track_title=existing_download.track_title,
+                    status=existing_download.status,
+                    progress=existing_download.progress,
+                    file_path=existing_download.file_path,
+                    file_size=existing_download.file_size,
+                    download_url=existing_download.download_url,
+                    started_at=existing_download.started_at,
+                    download_completed_at=existing_download.download_completed_at,
+                    error_message=existing_download.error_message,
+                    created_at=existing_download.created_at
+                )
             else:
                 raise HTTPException(status_code=400, detail="Download already in progress")
         
@@ -229,6 +297,7 @@ async def start_download(
             status="pending",
             progress=0.0,
             download_url=download_url,
+            priority=download_request.priority,
             created_at=datetime.utcnow()
         )
         
@@ -236,8 +305,9 @@ async def start_download(
         await db.commit()
         await db.refresh(download)
         
-        # Start background download
-        asyncio.create_task(process_download(download.id))
+        # Queue the background download
+        start_download_task(download.id, download.user_id, download.priority)
+        publish_download_event(download, "pending", 0.0)
         
         return DownloadResponse(
             id=download.id,
@@ -264,6 +334,102 @@ async def start_download(
         logger.error(f"Full traceback: {traceback.format_exc()}")
         raise HTTPException(status_code=500, detail=f"Failed to start download: {str(e)}")
 
+@app.post("/downloads/recording/{identifier}", response_model=DownloadJobResponse)
+async def start_recording_download(
+    identifier: str,
+    formats: Optional[str] = Query(None, description="Comma-separated format preference, best first (e.g. 'Flac,VBR MP3')"),
+    priority: int = Query(0, ge=0, le=100),
+    current_user: dict = Depends(AuthDependencies.get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Download every audio file of a recording, in the preferred format, as one job"""
+    try:
+        try:
+            files = await get_item_files(identifier)
+        except httpx.HTTPError as e:
+            logger.error(f"Error getting the file list of {identifier}: {e}")
+            raise HTTPException(status_code=502, detail="Could not get the recording's file list")
+        
+        file_format, audio_files = select_audio_files(files, (formats or DOWNLOAD_FORMAT_PREFERENCE).split(","))
+        if not audio_files:
+            raise HTTPException(status_code=404, detail="No audio files in the requested formats")
+        
+        user_id = current_user["user_id"]
+        job = DownloadJob(user_id=user_id, archive_identifier=identifier, format=file_format)
+        db.add(job)
+        existing_result = await db.execute(
+            select(Download).where(
+                Download.user_id == user_id,
+                Download.archive_identifier == identifier,
+                Download.filename.in_([file["name"] for file in audio_files])
+            )
+        )
+        existing = {download.filename: download for download in existing_result.scalars().all()}
+        
+        # All rows in one transaction; files the user already has (or is
+        # downloading) join the job as they are, failed ones are retried
+        to_start = []
+        downloads = []
+        for file in audio_files:
+            download = existing.get(file["name"])
+            size = int(file["size"]) if str(file.get("size", "")).isdigit() else None
+            if download is None:
+                download = Download(
+                    user_id=user_id,
+                    archive_identifier=identifier,
+                    filename=file["name"],
+                    track_title=file.get("title"),
+                    status="pending",
+                    progress=0.0,
+                    file_size=size,
+                    download_url=f"https://archive.org/download/{identifier}/{file['name']}",
+                    priority=priority,
+                    created_at=datetime.utcnow()
+                )
+                db.add(download)
+                to_start.append(download)
+            else:
+                download.file_size = download.file_size or size
+                if download.status in ["failed", "cancelled"]:
+                    download.status = "pending"
+                    download.priority = priority
+                    download.error_message = None
+                    download.download_completed_at = None
+                    to_start.append(download)
+            downloads.append(download)
+        await db.flush()  # Assigns the new rows' ids
+        # Rows already in an earlier job of the same files stay in it too
+        db.add_all(DownloadJobFile(job_id=job.id, download_id=download.id) for download in downloads)
+        await db.commit()
+        
+        for download in to_start:
+            start_download_task(download.id, user_id, priority)
+            publish_download_event(download, "pending", download.progress or 0.0)
+        logger.info(f"Job {job.id}: {len(audio_files)} {file_format} files of {identifier}, {len(to_start)} queued")
+        
+        return await get_job_summary(db, job.id, user_id)
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error starting recording download: {e}")
+        raise HTTPException(status_code=500, detail="Failed to start recording download")
+
+@app.get("/downloads/jobs/{job_id}", response_model=DownloadJobResponse)
+async def get_download_job(
+    job_id: str,
+    current_user: dict = Depends(AuthDependencies.get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Aggregate progress of a whole-recording download job"""
+    try:
+        return await get_job_summary(db, job_id, current_user["user_id"])
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error getting download job: {e}")
+        raise HTTPException(status_code=500, detail="Failed to get download job")
+
 @app.get("/downloads", response_model=List[DownloadResponse])
 async def get_user_downloads(
     current_user: dict = Depends(AuthDependencies.get_current_user),
@@ -287,7 +453,7 @@ async def get_user_downloads(
                 filename=download.filename,
                 track_title=download.track_title,
                 status=download.status,
-                progress=download.progress,
+                **live_progress(download),
                 file_path=download.file_path,
                 file_size=download.file_size,
                 download_url=download.download_url,
@@ -329,7 +495,7 @@ async def get_download(
             filename=download.filename,
             track_title=download.track_title,
             status=download.status,
-            progress=download.progress,
+            **live_progress(download),
             file_path=download.file_path,
             file_size=download.file_size,
             download_url=download.download_url,
@@ -367,9 +533,11 @@ async def cancel_download(
         if download.status in ["completed", "failed"]:
             raise HTTPException(status_code=400, detail="Cannot cancel completed or failed download")
         
-        # Update status to cancelled
+        # Update status to cancelled (a queued download is dropped, a running one stopped)
         download.status = "cancelled"
         await db.commit()
+        download_scheduler.cancel(download_id)
+        publish_download_event(download, "cancelled", download.progress or 0.0)
         
         return {"message": "Download cancelled successfully"}
         
@@ -420,41 +588,183 @@ async def download_file(
 
 @app.websocket("/ws/downloads/{user_id}")
 async def download_progress_websocket(websocket: WebSocket, user_id: str):
-    """WebSocket endpoint for real-time download progress"""
+    """WebSocket endpoint for real-time download progress
+
+    Sends the user's active downloads once, then only changes pushed by the
+    download workers (no database polling).
+    """
     await websocket.accept()
+    subscription = download_events.subscribe(user_id)
+    pusher = None
     try:
-        while True:
-            # Send current download status
-            async with AsyncSessionLocal() as db:
-                downloads_result = await db.execute(
-                    select(Download)
-                    .where(Download.user_id == user_id)
-                    .where(Download.status.in_(["pending", "downloading"]))
-                )
-                downloads = downloads_result.scalars().all()
-                
-                for download in downloads:
-                    progress_message = DownloadProgress(
-                        download_id=download.id,
-                        progress=download.progress,
-                        status=download.status,
-                        message=f"Downloading {download.progress:.1f}%"
-                    )
-                    await websocket.send_json(progress_message.dict())
-            
-            await asyncio.sleep(2)  # Update every 2 seconds
+        async with AsyncSessionLocal() as db:
+            downloads_result = await db.execute(
+                select(Download)
+                .where(Download.user_id == user_id)
+                .where(Download.status.in_(["pending", "downloading"]))
+            )
+            downloads = downloads_result.scalars().all()
+        for download in downloads:
+            subscription.push(download_event(download, download.status, **live_progress(download)))
+        
+        pusher = asyncio.create_task(push_download_events(websocket, subscription))
+        # Wait for the client to go away (incoming messages are ignored)
+        while (await websocket.receive())["type"] != "websocket.disconnect":
+            pass
+        logger.info(f"WebSocket disconnected for user {user_id}")
             
     except WebSocketDisconnect:
         logger.info(f"WebSocket disconnected for user {user_id}")
     except Exception as e:
         logger.error(f"WebSocket error: {e}")
+    finally:
+        if pusher:
+            pusher.cancel()
+        subscription.close()
+
+async def push_download_events(websocket: WebSocket, subscription):
+    """Send each download's latest state when it has visibly changed"""
+    last_sent = {}
+    try:
+        while True:
+            for event in await subscription.next_events():
+                key = (event["status"], round(event["progress"], 1))
+                if last_sent.get(event["download_id"]) == key:
+                    continue
+                await websocket.send_json(event)
+                if event["status"] in ["pending", "downloading"]:
+                    last_sent[event["download_id"]] = key
+                else:
+                    last_sent.pop(event["download_id"], None)
+            # Let a burst of progress coalesce before the next send
+            await asyncio.sleep(WS_PUSH_INTERVAL)
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        logger.info(f"Stopped pushing download events: {e}")
+
+DOWNLOAD_EVENT_MESSAGES = {
+    "pending": "Queued",
+    "completed": "Download complete",
+    "cancelled": "Download cancelled",
+}
+
+def download_event(download: Download, status: str, progress: float, **live) -> Dict[str, Any]:
+    """DownloadProgress message for a download's current state"""
+    if status == "downloading":
+        message = f"Downloading {progress:.1f}%"
+    elif status == "failed":
+        message = download.error_message or "Download failed"
+    else:
+        message = DOWNLOAD_EVENT_MESSAGES.get(status)
+    return DownloadProgress(
+        download_id=download.id,
+        progress=progress,
+        status=status,
+        message=message,
+        **live
+    ).model_dump(mode="json")
+
+def publish_download_event(download: Download, status: str, progress: float, **live):
+    """Push a download's state to its user's websocket subscribers"""
+    if download_events.has_subscribers(download.user_id):
+        download_events.publish(download.user_id, download_event(download, status, progress, **live))
+
+def live_progress(download: Download) -> Dict[str, Any]:
+    """Progress fields for a download, live from the tracker while it is running"""
+    state = progress_tracker.get(download.id)
+    if state is None:
+        return {"progress": download.progress}
+    eta = state.eta_seconds()
+    return {
+        "progress": state.progress,
+        "bytes_per_second": round(state.bytes_per_second(), 1),
+        "eta_seconds": round(eta, 1) if eta is not None else None
+    }
+
+async def get_job_summary(db: AsyncSession, job_id: str, user_id: str) -> DownloadJobResponse:
+    """Job progress from its rows, with live bytes of the running downloads"""
+    job_result = await db.execute(
+        select(DownloadJob).where(DownloadJob.id == job_id, DownloadJob.user_id == user_id)
+    )
+    job = job_result.scalar_one_or_none()
+    if not job:
+        raise HTTPException(status_code=404, detail="Download job not found")
+    downloads_result = await db.execute(
+        select(Download)
+        .join(DownloadJobFile, DownloadJobFile.download_id == Download.id)
+        .where(DownloadJobFile.job_id == job_id)
+        .order_by(Download.filename)
+    )
+    downloads = downloads_result.scalars().all()
+    
+    total_size = bytes_done = 0
+    rate = 0.0
+    statuses = [download.status for download in downloads]
+    for download in downloads:
+        size = download.file_size or 0
+        total_size += size
+        state = progress_tracker.get(download.id)
+        if download.status == "completed":
+            bytes_done += size
+        elif state is not None:
+            bytes_done += state.bytes_downloaded
+            rate += state.bytes_per_second()
+        else:
+            bytes_done += min(download.bytes_downloaded or 0, size)
+    
+    if all(status == "completed" for status in statuses):
+        status = "completed"
+    elif "downloading" in statuses:
+        status = "downloading"
+    elif "pending" in statuses:
+        status = "pending"
+    else:
+        status = "failed"
+    
+    if total_size:
+        progress = min(bytes_done / total_size * 100, 100.0)
+    else:
+        progress = sum(download.progress or 0.0 for download in downloads) / len(downloads)
+    
+    return DownloadJobResponse(
+        job_id=job_id,
+        archive_identifier=job.archive_identifier,
+        format=job.format,
+        status=status,
+        progress=100.0 if status == "completed" else progress,
+        total_files=len(downloads),
+        completed_files=statuses.count("completed"),
+        failed_files=statuses.count("failed") + statuses.count("cancelled"),
+        total_size=total_size,
+        bytes_downloaded=bytes_done,
+        bytes_per_second=round(rate, 1) if rate else None,
+        eta_seconds=round((total_size - bytes_done) / rate, 1) if rate and total_size else None,
+        download_ids=[download.id for download in downloads]
+    )
+
+def start_download_task(download_id: str, user_id: str, priority: int = 0):
+    """Queue process_download on the download scheduler"""
+    download_scheduler.submit(download_id, user_id, priority or 0)
+
+async def resume_interrupted_downloads():
+    """Restart downloads that were pending or in flight when the service stopped"""
+    async with AsyncSessionLocal() as db:
+        result = await db.execute(
+            select(Download.id, Download.user_id, Download.priority)
+            .where(Download.status.in_(["pending", "downloading"]))
+            .order_by(Download.created_at)
+        )
+        downloads = result.all()
+    
+    for download_id, user_id, priority in downloads:
+        start_download_task(download_id, user_id, priority)
+    if downloads:
+        logger.info(f"Resuming {len(downloads)} interrupted downloads")
 
 async def process_download(download_id: str):
     """Background task to process a download"""
     try:
-        # Update status to downloading
-        await update_download_status(download_id, "downloading", progress=0.0)
-        
         # Get download details
         async with AsyncSessionLocal() as db:
             download_result = await db.execute(
@@ -465,6 +775,20 @@ async def process_download(download_id: str):
             if not download:
                 logger.error(f"Download {download_id} not found")
                 return
+            if download.status == "cancelled":
+                logger.info(f"Download {download_id} was cancelled before it started")
+                return
+        
+        # Files are stored once by content address and linked into the user's directory
+        version = await file_version(download.archive_identifier, download.filename, download.download_url)
+        if version is None:
+            # Nothing tells a stale blob from the current file: fetch into one of this download's own
+            logger.info(f"No checksum or validator for {download.download_url}; not sharing its blob")
+            version = f"download:{download_id}"
+        key = blob_key(download.archive_identifier, download.filename, version)
+        
+        # Update status to downloading (keeping the progress of earlier attempts)
+        await update_download_status(download_id, "downloading", progress=download.progress or 0.0, blob_key=key)
         
         # Create user download directory
         user_download_dir = DOWNLOAD_DIR / download.user_id
@@ -474,54 +798,71 @@ async def process_download(download_id: str):
         archive_dir = user_download_dir / download.archive_identifier
         archive_dir.mkdir(exist_ok=True)
         
-        # Download file
         file_path = archive_dir / download.filename
         
-        async with httpx.AsyncClient(follow_redirects=True, timeout=60.0) as client:
-            logger.info(f"Starting download for {download_id}: {download.download_url}")
-            
-            async with client.stream("GET", download.download_url) as response:
-                response.raise_for_status()
-                
-                # Log the final URL after redirects
-                final_url = str(response.url)
-                if final_url != download.download_url:
-                    logger.info(f"Download redirected from {download.download_url} to {final_url}")
-                
-                total_size = int(response.headers.get("content-length", 0))
-                downloaded_size = 0
-                
-                async with aiofiles.open(file_path, "wb") as f:
-                    async for chunk in response.aiter_bytes():
-                        await f.write(chunk)
-                        downloaded_size += len(chunk)
-                        
-                        if total_size > 0:
-                            progress = (downloaded_size / total_size) * 100
-                            await update_download_status(download_id, "downloading", progress=progress)
+        client = get_http_client(ARCHIVE_DOWNLOAD)
+        logger.info(f"Starting download for {download_id}: {download.download_url}")
+        
+        async def record_progress(
+            downloaded_size: int, total_size: Optional[int], validator: Optional[str], segments: Optional[list]
+        ):
+            progress_tracker.update(download_id, downloaded_size, total_size, validator, segments)
+            if download_events.has_subscribers(download.user_id):
+                publish_download_event(download, "downloading", **live_progress(download))
+        
+        async def fetch_blob(blob_path: Path):
+            # Via <blob>.part, resuming from what the blob's own resume record trusts
+            # (any download of the file may have written it)
+            resume = blob_store.resume_state(key)
+            await download_resumable(
+                client, download.download_url, blob_path,
+                resume.get("bytes"), resume.get("validator"), blob_store.progress_callback(key),
+                recorded_segments=resume.get("segments"),
+                segment_client=get_http_client(ARCHIVE_SEGMENT)
+            )
+        
+        # Joins the fetch if another download of the same file is already running
+        with blob_store.watch(key, record_progress):
+            await blob_store.fetch(key, fetch_blob)
+        await progress_tracker.finish(download_id)
+        
+        stored_path = blob_store.link(key, file_path)
+        downloaded_size = stored_path.stat().st_size
         
         # Update download as completed
         await update_download_status(
             download_id, 
             "completed", 
             progress=100.0,
-            file_path=str(file_path),
-            file_size=downloaded_size
+            file_path=str(stored_path),
+            file_size=downloaded_size,
+            bytes_downloaded=downloaded_size,
+            segment_state=""
         )
         
         logger.info(f"Download {download_id} completed successfully")
         
+    except asyncio.CancelledError:
+        # Cancelled by the user or by shutdown; the row keeps its status and resume offset
+        logger.info(f"Download {download_id} stopped")
+        await progress_tracker.finish(download_id)
+        raise
     except Exception as e:
         logger.error(f"Error processing download {download_id}: {e}")
+        await progress_tracker.finish(download_id)  # Keep the resume offset as current as possible
         await update_download_status(download_id, "failed", error_message=str(e))
 
 async def update_download_status(
     download_id: str,
     status: str,
-    progress: float = 0.0,
+    progress: float = None,
     file_path: str = None,
     file_size: int = None,
-    error_message: str = None
+    error_message: str = None,
+    bytes_downloaded: int = None,
+    resume_validator: str = None,
+    segment_state: str = None,
+    blob_key: str = None
 ):
     """Update download status in database"""
     try:
@@ -531,9 +872,21 @@ async def update_download_status(
             )
             download = download.scalar_one_or_none()
             
-            if download:
+            if download and download.status == "cancelled":
+                # Cancelled while the worker was running; don't bring the row back
+                logger.info(f"Download {download_id} was cancelled, not marking it {status}")
+            elif download:
                 download.status = status
-                download.progress = progress
+                if progress is not None:
+                    download.progress = progress
+                if bytes_downloaded is not None:
+                    download.bytes_downloaded = bytes_downloaded
+                if resume_validator:
+                    download.resume_validator = resume_validator
+                if segment_state is not None:
+                    download.segment_state = segment_state or None  # "" clears it
+                if blob_key:
+                    download.blob_key = blob_key
                 
                 if file_path:
                     download.file_path = file_path
@@ -546,8 +899,11 @@ async def update_download_status(
                     download.started_at = datetime.utcnow()
                 elif status in ["completed", "failed"]:
                     download.download_completed_at = datetime.utcnow()
+                if status != "failed":
+                    download.error_message = error_message
                 
                 await db.commit()
+                publish_download_event(download, status, download.progress or 0.0)
                 
     except Exception as e:
         logger.error(f"Error updating download status: {e}")
@@ -0,0 +1,176 @@
+import os
+import json
+import time
+import asyncio
+import logging
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from sqlalchemy import update
+
+from shared.database import AsyncSessionLocal
+from shared.database_models import Download
+
+logger = logging.getLogger(__name__)
+
+# Progress of active downloads is kept in memory and written to the downloads
+# table in one transaction for all of them: every PROGRESS_FLUSH_SECONDS, or
+# sooner once a download has moved PROGRESS_FLUSH_PERCENT since its last write.
+# The recorded offset only ever lags the bytes on disk, which resume handles.
+PROGRESS_FLUSH_SECONDS = float(os.getenv("DOWNLOAD_PROGRESS_FLUSH_SECONDS", "2"))
+PROGRESS_FLUSH_PERCENT = float(os.getenv("DOWNLOAD_PROGRESS_FLUSH_PERCENT", "5"))
+
+# Window for the transfer rate (and ETA) estimate
+RATE_WINDOW_SECONDS = 5.0
+
+@dataclass
+class DownloadProgressState:
+    bytes_downloaded: int = 0
+    total: Optional[int] = None
+    validator: Optional[str] = None
+    segments: Optional[List[List[int]]] = None
+    dirty: bool = False
+    flushed_progress: float = 0.0
+    samples: Deque[Tuple[float, int]] = field(default_factory=deque)
+
+    @property
+    def progress(self) -> float:
+        return min(self.bytes_downloaded / self.total * 100, 100.0) if self.total else 0.0
+
+    def bytes_per_second(self) -> float:
+        if len(self.samples) < 2:
+            return 0.0
+        (start, start_bytes), (end, end_bytes) = self.samples[0], self.samples[-1]
+        return (end_bytes - start_bytes) / (end - start) if end > start else 0.0
+
+    def eta_seconds(self) -> Optional[float]:
+        rate = self.bytes_per_second()
+        if not self.total or not rate:
+            return None
+        return max(self.total - self.bytes_downloaded, 0) / rate
+
+class ProgressTracker:
+    """In-memory progress of active downloads, flushed to the database in batches"""
+
+    def __init__(
+        self,
+        flush_seconds: float = PROGRESS_FLUSH_SECONDS,
+        flush_percent: float = PROGRESS_FLUSH_PERCENT
+    ):
+        self.flush_seconds = flush_seconds
+        self.flush_percent = flush_percent
+        self._active: Dict[str, DownloadProgressState] = {}
+        self._wake = asyncio.Event()
+        self._lock = asyncio.Lock()
+        self._flusher: Optional[asyncio.Task] = None
+        self.updates = 0
+        self.flushes = 0
+        self.rows_written = 0
+
+    def start(self):
+        """Start the background flusher"""
+        if self._flusher is None:
+            self._flusher = asyncio.create_task(self._flush_loop())
+
+    async def stop(self):
+        """Stop the flusher and write whatever is still pending"""
+        if self._flusher is not None:
+            self._flusher.cancel()
+            await asyncio.gather(self._flusher, return_exceptions=True)
+            self._flusher = None
+        await self.flush()
+
+    def update(
+        self,
+        download_id: str,
+        bytes_downloaded: int,
+        total: Optional[int],
+        validator: Optional[str],
+        segments: Optional[List[List[int]]] = None
+    ):
+        """Record progress for a download (no I/O)"""
+        state = self._active.get(download_id)
+        if state is None:
+            state = self._active[download_id] = DownloadProgressState()
+        state.bytes_downloaded = bytes_downloaded
+        state.total = total
+        state.validator = validator or state.validator
+        state.segments = segments
+        state.dirty = True
+        self.updates += 1
+
+        now = time.monotonic()
+        state.samples.append((now, bytes_downloaded))
+        while len(state.samples) > 2 and now - state.samples[0][0] > RATE_WINDOW_SECONDS:
+            state.samples.popleft()
+
+        if state.progress - state.flushed_progress >= self.flush_percent:
+            self._wake.set()
+
+    def get(self, download_id: str) -> Optional[DownloadProgressState]:
+        """Live progress of an active download"""
+        return self._active.get(download_id)
+
+    async def finish(self, download_id: str):
+        """Write a download's pending progress and stop tracking it"""
+        async with self._lock:
+            state = self._active.pop(download_id, None)
+            if state is not None and state.dirty:
+                await self._write({download_id: state})
+
+    async def flush(self):
+        """Write every download with unwritten progress in one transaction"""
+        async with self._lock:
+            dirty = {download_id: state for download_id, state in self._active.items() if state.dirty}
+            if dirty:
+                await self._write(dirty)
+
+    async def _write(self, states: Dict[str, DownloadProgressState]):
+        rows = []
+        for download_id, state in states.items():
+            row = {
+                "id": download_id,
+                "progress": state.progress,
+                "bytes_downloaded": state.bytes_downloaded,
+                "segment_state": json.dumps(state.segments) if state.segments else None,
+            }
+            if state.validator:
+                row["resume_validator"] = state.validator
+            rows.append(row)
+            # Clear before the await so updates arriving meanwhile stay dirty
+            state.dirty = False
+            state.flushed_progress = state.progress
+
+        # Rows with and without a validator have different column sets
+        try:
+            async with AsyncSessionLocal() as db:
+                for columns in {frozenset(row) for row in rows}:
+                    await db.execute(update(Download), [row for row in rows if frozenset(row) == columns])
+                await db.commit()
+            self.flushes += 1
+            self.rows_written += len(rows)
+        except Exception as e:
+            logger.error(f"Error writing download progress: {e}")
+            for state in states.values():
+                state.dirty = True
+
+    async def _flush_loop(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_seconds)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            await self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        """Write coalescing statistics"""
+        return {
+            "active": len(self._active),
+            "updates": self.updates,
+            "flushes": self.flushes,
+            "rows_written": self.rows_written,
+            "flush_seconds": self.flush_seconds,
+            "flush_percent": self.flush_percent,
+        }
@@ -0,0 +1,165 @@
+import os
+import time
+import heapq
+import asyncio
+import logging
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Downloads run on a bounded worker pool: at most DOWNLOAD_MAX_CONCURRENT at
+# once and DOWNLOAD_MAX_PER_USER for any one user. Waiting downloads are
+# started highest priority first, round-robin across users on ties, so one
+# user queuing a box set can't starve everyone else.
+DOWNLOAD_MAX_CONCURRENT = int(os.getenv("DOWNLOAD_MAX_CONCURRENT", "4"))
+DOWNLOAD_MAX_PER_USER = int(os.getenv("DOWNLOAD_MAX_PER_USER", "2"))
+
+PRIORITY_NORMAL = 0
+PRIORITY_PLAY_NEXT = 10
+
+# Recent queue wait times kept for /stats
+WAIT_SAMPLES = 1000
+
+class DownloadScheduler:
+    """Priority, fair-share queue in front of a bounded pool of download tasks"""
+
+    def __init__(
+        self,
+        runner: Callable[[str], Awaitable[Any]],
+        max_concurrent: int = DOWNLOAD_MAX_CONCURRENT,
+        max_per_user: int = DOWNLOAD_MAX_PER_USER
+    ):
+        self.runner = runner
+        self.max_concurrent = max_concurrent
+        self.max_per_user = max_per_user
+        # Per-user heaps of [-priority, sequence, download_id, queued_at]
+        self._queues: Dict[str, List[list]] = {}
+        self._queued: Dict[str, list] = {}  # download_id -> heap entry
+        self._rotation: Deque[str] = deque()  # Users with queued downloads, next turn first
+        self._running: Dict[str, asyncio.Task] = {}  # download_id -> task
+        self._running_per_user: Dict[str, int] = {}
+        self._sequence = 0
+        self._waits: Deque[float] = deque(maxlen=WAIT_SAMPLES)
+        self.started = 0
+
+    def submit(self, download_id: str, user_id: str, priority: int = PRIORITY_NORMAL) -> bool:
+        """Queue a download; a queued one is re-prioritized, a running one is left alone"""
+        if download_id in self._running:
+            return False
+        queued = self._queued.get(download_id)
+        if queued is not None:
+            if -queued[0] >= priority:
+                return False
+            self._remove(download_id)
+
+        self._sequence += 1
+        entry = [-priority, self._sequence, download_id, time.monotonic()]
+        if queued is not None:
+            entry[3] = queued[3]  # Keep the original wait start
+        heapq.heappush(self._queues.setdefault(user_id, []), entry)
+        self._queued[download_id] = entry
+        if user_id not in self._rotation:
+            self._rotation.append(user_id)
+        self._dispatch()
+        return True
+
+    def discard(self, download_id: str) -> bool:
+        """Drop a download that hasn't started yet"""
+        if download_id not in self._queued:
+            return False
+        self._remove(download_id)
+        return True
+
+    def cancel(self, download_id: str) -> bool:
+        """Drop a queued download or cancel a running one"""
+        if self.discard(download_id):
+            return True
+        task = self._running.get(download_id)
+        if task is None:
+            return False
+        task.cancel()  # Its slot is freed when the task finishes
+        return True
+
+    def is_scheduled(self, download_id: str) -> bool:
+        return download_id in self._queued or download_id in self._running
+
+    def _remove(self, download_id: str):
+        entry = self._queued.pop(download_id)
+        for user_id, queue in self._queues.items():
+            if entry in queue:
+                queue.remove(entry)
+                heapq.heapify(queue)
+                if not queue:
+                    del self._queues[user_id]
+                    self._rotation.remove(user_id)
+                return
+
+    def _next_user(self) -> Optional[str]:
+        """User whose queued head should start next: highest priority, then rotation order"""
+        best, best_priority = None, None
+        for user_id in self._rotation:
+            if self._running_per_user.get(user_id, 0) >= self.max_per_user:
+                continue
+            priority = -self._queues[user_id][0][0]
+            if best is None or priority > best_priority:
+                best, best_priority = user_id, priority
+        return best
+
+    def _dispatch(self):
+        """Start queued downloads while there are free slots"""
+        while len(self._running) < self.max_concurrent:
+            user_id = self._next_user()
+            if user_id is None:
+                return
+            queue = self._queues[user_id]
+            _, _, download_id, queued_at = heapq.heappop(queue)
+            del self._queued[download_id]
+            self._rotation.remove(user_id)
+            if queue:
+                self._rotation.append(user_id)  # Back of the line for its next download
+            else:
+                del self._queues[user_id]
+
+            self._waits.append(time.monotonic() - queued_at)
+            self.started += 1
+            self._running_per_user[user_id] = self._running_per_user.get(user_id, 0) + 1
+            task = asyncio.create_task(self.runner(download_id))
+            self._running[download_id] = task
+            task.add_done_callback(lambda t, d=download_id, u=user_id: self._finish(d, u))
+
+    def _finish(self, download_id: str, user_id: str):
+        """Free a finished download's slot and start the next one"""
+        self._running.pop(download_id, None)
+        remaining = self._running_per_user.get(user_id, 1) - 1
+        if remaining:
+            self._running_per_user[user_id] = remaining
+        else:
+            self._running_per_user.pop(user_id, None)
+        self._dispatch()
+
+    async def shutdown(self):
+        """Drop the queue and cancel running downloads (they resume on the next start)"""
+        self._queues.clear()
+        self._queued.clear()
+        self._rotation.clear()
+        tasks = list(self._running.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        """Queue depth, running downloads and wait times"""
+        now = time.monotonic()
+        waits = sorted(self._waits)
+        return {
+            "max_concurrent": self.max_concurrent,
+            "max_per_user": self.max_per_user,
+            "running": len(self._running),
+            "queued": len(self._queued),
+            "queued_users": len(self._rotation),
+            "started": self.started,
+            "oldest_wait_seconds": round(max((now - e[3] for e in self._queued.values()), default=0.0), 3),
+            "avg_wait_seconds": round(sum(waits) / len(waits), 3) if waits else 0.0,
+            "p95_wait_seconds": round(waits[int(len(waits) * 0.95)], 3) if waits else 0.0,
+        }
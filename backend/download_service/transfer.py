@@ -0,0 +1,290 @@
+import os
+import asyncio
+import logging
+from pathlib import Path
+from typing import Awaitable, Callable, List, Optional, Tuple
+
+import httpx
+import aiofiles
+
+logger = logging.getLogger(__name__)
+
+# Files are written to <name>.part and renamed into place once complete, so a
+# partial body is never mistaken for a finished download. Interrupted
+# transfers continue from the recorded offset with a Range request.
+PART_SUFFIX = ".part"
+DOWNLOAD_CHUNK_SIZE = int(os.getenv("DOWNLOAD_CHUNK_SIZE", str(256 * 1024)))
+DOWNLOAD_MAX_ATTEMPTS = int(os.getenv("DOWNLOAD_MAX_ATTEMPTS", "5"))
+DOWNLOAD_RETRY_BACKOFF_SECONDS = float(os.getenv("DOWNLOAD_RETRY_BACKOFF_SECONDS", "2"))
+
+# Large files from servers that accept ranges are fetched as N concurrent byte
+# ranges written in place into a preallocated .part file
+DOWNLOAD_SEGMENTS = int(os.getenv("DOWNLOAD_SEGMENTS", "4"))
+DOWNLOAD_SEGMENTED_MIN_BYTES = int(os.getenv("DOWNLOAD_SEGMENTED_MIN_BYTES", str(64 * 1024 * 1024)))
+
+# Segment state: [start, end (inclusive), bytes done] per segment
+Segments = List[List[int]]
+
+# Called after each chunk is on disk:
+# (bytes on disk, total bytes or None, validator, segment state or None)
+ProgressCallback = Callable[[int, Optional[int], Optional[str], Optional[Segments]], Awaitable[None]]
+
+class RetryableDownloadError(Exception):
+    """Upstream failure worth retrying (5xx, 429, truncated body)"""
+
+class SourceChangedError(Exception):
+    """The file changed upstream (If-Range failed) while fetching segments"""
+
+def part_path_for(path: Path) -> Path:
+    return path.with_name(path.name + PART_SUFFIX)
+
+def resume_offset(part_path: Path, recorded: Optional[int]) -> int:
+    """Bytes of an existing .part file that can be resumed from
+
+    Only bytes the database recorded as written are trusted; anything past
+    that (written just before a crash) is truncated away.
+    """
+    if not part_path.exists():
+        return 0
+    size = part_path.stat().st_size
+    offset = min(size, recorded or 0)
+    if size > offset:
+        os.truncate(part_path, offset)
+    return offset
+
+def parse_content_range(value: Optional[str]) -> Tuple[Optional[int], Optional[int]]:
+    """(start, total) from 'bytes START-END/TOTAL' or 'bytes */TOTAL'"""
+    if not value or not value.startswith("bytes "):
+        return None, None
+    span, _, total = value[6:].partition("/")
+    start = None if span == "*" else int(span.split("-", 1)[0])
+    return start, None if total in ("", "*") else int(total)
+
+def response_validator(response: httpx.Response) -> Optional[str]:
+    """Strong validator usable with If-Range (weak ETags are not)"""
+    etag = response.headers.get("etag")
+    if etag and not etag.startswith("W/"):
+        return etag
+    return response.headers.get("last-modified")
+
+async def transfer(
+    client: httpx.AsyncClient,
+    url: str,
+    part_path: Path,
+    offset: int,
+    validator: Optional[str],
+    on_progress: ProgressCallback
+) -> int:
+    """One attempt at fetching url into part_path from offset; returns bytes on disk"""
+    headers = {}
+    if offset:
+        headers["Range"] = f"bytes={offset}-"
+        if validator:
+            headers["If-Range"] = validator
+
+    async with client.stream("GET", url, headers=headers) as response:
+        if response.status_code == 416 and offset:
+            _, total = parse_content_range(response.headers.get("content-range"))
+            if total == offset:
+                return offset  # Every byte was already on disk
+            logger.warning(f"Range {offset}- not satisfiable for {url}; restarting")
+            await response.aclose()
+            return await transfer(client, url, part_path, 0, None, on_progress)
+        if response.status_code == 429 or response.status_code >= 500:
+            raise RetryableDownloadError(f"HTTP {response.status_code} from {url}")
+        response.raise_for_status()
+
+        if response.status_code == 206:
+            start, total = parse_content_range(response.headers.get("content-range"))
+            if start != offset:
+                raise RetryableDownloadError(f"Server resumed at byte {start}, expected {offset}")
+            mode = "ab"
+        else:
+            # Full body: first attempt, or the file changed and If-Range failed
+            if offset:
+                logger.info(f"Server ignored range for {url}; restarting from byte 0")
+            offset = 0
+            length = response.headers.get("content-length")
+            total = int(length) if length else None
+            mode = "wb"
+
+        validator = response_validator(response) or validator
+        written = offset
+        async with aiofiles.open(part_path, mode) as f:
+            async for chunk in response.aiter_bytes(DOWNLOAD_CHUNK_SIZE):
+                await f.write(chunk)
+                written += len(chunk)
+                await f.flush()  # The recorded offset must never run ahead of the file
+                await on_progress(written, total, validator, None)
+
+    if total is not None and written < total:
+        raise RetryableDownloadError(f"Connection closed at byte {written} of {total}")
+    return written
+
+async def probe(client: httpx.AsyncClient, url: str) -> Tuple[Optional[int], bool, Optional[str]]:
+    """(size, accepts byte ranges, validator) from a HEAD request"""
+    response = await client.head(url)
+    if response.is_error:
+        return None, False, None
+    length = response.headers.get("content-length")
+    accepts_ranges = response.headers.get("accept-ranges", "").lower() == "bytes"
+    return int(length) if length else None, accepts_ranges, response_validator(response)
+
+def plan_segments(total: int, count: int) -> Segments:
+    """Split [0, total) into count nearly equal ranges"""
+    size = -(-total // count)
+    return [[start, min(start + size, total) - 1, 0] for start in range(0, total, size)]
+
+def preallocate(part_path: Path, total: int):
+    """Create the .part file at its final size"""
+    with open(part_path, "wb") as f:
+        if hasattr(os, "posix_fallocate"):
+            os.posix_fallocate(f.fileno(), 0, total)
+        else:
+            f.truncate(total)
+
+async def fetch_segment(
+    client: httpx.AsyncClient,
+    url: str,
+    part_path: Path,
+    segment: List[int],
+    validator: Optional[str],
+    report: Callable[[], Awaitable[None]]
+):
+    """Fetch the rest of one byte range into its place in the .part file, retrying transient failures"""
+    start, end = segment[0], segment[1]
+    for attempt in range(1, DOWNLOAD_MAX_ATTEMPTS + 1):
+        position = start + segment[2]
+        if position > end:
+            return
+        headers = {"Range": f"bytes={position}-{end}"}
+        if validator:
+            headers["If-Range"] = validator
+        try:
+            async with client.stream("GET", url, headers=headers) as response:
+                if response.status_code == 429 or response.status_code >= 500:
+                    raise RetryableDownloadError(f"HTTP {response.status_code} from {url}")
+                response.raise_for_status()
+                if response.status_code != 206:
+                    raise SourceChangedError(f"Range request for {url} answered with {response.status_code}")
+                if parse_content_range(response.headers.get("content-range"))[0] != position:
+                    raise RetryableDownloadError(f"Server sent the wrong range for bytes {position}-{end}")
+
+                async with aiofiles.open(part_path, "r+b") as f:
+                    await f.seek(position)
+                    async for chunk in response.aiter_bytes(DOWNLOAD_CHUNK_SIZE):
+                        chunk = chunk[:end + 1 - position]  # Never write past the segment
+                        await f.write(chunk)
+                        await f.flush()
+                        position += len(chunk)
+                        segment[2] = position - start
+                        await report()
+            if position <= end:
+                raise RetryableDownloadError(f"Segment closed at byte {position} of {start}-{end}")
+            return
+        except (httpx.TransportError, RetryableDownloadError) as e:
+            if attempt == DOWNLOAD_MAX_ATTEMPTS:
+                raise
+            delay = DOWNLOAD_RETRY_BACKOFF_SECONDS * 2 ** (attempt - 1)
+            logger.warning(f"Segment {start}-{end} of {url} failed at byte {start + segment[2]}: {e}; retrying in {delay:.0f}s")
+            await asyncio.sleep(delay)
+
+async def transfer_segmented(
+    client: httpx.AsyncClient,
+    url: str,
+    part_path: Path,
+    segments: Segments,
+    validator: Optional[str],
+    on_progress: ProgressCallback
+) -> int:
+    """Fetch all unfinished segments concurrently; returns the file size"""
+    total = segments[-1][1] + 1
+
+    async def report():
+        await on_progress(sum(segment[2] for segment in segments), total, validator, segments)
+
+    tasks = [
+        asyncio.create_task(fetch_segment(client, url, part_path, segment, validator, report))
+        for segment in segments if segment[0] + segment[2] <= segment[1]
+    ]
+    try:
+        await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+    return total
+
+async def download_resumable(
+    client: httpx.AsyncClient,
+    url: str,
+    path: Path,
+    recorded_offset: Optional[int],
+    validator: Optional[str],
+    on_progress: ProgressCallback,
+    recorded_segments: Optional[Segments] = None,
+    segment_client: Optional[httpx.AsyncClient] = None
+) -> int:
+    """Download url to path, resuming a previous .part file and retrying transient failures
+
+    With a segment_client, files of at least DOWNLOAD_SEGMENTED_MIN_BYTES from
+    servers accepting ranges are fetched as DOWNLOAD_SEGMENTS concurrent
+    ranges. Returns the final size. The completed file is renamed into place
+    atomically; on failure the .part file is left for the next attempt.
+    """
+    part_path = part_path_for(path)
+    segments = None
+    if recorded_segments:
+        total = recorded_segments[-1][1] + 1
+        if segment_client and part_path.exists() and part_path.stat().st_size == total:
+            segments = recorded_segments
+            logger.info(f"Resuming {url} in {len(segments)} segments at {sum(s[2] for s in segments)} bytes")
+        else:
+            # Segmented bytes aren't contiguous, so they can't seed a single stream
+            part_path.unlink(missing_ok=True)
+            recorded_offset = 0
+    elif segment_client and DOWNLOAD_SEGMENTS > 1 and not recorded_offset:
+        total, accepts_ranges, probed_validator = await probe(segment_client, url)
+        if accepts_ranges and total and total >= DOWNLOAD_SEGMENTED_MIN_BYTES:
+            validator = probed_validator
+            segments = plan_segments(total, DOWNLOAD_SEGMENTS)
+            preallocate(part_path, total)
+            logger.info(f"Downloading {url} ({total} bytes) in {len(segments)} segments")
+
+    if segments:
+        try:
+            size = await transfer_segmented(segment_client, url, part_path, segments, validator, on_progress)
+            os.replace(part_path, path)
+            return size
+        except SourceChangedError as e:
+            logger.warning(f"{e}; restarting as a single stream")
+            part_path.unlink(missing_ok=True)
+            recorded_offset, validator = 0, None
+
+    offset = resume_offset(part_path, recorded_offset)
+    if offset:
+        logger.info(f"Resuming {url} at byte {offset}")
+
+    # Remember the validator of the bytes on disk for in-process retries
+    current = {"validator": validator}
+
+    async def progress(written: int, total: Optional[int], body_validator: Optional[str], _segments=None):
+        current["validator"] = body_validator
+        await on_progress(written, total, body_validator, None)
+
+    for attempt in range(1, DOWNLOAD_MAX_ATTEMPTS + 1):
+        try:
+            size = await transfer(client, url, part_path, offset, current["validator"] if offset else None, progress)
+            break
+        except (httpx.TransportError, RetryableDownloadError) as e:
+            if attempt == DOWNLOAD_MAX_ATTEMPTS:
+                raise
+            # Within this process every byte written has been flushed
+            offset = part_path.stat().st_size if part_path.exists() else 0
+            delay = DOWNLOAD_RETRY_BACKOFF_SECONDS * 2 ** (attempt - 1)
+            logger.warning(f"Download attempt {attempt} for {url} failed at byte {offset}: {e}; retrying in {delay:.0f}s")
+            await asyncio.sleep(delay)
+
+    os.replace(part_path, path)
+    return size
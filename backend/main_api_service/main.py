@@ -5,7 +5,8 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException, Depends, Request, Query
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, StreamingResponse
+from starlette.background import BackgroundTask
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select, func
 from typing import List, Optional
@@ -16,11 +17,16 @@ from shared.database import get_db, init_db, close_db
 from shared.models import (
     UserCreate, UserLogin, UserResponse, UserSession,
     ArchiveItem, ArchiveSearchResponse,
-    DownloadCreate, DownloadResponse,
+    DownloadCreate, DownloadResponse, DownloadJobResponse,
     HealthCheckResponse, StatsResponse
 )
 from shared.database_models import User, Download, AggregatedConcert, ConcertRecording
 from shared.auth import AuthDependencies, AuthUtils
+from shared.http import (
+    start_http_clients, close_http_clients, get_http_client,
+    BROWSE, DOWNLOAD, AGGREGATION
+)
+from shared.ndjson import wants_ndjson, open_ndjson_stream, proxy_stream
 from backend.main_api_service.services import UserService
 
 # Configure logging
@@ -32,18 +38,26 @@ BROWSE_SERVICE_URL = os.getenv("BROWSE_SERVICE_URL", "http://127.0.0.1:8001")
 DOWNLOAD_SERVICE_URL = os.getenv("DOWNLOAD_SERVICE_URL", "http://127.0.0.1:8002")
 AGGREGATION_SERVICE_URL = os.getenv("AGGREGATION_SERVICE_URL", "http://127.0.0.1:8003")
 
+# Headers relayed by the file download proxy
+FILE_PROXY_REQUEST_HEADERS = ("range", "if-range", "if-none-match", "if-modified-since")
+FILE_PROXY_RESPONSE_HEADERS = (
+    "content-length", "content-range", "accept-ranges", "etag", "last-modified", "content-disposition"
+)
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan manager"""
     # Startup
     logger.info("Starting Main API Service...")
     await init_db()
+    start_http_clients(BROWSE, DOWNLOAD, AGGREGATION)
     yield
     # Shutdown
     logger.info("Shutting down Main API Service...")
+    await close_http_clients()
     await close_db()
     
-    # Ensure all httpx connections are closed
+    # Cancel any remaining background work
     import asyncio
     try:
         # Cancel any pending tasks
@@ -77,6 +91,17 @@ app.add_middleware(
 # Mount static files
 app.mount("/static", StaticFiles(directory="backend/main_api_service/static"), name="static")
 
+def upstream_detail(response: httpx.Response) -> str:
+    """Reason given by a service's error response (its JSON detail, else the status text)"""
+    if response.headers.get("content-type", "").startswith("application/json"):
+        try:
+            body = response.json()
+        except ValueError:
+            body = None
+        if isinstance(body, dict) and body.get("detail"):
+            return body["detail"]
+    return response.reason_phrase
+
 @app.get("/")
 async def read_root():
     """Serve the web interface"""
@@ -118,20 +143,19 @@ async def get_stats(
         # Get service stats
         service_stats = {}
         services = [
-            ("download", f"{DOWNLOAD_SERVICE_URL}/stats"),
-            ("browse", f"{BROWSE_SERVICE_URL}/stats")
+            ("download", DOWNLOAD, f"{DOWNLOAD_SERVICE_URL}/stats"),
+            ("browse", BROWSE, f"{BROWSE_SERVICE_URL}/stats")
         ]
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            for service_name, url in services:
-                try:
-                    response = await client.get(url)
-                    if response.status_code == 200:
-                        service_stats[service_name] = response.json()
-                    else:
-                        service_stats[service_name] = {"status": "unavailable"}
-                except Exception as e:
-                    service_stats[service_name] = {"status": "error", "error": str(e)}
+        for service_name, target, url in services:
+            try:
+                response = await get_http_client(target).get(url)
+                if response.status_code == 200:
+                    service_stats[service_name] = response.json()
+                else:
+                    service_stats[service_name] = {"status": "unavailable"}
+            except Exception as e:
+                service_stats[service_name] = {"status": "error", "error": str(e)}
         
         return StatsResponse(
             total_users=total_users,
@@ -220,28 +244,38 @@ async def browse_music(
     venue: Optional[str] = Query(None, description="Filter by venue"),
     page: int = Query(1, ge=1, description="Page number"),
     per_page: int = Query(20, ge=1, le=100, description="Items per page"),
+    view: Optional[str] = Query(None, description="Item view (compact, full)"),
+    fields: Optional[str] = Query(None, description="Comma-separated item fields to return"),
     request: Request = None,
     db: AsyncSession = Depends(get_db)
 ):
     """Browse Internet Archive live music using the Browse Service"""
     try:
         # Call browse service
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            params = {
-                "query": query,
-                "date_range": date_range,
-                "artist": artist,
-                "venue": venue,
-                "page": page,
-                "per_page": per_page
-            }
-            # Remove None values
-            params = {k: v for k, v in params.items() if v is not None}
-            
-            response = await client.get(f"{BROWSE_SERVICE_URL}/browse", params=params)
-            response.raise_for_status()
-            return response.json()
+        client = get_http_client(BROWSE)
+        params = {
+            "query": query,
+            "date_range": date_range,
+            "artist": artist,
+            "venue": venue,
+            "page": page,
+            "per_page": per_page,
+            "view": view,
+            "fields": fields
+        }
+        # Remove None values
+        params = {k: v for k, v in params.items() if v is not None}
+        
+        if request and wants_ndjson(request.headers.get("accept")):
+            return proxy_stream(await open_ndjson_stream(client, f"{BROWSE_SERVICE_URL}/browse", params))
+        
+        response = await client.get(f"{BROWSE_SERVICE_URL}/browse", params=params)
+        response.raise_for_status()
+        return response.json()
     except httpx.HTTPStatusError as e:
+        if e.response.status_code == 400:
+            # Bad view/fields/cursor; pass the reason through
+            raise HTTPException(status_code=400, detail=upstream_detail(e.response))
         logger.error(f"Browse service error: {e}")
         raise HTTPException(status_code=502, detail="Browse service unavailable")
     except Exception as e:
@@ -257,10 +291,10 @@ async def get_item_details(
     """Get detailed information about a specific Internet Archive item"""
     try:
         # Call browse service
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(f"{BROWSE_SERVICE_URL}/item/{identifier}")
-            response.raise_for_status()
-            return response.json()
+        client = get_http_client(BROWSE)
+        response = await client.get(f"{BROWSE_SERVICE_URL}/item/{identifier}")
+        response.raise_for_status()
+        return response.json()
     except httpx.HTTPStatusError as e:
         logger.error(f"Browse service error: {e}")
         raise HTTPException(status_code=502, detail="Browse service unavailable")
@@ -277,10 +311,10 @@ async def get_directory_structure(
     """Get directory structure and available files for an archive identifier"""
     try:
         # Call browse service
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(f"{BROWSE_SERVICE_URL}/directory/{identifier}")
-            response.raise_for_status()
-            return response.json()
+        client = get_http_client(BROWSE)
+        response = await client.get(f"{BROWSE_SERVICE_URL}/directory/{identifier}")
+        response.raise_for_status()
+        return response.json()
     except httpx.HTTPStatusError as e:
         logger.error(f"Browse service error: {e}")
         raise HTTPException(status_code=502, detail="Browse service unavailable")
@@ -302,30 +336,44 @@ async def browse_concerts(
     sort_by: Optional[str] = Query("date", description="Sort by field (date, artist, venue)"),
     sort_order: Optional[str] = Query("desc", description="Sort order (asc, desc)"),
     filter_by_concert_date: Optional[bool] = Query(False, description="Filter by concert date instead of upload date"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    source: Optional[str] = Query(None, description="Concert source (local, live)"),
+    view: Optional[str] = Query(None, description="Concert view (compact, full)"),
+    fields: Optional[str] = Query(None, description="Comma-separated concert fields to return"),
     request: Request = None,
     db: AsyncSession = Depends(get_db)
 ):
     """Browse concerts from local database using the Aggregation Service"""
     try:
         # Call aggregation service
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            params = {
-                "query": query,
-                "date_range": date_range,
-                "artist": artist,
-                "venue": venue,
-                "page": page,
-                "per_page": per_page,
-                "sort_by": sort_by,
-                "sort_order": sort_order,
-                "filter_by_concert_date": filter_by_concert_date
-            }
-            params = {k: v for k, v in params.items() if v is not None}
-            
-            response = await client.get(f"{AGGREGATION_SERVICE_URL}/concerts", params=params)
-            response.raise_for_status()
-            return response.json()
+        client = get_http_client(AGGREGATION)
+        params = {
+            "query": query,
+            "date_range": date_range,
+            "artist": artist,
+            "venue": venue,
+            "page": page,
+            "per_page": per_page,
+            "sort_by": sort_by,
+            "sort_order": sort_order,
+            "filter_by_concert_date": filter_by_concert_date,
+            "cursor": cursor,
+            "source": source,
+            "view": view,
+            "fields": fields
+        }
+        params = {k: v for k, v in params.items() if v is not None}
+        
+        if request and wants_ndjson(request.headers.get("accept")):
+            return proxy_stream(await open_ndjson_stream(client, f"{AGGREGATION_SERVICE_URL}/concerts", params))
+        
+        response = await client.get(f"{AGGREGATION_SERVICE_URL}/concerts", params=params)
+        response.raise_for_status()
+        return response.json()
     except httpx.HTTPStatusError as e:
+        if e.response.status_code == 400:
+            # Bad view/fields/cursor; pass the reason through
+            raise HTTPException(status_code=400, detail=upstream_detail(e.response))
         logger.error(f"Aggregation service error: {e}")
         raise HTTPException(status_code=502, detail="Aggregation service unavailable")
     except Exception as e:
@@ -341,10 +389,10 @@ async def get_concert_details(
     """Get detailed information about a specific concert"""
     try:
         # Call aggregation service
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(f"{AGGREGATION_SERVICE_URL}/concerts/{concert_key}")
-            response.raise_for_status()
-            return response.json()
+        client = get_http_client(AGGREGATION)
+        response = await client.get(f"{AGGREGATION_SERVICE_URL}/concerts/{concert_key}")
+        response.raise_for_status()
+        return response.json()
     except httpx.HTTPStatusError as e:
         logger.error(f"Aggregation service error: {e}")
         raise HTTPException(status_code=502, detail="Aggregation service unavailable")
@@ -366,14 +414,14 @@ async def start_download(
         auth_header = request.headers.get("Authorization", "")
         
         # Call download service
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(
-                f"{DOWNLOAD_SERVICE_URL}/downloads",
-                json=download_data.dict(),
-                headers={"Authorization": auth_header}
-            )
-            response.raise_for_status()
-            return response.json()
+        client = get_http_client(DOWNLOAD)
+        response = await client.post(
+            f"{DOWNLOAD_SERVICE_URL}/downloads",
+            json=download_data.dict(),
+            headers={"Authorization": auth_header}
+        )
+        response.raise_for_status()
+        return response.json()
     except httpx.HTTPStatusError as e:
         logger.error(f"Download service error: {e}")
         raise HTTPException(status_code=502, detail="Download service unavailable")
@@ -381,6 +429,64 @@ async def start_download(
         logger.error(f"Error starting download: {e}")
         raise HTTPException(status_code=500, detail="Failed to start download")
 
+@app.post("/downloads/recording/{identifier}", response_model=DownloadJobResponse)
+async def start_recording_download(
+    identifier: str,
+    formats: Optional[str] = Query(None, description="Comma-separated format preference, best first (e.g. 'Flac,VBR MP3')"),
+    priority: int = Query(0, ge=0, le=100),
+    current_user: dict = Depends(AuthDependencies.get_current_user),
+    request: Request = None
+):
+    """Download a whole recording as one job using the Download Service"""
+    try:
+        auth_header = request.headers.get("Authorization", "")
+        params = {"priority": priority}
+        if formats:
+            params["formats"] = formats
+        
+        client = get_http_client(DOWNLOAD)
+        response = await client.post(
+            f"{DOWNLOAD_SERVICE_URL}/downloads/recording/{identifier}",
+            params=params,
+            headers={"Authorization": auth_header}
+        )
+        response.raise_for_status()
+        return response.json()
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code == 404:
+            raise HTTPException(status_code=404, detail=upstream_detail(e.response))
+        logger.error(f"Download service error: {e}")
+        raise HTTPException(status_code=502, detail="Download service unavailable")
+    except Exception as e:
+        logger.error(f"Error starting recording download: {e}")
+        raise HTTPException(status_code=500, detail="Failed to start recording download")
+
+@app.get("/downloads/jobs/{job_id}", response_model=DownloadJobResponse)
+async def get_download_job(
+    job_id: str,
+    current_user: dict = Depends(AuthDependencies.get_current_user),
+    request: Request = None
+):
+    """Get whole-recording job progress using the Download Service"""
+    try:
+        auth_header = request.headers.get("Authorization", "")
+        
+        client = get_http_client(DOWNLOAD)
+        response = await client.get(
+            f"{DOWNLOAD_SERVICE_URL}/downloads/jobs/{job_id}",
+            headers={"Authorization": auth_header}
+        )
+        response.raise_for_status()
+        return response.json()
+    except httpx.HTTPStatusError as e:
+        if e.response.status_code == 404:
+            raise HTTPException(status_code=404, detail="Download job not found")
+        logger.error(f"Download service error: {e}")
+        raise HTTPException(status_code=502, detail="Download service unavailable")
+    except Exception as e:
+        logger.error(f"Error getting download job: {e}")
+        raise HTTPException(status_code=500, detail="Failed to get download job")
+
 @app.get("/downloads", response_model=List[DownloadResponse])
 async def get_downloads(
     current_user: dict = Depends(AuthDependencies.get_current_user),
@@ -393,13 +499,13 @@ async def get_downloads(
         auth_header = request.headers.get("Authorization", "")
         
         # Call download service
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(
-                f"{DOWNLOAD_SERVICE_URL}/downloads",
-                headers={"Authorization": auth_header}
-            )
-            response.raise_for_status()
-            return response.json()
+        client = get_http_client(DOWNLOAD)
+        response = await client.get(
+            f"{DOWNLOAD_SERVICE_URL}/downloads",
+            headers={"Authorization": auth_header}
+        )
+        response.raise_for_status()
+        return response.json()
     except httpx.HTTPStatusError as e:
         logger.error(f"Download service error: {e}")
         raise HTTPException(status_code=502, detail="Download service unavailable")
@@ -416,13 +522,13 @@ async def get_download(
     """Get specific download using the Download Service"""
     try:
         # Call download service
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(
-                f"{DOWNLOAD_SERVICE_URL}/downloads/{download_id}",
-                headers={"Authorization": f"Bearer {current_user.get('token', '')}"}
-            )
-            response.raise_for_status()
-            return response.json()
+        client = get_http_client(DOWNLOAD)
+        response = await client.get(
+            f"{DOWNLOAD_SERVICE_URL}/downloads/{download_id}",
+            headers={"Authorization": f"Bearer {current_user.get('token', '')}"}
+        )
+        response.raise_for_status()
+        return response.json()
     except httpx.HTTPStatusError as e:
         logger.error(f"Download service error: {e}")
         raise HTTPException(status_code=502, detail="Download service unavailable")
@@ -439,13 +545,13 @@ async def cancel_download(
     """Cancel a download using the Download Service"""
     try:
         # Call download service
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.delete(
-                f"{DOWNLOAD_SERVICE_URL}/downloads/{download_id}",
-                headers={"Authorization": f"Bearer {current_user.get('token', '')}"}
-            )
-            response.raise_for_status()
-            return response.json()
+        client = get_http_client(DOWNLOAD)
+        response = await client.delete(
+            f"{DOWNLOAD_SERVICE_URL}/downloads/{download_id}",
+            headers={"Authorization": f"Bearer {current_user.get('token', '')}"}
+        )
+        response.raise_for_status()
+        return response.json()
     except httpx.HTTPStatusError as e:
         logger.error(f"Download service error: {e}")
         raise HTTPException(status_code=502, detail="Download service unavailable")
@@ -460,41 +566,42 @@ async def download_file(
     request: Request = None,
     db: AsyncSession = Depends(get_db)
 ):
-    """Download/save a completed file to the user's system"""
+    """Download/save a completed file to the user's system
+
+    The body is relayed chunk by chunk from the download service (which
+    checks ownership and completion), so gateway memory stays constant
+    whatever the file size. Range and cache validators pass through both ways.
+    """
     try:
-        # Get the original Authorization header
-        auth_header = request.headers.get("Authorization", "")
+        headers = {"Authorization": request.headers.get("Authorization", "")}
+        for name in FILE_PROXY_REQUEST_HEADERS:
+            if name in request.headers:
+                headers[name] = request.headers[name]
         
-        # Get the download info first to verify it exists and is completed
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            download_response = await client.get(
-                f"{DOWNLOAD_SERVICE_URL}/downloads/{download_id}",
-                headers={"Authorization": auth_header}
-            )
-            download_response.raise_for_status()
-            download_data = download_response.json()
-            
-            if download_data.get("status") != "completed":
-                raise HTTPException(status_code=400, detail="Download not completed yet")
-            
-            # Now get the actual file
-            file_response = await client.get(
-                f"{DOWNLOAD_SERVICE_URL}/downloads/{download_id}/file",
-                headers={"Authorization": auth_header}
-            )
+        client = get_http_client(DOWNLOAD)
+        file_response = await client.send(
+            client.build_request("GET", f"{DOWNLOAD_SERVICE_URL}/downloads/{download_id}/file", headers=headers),
+            stream=True
+        )
+        if file_response.is_error:
+            await file_response.aread()
             file_response.raise_for_status()
-            
-            # Return file response with proper headers
-            from fastapi.responses import Response
-            return Response(
-                content=file_response.content,
-                media_type=file_response.headers.get("content-type", "application/octet-stream"),
-                headers={
-                    "Content-Disposition": f"attachment; filename=\"{download_data.get('filename', 'download')}\"",
-                    "Content-Length": str(len(file_response.content))
-                }
-            )
+        
+        return StreamingResponse(
+            file_response.aiter_raw(),
+            status_code=file_response.status_code,  # 200, 206 or 304
+            media_type=file_response.headers.get("content-type", "application/octet-stream"),
+            headers={
+                name: file_response.headers[name]
+                for name in FILE_PROXY_RESPONSE_HEADERS if name in file_response.headers
+            },
+            background=BackgroundTask(file_response.aclose)
+        )
     except httpx.HTTPStatusError as e:
+        if e.response.status_code in (400, 404, 416):
+            # Not found / not completed / unsatisfiable range: the client's problem, not ours
+            detail = e.response.json().get("detail") if e.response.headers.get("content-type") == "application/json" else None
+            raise HTTPException(status_code=e.response.status_code, detail=detail or e.response.reason_phrase)
         logger.error(f"Download service error: {e}")
         raise HTTPException(status_code=502, detail="Download service unavailable")
     except Exception as e:
@@ -512,10 +619,10 @@ async def get_cache_info(
     """Get cache information using the Browse Service"""
     try:
         # Call browse service
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.get(f"{BROWSE_SERVICE_URL}/cache")
-            response.raise_for_status()
-            return response.json()
+        client = get_http_client(BROWSE)
+        response = await client.get(f"{BROWSE_SERVICE_URL}/cache")
+        response.raise_for_status()
+        return response.json()
     except httpx.HTTPStatusError as e:
         logger.error(f"Browse service error: {e}")
         raise HTTPException(status_code=502, detail="Browse service unavailable")
@@ -532,11 +639,11 @@ async def clear_cache(
     """Clear cache using the Browse Service"""
     try:
         # Call browse service
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            params = {"cache_type": cache_type} if cache_type else {}
-            response = await client.delete(f"{BROWSE_SERVICE_URL}/cache", params=params)
-            response.raise_for_status()
-            return response.json()
+        client = get_http_client(BROWSE)
+        params = {"cache_type": cache_type} if cache_type else {}
+        response = await client.delete(f"{BROWSE_SERVICE_URL}/cache", params=params)
+        response.raise_for_status()
+        return response.json()
     except httpx.HTTPStatusError as e:
         logger.error(f"Browse service error: {e}")
         raise HTTPException(status_code=502, detail="Browse service unavailable")
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark browse-service cache payload encodings
+Compares the legacy json.dumps/json.loads text format against the versioned
+compressed serializers in shared/serialization.py on realistic 100-item
+/browse pages.
+
+Usage: python benchmarks/bench_cache_serialization.py [--items 100] [--rounds 200]
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from shared.serialization import SERIALIZERS, encode_payload, decode_payload
+
+VENUES = ["Fillmore West", "Winterland Arena", "Red Rocks Amphitheater", "Madison Square Garden",
+          "Greek Theater", "Capitol Theater", "Alpine Valley Music Theater", "The Spectrum"]
+LOCATIONS = ["San Francisco, CA", "Morrison, CO", "New York, NY", "Berkeley, CA",
+             "Port Chester, NY", "East Troy, WI", "Philadelphia, PA"]
+ARTISTS = ["Grateful Dead", "Phish", "Widespread Panic", "moe.", "String Cheese Incident"]
+WORDS = ("set one jam segue encore soundboard audience matrix source lineage taper "
+         "transfer remaster flac dat cassette reel tracklist notes tuning crowd").split()
+
+def make_item(rng: random.Random, index: int) -> dict:
+    """Build one ArchiveItem dump shaped like a real etree search result"""
+    artist = rng.choice(ARTISTS)
+    venue = rng.choice(VENUES)
+    location = rng.choice(LOCATIONS)
+    date = f"19{rng.randint(65, 99)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}"
+    identifier = f"{artist.lower().replace(' ', '')}{date.replace('-', '')}.{index}.sbd"
+    description = "\n".join(
+        " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 20)))
+        for _ in range(rng.randint(10, 40))
+    )
+    tracks = [
+        {
+            "track_number": None,
+            "title": " ".join(rng.choice(WORDS) for _ in range(3)).title(),
+            "filename": f"{identifier}d1t{t:02d}.flac",
+            "file_format": "Flac",
+            "file_size": rng.randint(5_000_000, 80_000_000),
+            "duration": None,
+            "download_url": f"https://archive.org/download/{identifier}/{identifier}d1t{t:02d}.flac"
+        }
+        for t in range(rng.randint(0, 10))
+    ]
+    return {
+        "identifier": identifier,
+        "title": f"{artist} Live at {venue}, {location} on {date}",
+        "artist": artist,
+        "date": f"{date}T00:00:00",
+        "venue": venue,
+        "location": location,
+        "description": description,
+        "source": "SBD > DAT > CD > EAC > FLAC",
+        "taper": "unknown",
+        "lineage": "SHNtool > FLAC level 8",
+        "total_tracks": len(tracks),
+        "total_size": sum(t["file_size"] for t in tracks),
+        "tracks": tracks or None,
+        "downloads": rng.randint(0, 50_000)
+    }
+
+def make_page(items: int, seed: int = 42) -> dict:
+    """Build an ArchiveSearchResponse dump"""
+    rng = random.Random(seed)
+    return {
+        "success": True,
+        "message": None,
+        "total": 150_000,
+        "page": 1,
+        "per_page": items,
+        "total_pages": 150_000 // items,
+        "results": [make_item(rng, i) for i in range(items)]
+    }
+
+def timeit(func, rounds: int) -> float:
+    """Mean milliseconds per call"""
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func()
+    return (time.perf_counter() - start) * 1000 / rounds
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark cache payload encodings")
+    parser.add_argument("--items", type=int, default=100, help="Items per page")
+    parser.add_argument("--rounds", type=int, default=200, help="Iterations per measurement")
+    args = parser.parse_args()
+
+    page = make_page(args.items)
+    print(f"📦 Page with {args.items} items, {args.rounds} rounds each\n")
+    print(f"{'format':<16}{'size (bytes)':>14}{'encode ms':>12}{'decode ms':>12}")
+    print("-" * 54)
+
+    text = json.dumps(page)
+    encode_ms = timeit(lambda: json.dumps(page), args.rounds)
+    decode_ms = timeit(lambda: json.loads(text), args.rounds)
+    print(f"{'json (legacy)':<16}{len(text.encode()):>14}{encode_ms:>12.3f}{decode_ms:>12.3f}")
+
+    for name, serializer in SERIALIZERS.items():
+        blob = encode_payload(page, serializer)
+        assert decode_payload(blob) == page
+        encode_ms = timeit(lambda: encode_payload(page, serializer), args.rounds)
+        decode_ms = timeit(lambda: decode_payload(blob), args.rounds)
+        print(f"{name:<16}{len(blob):>14}{encode_ms:>12.3f}{decode_ms:>12.3f}")
+
+if __name__ == "__main__":
+    main()
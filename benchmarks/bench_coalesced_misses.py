@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Concurrency check for coalesced cache misses
+Fires more concurrent identical cold /browse, /item and /directory requests
+than the database connection pool holds (5 + 10 overflow) against a slow
+stubbed Internet Archive, and checks that every request succeeds with one
+upstream call per key and without waiting on the pool timeout. Exits
+non-zero on failure.
+
+Usage: python benchmarks/bench_coalesced_misses.py [--requests 40] [--upstream-delay 0.5]
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/bench_coalesced.db")
+
+import httpx
+from shared import http as shared_http
+from bench_normalize import make_docs
+
+async def run(args) -> bool:
+    upstream_calls = {"search": 0, "metadata": 0}
+
+    async def archive(request):
+        await asyncio.sleep(args.upstream_delay)
+        if "advancedsearch" in request.url.path:
+            upstream_calls["search"] += 1
+            return httpx.Response(200, json={"response": {"docs": make_docs(20, 1), "numFound": 20}})
+        upstream_calls["metadata"] += 1
+        return httpx.Response(200, json={
+            "metadata": {"identifier": "gd1977-05-08", "title": "Grateful Dead Live at Barton Hall on 1977-05-08"},
+            "files": [{"name": "d1t01.flac", "format": "Flac", "size": "1000", "length": "300"}]
+        })
+
+    shared_http.HTTPClientPool._create_client = lambda self, target: httpx.AsyncClient(
+        transport=httpx.MockTransport(archive)
+    )
+    from backend.browse_service import main as browse
+    from shared.database import init_db
+    await init_db()
+    await browse.ensure_search_index()
+    shared_http.start_http_clients(shared_http.ARCHIVE)
+
+    ok = True
+    print(f"📦 {args.requests} concurrent identical cold requests per endpoint\n")
+    print(f"{'endpoint':<28}{'ok':>6}{'failed':>8}{'seconds':>10}")
+    print("-" * 52)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=browse.app), base_url="http://bench", timeout=120) as client:
+        for path in ["/browse?per_page=20", "/item/gd1977-05-08", "/directory/gd1977-05-08"]:
+            start = time.perf_counter()
+            responses = await asyncio.gather(*[client.get(path) for _ in range(args.requests)])
+            elapsed = time.perf_counter() - start
+            succeeded = sum(response.status_code == 200 for response in responses)
+            print(f"{path:<28}{succeeded:>6}{len(responses) - succeeded:>8}{elapsed:>10.2f}")
+            if succeeded < len(responses) or elapsed > args.max_seconds:
+                ok = False
+
+    print(f"\nupstream calls: {upstream_calls}")
+    browse.shutdown_process_pool()
+    await shared_http.close_http_clients()
+    return ok
+
+def main():
+    parser = argparse.ArgumentParser(description="Check coalesced cache misses under pool pressure")
+    parser.add_argument("--requests", type=int, default=40, help="Concurrent requests per endpoint")
+    parser.add_argument("--upstream-delay", type=float, default=0.5, help="Stub upstream latency in seconds")
+    parser.add_argument("--max-seconds", type=float, default=10, help="Fail if a burst takes longer than this")
+    args = parser.parse_args()
+    sys.exit(0 if asyncio.run(run(args)) else 1)
+
+if __name__ == "__main__":
+    main()
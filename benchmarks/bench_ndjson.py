@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Benchmark /browse as one JSON document vs streamed NDJSON
+Serves the browse service in-process (uvicorn) against a stubbed advancedsearch backend
+and reports time to first byte, total time and peak Python memory (tracemalloc)
+for uncached 100-item pages.
+
+Usage: python benchmarks/bench_ndjson.py [--items 100] [--rounds 10]
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+os.environ.setdefault("DATABASE_URL", f"sqlite+aiosqlite:///{tempfile.mkdtemp()}/bench_ndjson.db")
+
+import httpx
+from shared import http as shared_http
+from bench_normalize import make_docs
+
+async def measure(client: httpx.AsyncClient, params: dict, headers: dict) -> tuple:
+    """(ttfb ms, total ms, peak KiB) for one request"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    ttfb = None
+    async with client.stream("GET", "/browse", params=params, headers=headers) as response:
+        async for _ in response.aiter_bytes():
+            if ttfb is None:
+                ttfb = time.perf_counter() - start
+    total = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return ttfb * 1000, total * 1000, peak / 1024
+
+async def run(args):
+    pages = {}
+
+    async def advancedsearch(request):
+        page = int(request.url.params["page"])
+        docs = pages.setdefault(page, make_docs(args.items, page))
+        return httpx.Response(200, json={"response": {"docs": docs, "numFound": 100_000}})
+
+    shared_http.HTTPClientPool._create_client = lambda self, target: httpx.AsyncClient(
+        transport=httpx.MockTransport(advancedsearch)
+    )
+    from backend.browse_service import main as browse
+    from shared.database import init_db
+    await init_db()
+    await browse.ensure_search_index()
+    shared_http.start_http_clients(shared_http.ARCHIVE)
+
+    print(f"📦 {args.rounds} uncached pages of {args.items} items\n")
+    print(f"{'format':<12}{'ttfb ms':>10}{'total ms':>10}{'peak KiB':>10}")
+    print("-" * 42)
+
+    # A real server, since ASGITransport buffers whole responses
+    import uvicorn
+    server = uvicorn.Server(uvicorn.Config(browse.app, port=args.port, log_level="warning", lifespan="off"))
+    serve_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{args.port}", timeout=60) as client:
+        for label, headers, offset in [("json", {}, 0), ("ndjson", {"Accept": "application/x-ndjson"}, 1000)]:
+            results = [
+                await measure(client, {"per_page": args.items, "page": offset + round_}, headers)
+                for round_ in range(1, args.rounds + 1)
+            ]
+            ttfb, total, peak = (sum(r[i] for r in results) / len(results) for i in range(3))
+            print(f"{label:<12}{ttfb:>10.1f}{total:>10.1f}{peak:>10.0f}")
+
+    server.should_exit = True
+    await serve_task
+    browse.shutdown_process_pool()
+    await shared_http.close_http_clients()
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark JSON vs NDJSON browse pages")
+    parser.add_argument("--items", type=int, default=100, help="Items per page")
+    parser.add_argument("--rounds", type=int, default=10, help="Pages per format")
+    parser.add_argument("--port", type=int, default=8091, help="Port for the in-process server")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Benchmark advancedsearch page normalization
+Compares per-document ArchiveItem validation (the original process_archive_item
+loop) against the batch stage in backend/browse_service/normalize.py, inline and
+offloaded to worker processes, and measures event-loop lag while a burst of
+large pages is normalized.
+
+Usage: python benchmarks/bench_normalize.py [--items 1000] [--pages 8]
+"""
+
+import sys
+import time
+import asyncio
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import backend.browse_service.normalize as normalize
+from shared.models import ArchiveItem, ArchiveTrack
+from shared.venue_parser import parse_venue_locations
+from bench_cache_serialization import make_page
+
+def make_docs(items: int, seed: int) -> list:
+    """Raw advancedsearch docs (string sizes/lengths, as IA returns them)"""
+    docs = []
+    for item in make_page(items, seed)["results"]:
+        docs.append({
+            "identifier": item["identifier"],
+            "title": item["title"],
+            "creator": item["artist"],
+            "date": item["date"],
+            "description": item["description"],
+            "source": item["source"],
+            "downloads": item["downloads"],
+            "files": [
+                {"name": t["filename"], "format": t["file_format"], "size": str(t["file_size"]), "length": "312"}
+                for t in item["tracks"] or []
+            ]
+        })
+    return docs
+
+def legacy_normalize(docs: list) -> list:
+    """Per-document pydantic construction, as process_archive_item did it"""
+    items = []
+    for doc, (venue, location) in zip(docs, parse_venue_locations(docs)):
+        audio_files = [f for f in doc.get("files", []) if f.get("format") in normalize.AUDIO_FORMATS]
+        tracks = [
+            ArchiveTrack(
+                title=f.get("title", f.get("name", "Unknown Track")),
+                filename=f.get("name", ""),
+                file_format=f.get("format"),
+                file_size=f.get("size"),
+                duration=f.get("length"),
+                download_url=f"https://archive.org/download/{doc['identifier']}/{f.get('name', '')}"
+            )
+            for f in audio_files[:10]
+        ]
+        items.append(ArchiveItem(
+            identifier=doc["identifier"],
+            title=doc.get("title", "Unknown Title"),
+            artist=doc.get("creator"),
+            date=normalize.parse_item_date(doc.get("date")),
+            venue=venue,
+            location=location,
+            description=doc.get("description"),
+            source=doc.get("source"),
+            total_tracks=len(audio_files),
+            total_size=sum(int(f.get("size", 0)) for f in audio_files),
+            tracks=tracks or None,
+            downloads=doc.get("downloads", 0)
+        ))
+    return items
+
+async def max_loop_lag(work) -> tuple:
+    """Run work() while a ticker measures the worst event-loop stall (ms)"""
+    lag = 0.0
+    done = False
+
+    async def ticker():
+        nonlocal lag
+        while not done:
+            start = time.perf_counter()
+            await asyncio.sleep(0.001)
+            lag = max(lag, (time.perf_counter() - start - 0.001) * 1000)
+
+    tick = asyncio.create_task(ticker())
+    await asyncio.sleep(0)
+    start = time.perf_counter()
+    await work()
+    elapsed = (time.perf_counter() - start) * 1000
+    done = True
+    await tick
+    return elapsed, lag
+
+async def run(args):
+    pages = [make_docs(args.items, seed) for seed in range(args.pages)]
+    batch_items = [normalize.build_item(fields) for fields in normalize.normalize_search_docs(pages[0])]
+    assert [i.model_dump() for i in batch_items] == [i.model_dump() for i in legacy_normalize(pages[0])]
+
+    print(f"📦 burst of {args.pages} pages x {args.items} docs\n")
+    print(f"{'stage':<28}{'total ms':>10}{'max lag ms':>12}")
+    print("-" * 50)
+
+    async def legacy():
+        for page in pages:
+            legacy_normalize(page)
+
+    async def batch(threshold):
+        normalize.NORMALIZE_PROCESS_THRESHOLD = threshold
+        await asyncio.gather(*[normalize.normalize_search_page(page) for page in pages])
+
+    for label, work in [
+        ("per-doc validation", legacy),
+        ("batch, inline", lambda: batch(0)),
+        ("batch, process pool", lambda: batch(1)),
+    ]:
+        elapsed, lag = await max_loop_lag(work)
+        print(f"{label:<28}{elapsed:>10.1f}{lag:>12.1f}")
+
+    normalize.shutdown_process_pool()
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark search page normalization")
+    parser.add_argument("--items", type=int, default=1000, help="Docs per page")
+    parser.add_argument("--pages", type=int, default=8, help="Pages in the burst")
+    args = parser.parse_args()
+
+    # Start the workers up front so pool startup isn't counted as lag
+    normalize.get_process_pool().submit(normalize.normalize_search_docs, []).result()
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Benchmark single-stream vs segmented downloads
+Runs benchmarks/range_stub.py in-process (uvicorn) with a per-connection rate
+cap and downloads its file through backend/download_service/transfer.py, once
+as a single stream and once per segment count, checking the bytes on disk.
+
+Usage: python benchmarks/bench_segmented_download.py [--size-mb 64] [--rate-mbps 8] [--segments 2,4,8]
+"""
+
+import sys
+import time
+import asyncio
+import hashlib
+import argparse
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import httpx
+import backend.download_service.transfer as transfer
+from range_stub import create_app, make_body
+
+async def timed_download(url: str, path: Path, segments: int) -> float:
+    """Seconds to download url to path with the given segment count (1 = single stream)"""
+    transfer.DOWNLOAD_SEGMENTS = segments
+    transfer.DOWNLOAD_SEGMENTED_MIN_BYTES = 0
+    path.unlink(missing_ok=True)
+
+    async def on_progress(written, total, validator, segment_state):
+        pass
+
+    async with httpx.AsyncClient(timeout=60) as client, \
+            httpx.AsyncClient(timeout=60, limits=httpx.Limits(max_connections=segments)) as segment_client:
+        start = time.perf_counter()
+        await transfer.download_resumable(
+            client, url, path, 0, None, on_progress,
+            segment_client=segment_client if segments > 1 else None
+        )
+        return time.perf_counter() - start
+
+async def run(args):
+    size = int(args.size_mb * 1024 * 1024)
+    app = create_app(size, args.rate_mbps * 1024 * 1024)
+    expected = hashlib.md5(make_body(size)).hexdigest()
+
+    import uvicorn
+    server = uvicorn.Server(uvicorn.Config(app, port=args.port, log_level="warning", lifespan="off"))
+    serve_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    url = f"http://127.0.0.1:{args.port}/download/bench/file.flac"
+    path = Path(tempfile.mkdtemp()) / "file.flac"
+
+    print(f"📦 {args.size_mb:g} MiB file, {args.rate_mbps:g} MiB/s per connection\n")
+    print(f"{'mode':<16}{'seconds':>10}{'MiB/s':>10}{'requests':>10}")
+    print("-" * 46)
+    for segments in [1] + [int(n) for n in args.segments.split(",")]:
+        app.state.requests = 0
+        elapsed = await timed_download(url, path, segments)
+        assert hashlib.md5(path.read_bytes()).hexdigest() == expected, "downloaded bytes differ"
+        label = "single stream" if segments == 1 else f"{segments} segments"
+        print(f"{label:<16}{elapsed:>10.2f}{args.size_mb / elapsed:>10.1f}{app.state.requests:>10}")
+
+    path.unlink(missing_ok=True)
+    server.should_exit = True
+    await serve_task
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark single-stream vs segmented downloads")
+    parser.add_argument("--size-mb", type=float, default=64, help="File size in MiB")
+    parser.add_argument("--rate-mbps", type=float, default=8, help="Per-connection rate cap in MiB/s (0 = none)")
+    parser.add_argument("--segments", default="2,4,8", help="Segment counts to compare")
+    parser.add_argument("--port", type=int, default=8095, help="Port for the in-process stub")
+    args = parser.parse_args()
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()
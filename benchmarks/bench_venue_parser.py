@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmark venue/location extraction on advancedsearch pages
+Compares the original per-document extraction (inline `import re`, patterns
+looked up on every call) against shared/venue_parser.py cold (empty memo) and
+warm (page seen before), reporting per-item cost on 100-doc pages.
+
+Usage: python benchmarks/bench_venue_parser.py [--items 100] [--rounds 200]
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from shared.venue_parser import parse_venue_locations, clear_venue_parser_cache
+from bench_cache_serialization import make_page
+
+def legacy_extract(doc: dict):
+    """Venue/location extraction as process_archive_item originally did it"""
+    title_text = doc.get("title", "")
+    description_text = doc.get("description", "")
+    venue = None
+    location = None
+
+    import re
+
+    at_pattern = r"(?:Live\s+)?at\s+(.+?)(?:\s+on\s+\d{4}-\d{2}-\d{2}|\s*$)"
+    match = re.search(at_pattern, title_text, re.IGNORECASE)
+    if match:
+        venue_location_part = match.group(1).strip()
+        if "," in venue_location_part:
+            parts = venue_location_part.split(",", 1)
+            venue = parts[0].strip()
+            location = parts[1].strip()
+        else:
+            venue = venue_location_part
+            location = None
+
+    if not venue and description_text:
+        lines = description_text.split('\n')
+        for line in lines[:3]:
+            venue_match = re.search(r'([A-Z][a-z\s]+(?:Amphitheater|Theater|Arena|Stadium|Center|Hall|Club|Bar|Resort|Festival))', line)
+            if venue_match:
+                venue = venue_match.group(1).strip()
+                break
+
+    if venue:
+        venue = re.sub(r'\s+on\s+\d{4}-\d{2}-\d{2}$', '', venue)
+        venue = re.sub(r'\s*-\s*[^-]+$', '', venue)
+        venue = venue.strip()
+        venue = re.sub(r'\b(?:Festival|Resort|Resort)\b', '', venue).strip()
+
+    return venue, location
+
+def make_docs(items: int, seed: int) -> list:
+    """Search docs; a third have no venue in the title so the description is scanned"""
+    docs = make_page(items, seed)["results"]
+    for index, doc in enumerate(docs):
+        if index % 3 == 0:
+            doc["title"] = f"{doc['artist']} {doc['date'][:10]}"
+            doc["description"] = f"Recorded live at the Capitol Theater\n{doc['description']}"
+    return docs
+
+def per_item_us(func, pages: list, items: int) -> float:
+    """Mean microseconds per document"""
+    start = time.perf_counter()
+    for page in pages:
+        func(page)
+    return (time.perf_counter() - start) * 1_000_000 / (len(pages) * items)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark venue/location extraction")
+    parser.add_argument("--items", type=int, default=100, help="Docs per page")
+    parser.add_argument("--rounds", type=int, default=200, help="Pages per measurement")
+    args = parser.parse_args()
+
+    # Distinct pages for cold runs, so the memo never hits
+    pages = [make_docs(args.items, seed) for seed in range(args.rounds)]
+
+    for page in pages[:5]:
+        assert parse_venue_locations(page) == [legacy_extract(doc) for doc in page]
+
+    print(f"📦 {args.rounds} pages of {args.items} docs\n")
+    print(f"{'extractor':<24}{'us / item':>12}")
+    print("-" * 36)
+
+    legacy = per_item_us(lambda page: [legacy_extract(doc) for doc in page], pages, args.items)
+    print(f"{'legacy (per doc)':<24}{legacy:>12.2f}")
+
+    clear_venue_parser_cache()
+    cold = per_item_us(parse_venue_locations, pages, args.items)
+    print(f"{'venue_parser (cold)':<24}{cold:>12.2f}")
+
+    warm = per_item_us(parse_venue_locations, pages, args.items)
+    print(f"{'venue_parser (warm)':<24}{warm:>12.2f}")
+
+if __name__ == "__main__":
+    main()
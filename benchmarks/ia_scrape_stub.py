@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Internet Archive scrape API
+Serves a synthetic etree catalog with cursor paging and addeddate range
+filtering, so catalog ingestion can run offline:
+
+    python benchmarks/ia_scrape_stub.py --items 20000 --port 8090
+    IA_SCRAPE_URL=http://127.0.0.1:8090/services/search/v1/scrape \\
+        uvicorn backend.aggregation_service.main:app --port 8003
+    curl -X POST http://127.0.0.1:8003/ingest
+
+Usage: python benchmarks/ia_scrape_stub.py [--items 20000] [--port 8090] [--seed 42]
+"""
+
+import re
+import sys
+import base64
+import random
+import argparse
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi import FastAPI, Query
+
+ARTISTS = ["Grateful Dead", "Phish", "Widespread Panic", "moe.", "String Cheese Incident",
+           "Umphrey's McGee", "Leftover Salmon", "Yonder Mountain String Band"]
+VENUES = [("Fillmore West", "San Francisco, CA"), ("Red Rocks Amphitheater", "Morrison, CO"),
+          ("Madison Square Garden", "New York, NY"), ("Greek Theater", "Berkeley, CA"),
+          ("Capitol Theater", "Port Chester, NY"), ("Alpine Valley Music Theater", "East Troy, WI")]
+SOURCES = ["SBD > DAT > CD > EAC > FLAC", "AUD > Cassette > DAT > FLAC", "Matrix > FLAC"]
+ADDED_PATTERN = re.compile(r"addeddate:\[(\S+) TO (\S+)\]")
+
+def make_catalog(items: int, seed: int = 42) -> List[dict]:
+    """Build scrape API documents; several recordings share each artist/date"""
+    rng = random.Random(seed)
+    added_base = datetime(2005, 1, 1)
+    docs = []
+    for index in range(items):
+        concert = index // 3  # ~3 recordings per concert
+        concert_rng = random.Random(seed * 1_000_003 + concert)
+        artist = concert_rng.choice(ARTISTS)
+        venue, location = concert_rng.choice(VENUES)
+        date = f"19{concert_rng.randint(65, 99)}-{concert_rng.randint(1, 12):02d}-{concert_rng.randint(1, 28):02d}"
+        identifier = f"{re.sub(r'[^a-z]', '', artist.lower())}{date.replace('-', '')}.{index}"
+        added = added_base + timedelta(minutes=index * 7)
+        docs.append({
+            "identifier": identifier,
+            "title": f"{artist} Live at {venue}, {location} on {date}",
+            "creator": artist,
+            "date": date,
+            "venue": venue if rng.random() > 0.2 else None,
+            "coverage": location,
+            "description": f"Set 1: ... Set 2: ... recorded by {rng.choice(['taper1', 'taper2'])}",
+            "source": rng.choice(SOURCES),
+            "downloads": rng.randint(0, 50_000),
+            "addeddate": added.strftime("%Y-%m-%dT%H:%M:%SZ")
+        })
+    return docs
+
+def encode_cursor(offset: int) -> str:
+    return base64.urlsafe_b64encode(str(offset).encode()).decode()
+
+def decode_cursor(cursor: str) -> int:
+    return int(base64.urlsafe_b64decode(cursor.encode()).decode())
+
+def create_app(docs: List[dict]) -> FastAPI:
+    """Scrape API app over docs (also usable in-process with httpx.ASGITransport)"""
+    app = FastAPI(title="IA scrape stub")
+    app.state.docs = docs
+
+    @app.get("/services/search/v1/scrape")
+    async def scrape(
+        q: str = Query(...),
+        fields: Optional[str] = Query(None),
+        count: int = Query(5000, ge=100, le=10000),
+        cursor: Optional[str] = Query(None)
+    ):
+        matching = app.state.docs
+        range_match = ADDED_PATTERN.search(q)
+        if range_match:
+            low, high = range_match.groups()
+            matching = [
+                doc for doc in matching
+                if (low == "null" or doc["addeddate"] >= low) and (high == "null" or doc["addeddate"] <= high)
+            ]
+
+        offset = decode_cursor(cursor) if cursor else 0
+        page = matching[offset:offset + count]
+        wanted = fields.split(",") if fields else None
+        if wanted:
+            page = [{k: v for k, v in doc.items() if k in wanted and v is not None} for doc in page]
+
+        body = {"items": page, "count": len(page), "total": len(matching)}
+        if offset + count < len(matching):
+            body["cursor"] = encode_cursor(offset + count)
+        return body
+
+    return app
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve a synthetic IA scrape API")
+    parser.add_argument("--items", type=int, default=20000, help="Catalog size")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed")
+    parser.add_argument("--port", type=int, default=8090, help="Port to listen on")
+    args = parser.parse_args()
+
+    import uvicorn
+    print(f"📦 Serving {args.items} synthetic etree items on port {args.port}")
+    uvicorn.run(create_app(make_catalog(args.items, args.seed)), host="127.0.0.1", port=args.port)
+
+if __name__ == "__main__":
+    main()
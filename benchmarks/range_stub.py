@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Range-capable stub file server
+Serves one synthetic file at /download/<name> with HEAD, Accept-Ranges, a
+strong ETag and single-range requests (206/416/If-Range), throttled per
+response to mimic the per-connection bandwidth cap of archive.org mirrors.
+
+Usage: python benchmarks/range_stub.py [--size-mb 64] [--rate-mbps 8] [--port 8095]
+"""
+
+import asyncio
+import argparse
+import hashlib
+
+from fastapi import FastAPI, Request
+from fastapi.responses import Response, StreamingResponse
+
+CHUNK_SIZE = 64 * 1024
+
+def make_body(size: int) -> bytes:
+    """Deterministic, non-repeating-per-chunk file contents"""
+    block = hashlib.sha256(b"setscrape").digest() * (CHUNK_SIZE // 32)
+    return (block * (size // len(block) + 1))[:size]
+
+def parse_range(value: str, size: int):
+    """(start, end) of a single 'bytes=a-b' range, or None if unsatisfiable"""
+    span = value.removeprefix("bytes=").split(",")[0].strip()
+    first, _, last = span.partition("-")
+    if not first:
+        start, end = max(size - int(last), 0), size - 1
+    else:
+        start, end = int(first), int(last) if last else size - 1
+    if start >= size or start > end:
+        return None
+    return start, min(end, size - 1)
+
+def create_app(size: int, rate: float) -> FastAPI:
+    """Stub app serving a size-byte file at rate bytes/sec per response (0 = unthrottled)"""
+    app = FastAPI()
+    body = make_body(size)
+    etag = f'"{hashlib.md5(body).hexdigest()}"'
+    app.state.requests = 0
+
+    async def throttled(start: int, end: int):
+        for offset in range(start, end + 1, CHUNK_SIZE):
+            chunk = body[offset:min(offset + CHUNK_SIZE, end + 1)]
+            yield chunk
+            if rate:
+                await asyncio.sleep(len(chunk) / rate)
+
+    @app.head("/download/{name:path}")
+    async def head(name: str):
+        return Response(headers={"content-length": str(size), "accept-ranges": "bytes", "etag": etag})
+
+    @app.get("/download/{name:path}")
+    async def download(name: str, request: Request):
+        app.state.requests += 1
+        headers = {"accept-ranges": "bytes", "etag": etag}
+        range_header = request.headers.get("range")
+        if_range = request.headers.get("if-range")
+        if range_header and (not if_range or if_range == etag):
+            span = parse_range(range_header, size)
+            if span is None:
+                return Response(status_code=416, headers={"content-range": f"bytes */{size}"})
+            start, end = span
+            headers["content-range"] = f"bytes {start}-{end}/{size}"
+            headers["content-length"] = str(end - start + 1)
+            return StreamingResponse(throttled(start, end), status_code=206, headers=headers,
+                                     media_type="application/octet-stream")
+        headers["content-length"] = str(size)
+        return StreamingResponse(throttled(0, size - 1), headers=headers, media_type="application/octet-stream")
+
+    return app
+
+def main():
+    parser = argparse.ArgumentParser(description="Range-capable stub file server")
+    parser.add_argument("--size-mb", type=float, default=64, help="File size in MiB")
+    parser.add_argument("--rate-mbps", type=float, default=8, help="Per-connection rate in MiB/s (0 = unthrottled)")
+    parser.add_argument("--port", type=int, default=8095)
+    args = parser.parse_args()
+
+    import uvicorn
+    app = create_app(int(args.size_mb * 1024 * 1024), args.rate_mbps * 1024 * 1024)
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
+
+if __name__ == "__main__":
+    main()
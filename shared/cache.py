@@ -5,13 +5,28 @@ from typing import Any, Optional, Dict, List
 from datetime import datetime, timedelta
 import threading
 import time
+from collections import OrderedDict
 
 class InMemoryCache:
-    """Simple in-memory cache to replace Redis for local development"""
+    """Simple in-memory cache to replace Redis for local development
     
-    def __init__(self):
-        self._cache: Dict[str, Dict[str, Any]] = {}
+    When max_entries or max_bytes is given the cache is bounded and evicts
+    least recently used keys first. Entry sizes are supplied by the caller
+    or estimated from the pickled value.
+    """
+    
+    def __init__(self, max_entries: Optional[int] = None, max_bytes: Optional[int] = None,
+                 cleanup_interval: int = 60):
+        self._cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
         self._lock = threading.Lock()
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.cleanup_interval = cleanup_interval
         self._cleanup_task = None
         self._start_cleanup_task()
     
@@ -19,7 +34,7 @@ class InMemoryCache:
         """Start background task to clean expired keys"""
         def cleanup_loop():
             while True:
-                time.sleep(60)  # Clean every minute
+                time.sleep(self.cleanup_interval)
                 self._cleanup_expired()
         
         cleanup_thread = threading.Thread(target=cleanup_loop, daemon=True)
@@ -34,21 +49,56 @@ class InMemoryCache:
                 if value.get('expires_at') and current_time > value['expires_at']
             ]
             for key in expired_keys:
-                del self._cache[key]
+                self._remove(key)
+            self.expirations += len(expired_keys)
+    
+    def _remove(self, key: str):
+        """Remove a key and release its size (caller holds the lock)"""
+        entry = self._cache.pop(key)
+        self._total_bytes -= entry.get('size', 0)
+    
+    def _evict(self):
+        """Evict least recently used keys until within bounds (caller holds the lock)"""
+        while self._cache and (
+            (self.max_entries is not None and len(self._cache) > self.max_entries) or
+            (self.max_bytes is not None and self._total_bytes > self.max_bytes)
+        ):
+            key = next(iter(self._cache))
+            self._remove(key)
+            self.evictions += 1
+    
+    @staticmethod
+    def _estimate_size(value: Any) -> int:
+        """Approximate the memory footprint of a value in bytes"""
+        try:
+            return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+        except Exception:
+            return 0
     
-    def set(self, key: str, value: Any, expire: Optional[int] = None) -> bool:
-        """Set a key-value pair with optional expiration (seconds)"""
+    def set(self, key: str, value: Any, expire: Optional[int] = None, size: Optional[int] = None) -> bool:
+        """Set a key-value pair with optional expiration (seconds) and size (bytes)"""
         try:
+            bounded = self.max_entries is not None or self.max_bytes is not None
+            if size is None and self.max_bytes is not None:
+                size = self._estimate_size(value)
+            
             with self._lock:
                 cache_entry = {
                     'value': value,
-                    'created_at': datetime.utcnow()
+                    'created_at': datetime.utcnow(),
+                    'size': size or 0
                 }
                 if expire:
                     cache_entry['expires_at'] = datetime.utcnow() + timedelta(seconds=expire)
                 
+                if key in self._cache:
+                    self._remove(key)
                 self._cache[key] = cache_entry
-                return True
+                self._total_bytes += cache_entry['size']
+                
+                if bounded:
+                    self._evict()
+                return key in self._cache
         except Exception:
             return False
     
@@ -57,15 +107,20 @@ class InMemoryCache:
         try:
             with self._lock:
                 if key not in self._cache:
+                    self.misses += 1
                     return None
                 
                 entry = self._cache[key]
                 
                 # Check if expired
                 if entry.get('expires_at') and datetime.utcnow() > entry['expires_at']:
-                    del self._cache[key]
+                    self._remove(key)
+                    self.expirations += 1
+                    self.misses += 1
                     return None
                 
+                self._cache.move_to_end(key)
+                self.hits += 1
                 return entry['value']
         except Exception:
             return None
@@ -75,7 +130,7 @@ class InMemoryCache:
         try:
             with self._lock:
                 if key in self._cache:
-                    del self._cache[key]
+                    self._remove(key)
                     return True
                 return False
         except Exception:
@@ -130,6 +185,7 @@ class InMemoryCache:
         try:
             with self._lock:
                 self._cache.clear()
+                self._total_bytes = 0
                 return True
         except Exception:
             return False
@@ -148,7 +204,13 @@ class InMemoryCache:
                     'total_keys': total_keys,
                     'expired_keys': expired_keys,
                     'active_keys': total_keys - expired_keys,
-                    'memory_usage': 'N/A'  # Not tracking memory usage for simplicity
+                    'memory_usage': self._total_bytes,
+                    'max_entries': self.max_entries,
+                    'max_bytes': self.max_bytes,
+                    'hits': self.hits,
+                    'misses': self.misses,
+                    'evictions': self.evictions,
+                    'expirations': self.expirations
                 }
         except Exception:
             return {}
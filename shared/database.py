@@ -3,7 +3,7 @@ import asyncio
 from typing import AsyncGenerator, Optional
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
 from sqlalchemy.orm import declarative_base
-from sqlalchemy import MetaData, text
+from sqlalchemy import MetaData, text, inspect
 from contextlib import asynccontextmanager
 from pathlib import Path
 
@@ -69,11 +69,34 @@ async def init_db():
         try:
             # Create all tables using SQLAlchemy models
             await conn.run_sync(Base.metadata.create_all)
+            await conn.run_sync(sync_schema)
             print("✅ Database initialized successfully using SQLAlchemy models")
         except Exception as e:
             print(f"❌ Error initializing database: {e}")
             raise
 
+def sync_schema(sync_conn):
+    """Add columns and indexes introduced after a table was first created
+    
+    create_all only creates missing tables. New columns are added as nullable
+    (SQLite can't add columns with non-constant defaults); Python-side
+    defaults still apply to new rows.
+    """
+    inspector = inspect(sync_conn)
+    for table in Base.metadata.sorted_tables:
+        existing_columns = {column["name"] for column in inspector.get_columns(table.name)}
+        for column in table.columns:
+            if column.name not in existing_columns:
+                column_type = column.type.compile(dialect=sync_conn.dialect)
+                sync_conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+                print(f"    ➕ Added column {table.name}.{column.name}")
+        
+        existing_indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing_indexes:
+                index.create(sync_conn)
+                print(f"    ➕ Created index {index.name}")
+
 async def close_db():
     """Close database connections"""
     await engine.dispose()
@@ -105,6 +128,48 @@ class DatabaseUtils:
         async with engine.begin() as conn:
             result = await conn.execute(text(f"PRAGMA table_info({table_name})"))
             return result.fetchall()
+    
+    @staticmethod
+    async def get_page_stats() -> dict:
+        """Get SQLite page statistics (file size and free pages)"""
+        async with engine.connect() as conn:
+            page_size = (await conn.execute(text("PRAGMA page_size"))).scalar()
+            page_count = (await conn.execute(text("PRAGMA page_count"))).scalar()
+            freelist_count = (await conn.execute(text("PRAGMA freelist_count"))).scalar()
+        return {
+            "page_size": page_size,
+            "page_count": page_count,
+            "freelist_count": freelist_count,
+            "file_size_bytes": page_size * page_count,
+            "free_bytes": page_size * freelist_count
+        }
+    
+    @staticmethod
+    async def enable_incremental_vacuum() -> bool:
+        """Switch the database to incremental auto-vacuum
+        
+        Changing the mode on an existing database needs a one-time full VACUUM.
+        """
+        async with engine.connect() as conn:
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            mode = (await conn.execute(text("PRAGMA auto_vacuum"))).scalar()
+            if mode == 2:  # INCREMENTAL
+                return True
+            await conn.execute(text("PRAGMA auto_vacuum = INCREMENTAL"))
+            await conn.execute(text("VACUUM"))
+            mode = (await conn.execute(text("PRAGMA auto_vacuum"))).scalar()
+            return mode == 2
+    
+    @staticmethod
+    async def incremental_vacuum(pages: int = 0):
+        """Return free pages to the filesystem (all free pages when pages is 0)"""
+        pragma = f"PRAGMA incremental_vacuum({pages})" if pages else "PRAGMA incremental_vacuum"
+        async with engine.connect() as conn:
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            # A plain execute() steps the pragma once (one page); executescript
+            # runs it to completion
+            raw = await conn.get_raw_connection()
+            await raw.driver_connection.executescript(f"{pragma};")
 
 # Health check
 async def check_db_health() -> bool:
@@ -1,6 +1,6 @@
 import uuid
 from datetime import datetime
-from sqlalchemy import Column, String, Integer, Boolean, DateTime, Text, ForeignKey, Float, func
+from sqlalchemy import Column, String, Integer, Boolean, DateTime, Text, ForeignKey, Float, LargeBinary, Index, func
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 
@@ -22,13 +22,35 @@ class CacheEntry(Base):
     __tablename__ = "cache_entries"
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
     cache_key = Column(String(500), unique=True, nullable=False)
-    cache_data = Column(Text, nullable=False)  # JSON data
+    cache_data = Column(LargeBinary, nullable=False)  # Versioned, compressed payload (shared/serialization.py)
     cache_type = Column(String(50), nullable=False)  # 'search', 'metadata', 'item'
     expires_at = Column(DateTime, nullable=False)
     created_at = Column(DateTime, server_default=func.now())
     last_accessed = Column(DateTime, server_default=func.now(), onupdate=func.now())
     access_count = Column(Integer, default=0)
 
+class ArchiveItemRecord(Base):
+    __tablename__ = "archive_items"
+    identifier = Column(String(255), primary_key=True)  # Internet Archive identifier
+    item_data = Column(LargeBinary, nullable=False)  # Versioned, compressed ArchiveItem dump
+    detail = Column(String(20), nullable=False, default='search')  # 'search' or 'metadata'
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+
+class ArchiveSearchDocument(Base):
+    __tablename__ = "archive_search_documents"
+    # Integer key doubles as the rowid of the archive_search_fts FTS5 table
+    # (backend/browse_service/search_index.py) and is stable across VACUUM
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    identifier = Column(String(255), unique=True, nullable=False)
+    artist = Column(String(255))
+    venue = Column(String(255))
+    date = Column(String(10))  # YYYY-MM-DD
+    downloads = Column(Integer, default=0)
+    indexed_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
+    __table_args__ = (
+        Index("ix_archive_search_documents_date", "date"),
+    )
+
 class Download(Base):
     __tablename__ = "downloads"
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
@@ -41,11 +63,30 @@ class Download(Base):
     file_path = Column(String(500))
     file_size = Column(Integer)
     download_url = Column(Text)
+    bytes_downloaded = Column(Integer, default=0)  # Bytes of the file fetched so far (resume state is kept with the blob)
+    resume_validator = Column(String(255))  # ETag/Last-Modified of the partial body
+    priority = Column(Integer, default=0)  # Scheduling priority; higher starts sooner
+    blob_key = Column(String(64))  # Content address of the stored file shared by every user's copy
+    segment_state = Column(Text)  # JSON [[start, end, done], ...] while fetched as concurrent ranges (for display)
     started_at = Column(DateTime)
     download_completed_at = Column(DateTime)
     error_message = Column(Text)
     created_at = Column(DateTime, server_default=func.now())
 
+class DownloadJob(Base):
+    __tablename__ = "download_jobs"
+    id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
+    user_id = Column(String, ForeignKey('users.id'), nullable=False)
+    archive_identifier = Column(String(255), nullable=False)
+    format = Column(String(50))  # Audio format the job's files were picked in
+    created_at = Column(DateTime, server_default=func.now())
+
+class DownloadJobFile(Base):
+    # A download can belong to several jobs (the same file requested again)
+    __tablename__ = "download_job_files"
+    job_id = Column(String, ForeignKey('download_jobs.id'), primary_key=True)
+    download_id = Column(String, ForeignKey('downloads.id'), primary_key=True)
+
 class UserSession(Base):
     __tablename__ = "user_sessions"
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
@@ -57,7 +98,7 @@ class UserSession(Base):
 class AggregatedConcert(Base):
     __tablename__ = "aggregated_concerts"
     id = Column(String, primary_key=True, default=lambda: str(uuid.uuid4()))
-    concert_key = Column(String(500), unique=True, nullable=False)  # artist|date|venue
+    concert_key = Column(String(500), unique=True, nullable=False)  # artist|date
     artist = Column(String(255), nullable=False)
     date = Column(DateTime, nullable=False)
     venue = Column(String(255))
@@ -70,8 +111,16 @@ class AggregatedConcert(Base):
     total_recordings = Column(Integer, default=0)
     total_tracks = Column(Integer, default=0)
     total_size = Column(Integer, default=0)
+    total_downloads = Column(Integer, default=0)
     indexed_at = Column(DateTime, server_default=func.now())
     last_updated = Column(DateTime, server_default=func.now(), onupdate=func.now())
+    # Sort/filter indexes for /concerts (backend/aggregation_service/catalog.py);
+    # the trailing id makes each usable for keyset pagination
+    __table_args__ = (
+        Index("ix_aggregated_concerts_artist_date", "artist", "date", "id"),
+        Index("ix_aggregated_concerts_date", "date", "id"),
+        Index("ix_aggregated_concerts_venue", "venue", "date", "id"),
+    )
 
 class ConcertRecording(Base):
     __tablename__ = "concert_recordings"
@@ -83,10 +132,33 @@ class ConcertRecording(Base):
     source = Column(String(255))
     taper = Column(String(255))
     lineage = Column(String(255))
+    venue = Column(String(255))
+    location = Column(String(255))
     total_tracks = Column(Integer, default=0)
     total_size = Column(Integer, default=0)
+    downloads = Column(Integer, default=0)
     tracks = Column(Text)  # JSON array of track info
+    added_at = Column(DateTime)  # Internet Archive addeddate
     created_at = Column(DateTime, server_default=func.now())
+    __table_args__ = (
+        Index("ux_concert_recordings_archive_identifier", "archive_identifier", unique=True),
+        Index("ix_concert_recordings_concert_id", "concert_id"),
+    )
+
+class IngestCheckpoint(Base):
+    __tablename__ = "ingest_checkpoints"
+    name = Column(String(100), primary_key=True)  # e.g. 'etree'
+    status = Column(String(20), default='idle')  # 'idle', 'running', 'completed', 'failed'
+    cursor = Column(Text)  # Scrape API cursor of the next page (NULL when no run is in progress)
+    since = Column(DateTime)  # addeddate lower bound of the current run (NULL = full catalog)
+    run_high_water = Column(DateTime)  # Newest addeddate seen by the current run
+    high_water = Column(DateTime)  # Newest addeddate of the last completed run
+    run_items = Column(Integer, default=0)
+    total_items = Column(Integer, default=0)
+    last_error = Column(Text)
+    started_at = Column(DateTime)
+    completed_at = Column(DateTime)
+    updated_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
 
 # Define relationships
 User.sessions = relationship("UserSession", back_populates="user")
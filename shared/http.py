@@ -0,0 +1,136 @@
+import os
+import logging
+from typing import Dict, Any
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# HTTP/2 needs the optional `h2` package (installed via httpx[http2])
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Upstream targets
+ARCHIVE = "archive"                    # archive.org search and metadata API
+ARCHIVE_DOWNLOAD = "archive_download"  # archive.org file downloads (long reads)
+ARCHIVE_SEGMENT = "archive_segment"    # archive.org byte-range segments (one connection each)
+BROWSE = "browse"
+DOWNLOAD = "download"
+AGGREGATION = "aggregation"
+
+# Connection pool configuration (shared by every target)
+HTTP_MAX_CONNECTIONS = int(os.getenv("HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("HTTP_MAX_KEEPALIVE_CONNECTIONS", "20"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "60"))
+
+# Per-upstream settings: timeouts in seconds
+UPSTREAM_CONFIG: Dict[str, Dict[str, Any]] = {
+    ARCHIVE: {
+        "connect_timeout": float(os.getenv("IA_CONNECT_TIMEOUT", "10")),
+        "timeout": float(os.getenv("IA_TIMEOUT", "30")),
+        "http2": True,
+        "follow_redirects": True,
+    },
+    ARCHIVE_DOWNLOAD: {
+        "connect_timeout": float(os.getenv("IA_CONNECT_TIMEOUT", "10")),
+        "timeout": float(os.getenv("IA_DOWNLOAD_TIMEOUT", "60")),
+        "http2": True,
+        "follow_redirects": True,
+    },
+    # HTTP/1.1 on purpose: segments multiplexed over one HTTP/2 connection
+    # would share that connection's throughput
+    ARCHIVE_SEGMENT: {
+        "connect_timeout": float(os.getenv("IA_CONNECT_TIMEOUT", "10")),
+        "timeout": float(os.getenv("IA_DOWNLOAD_TIMEOUT", "60")),
+        "http2": False,
+        "follow_redirects": True,
+    },
+    BROWSE: {
+        "connect_timeout": 5.0,
+        "timeout": float(os.getenv("BROWSE_SERVICE_TIMEOUT", "30")),
+        "http2": False,
+        "follow_redirects": False,
+    },
+    DOWNLOAD: {
+        "connect_timeout": 5.0,
+        "timeout": float(os.getenv("DOWNLOAD_SERVICE_TIMEOUT", "30")),
+        "http2": False,
+        "follow_redirects": False,
+    },
+    AGGREGATION: {
+        "connect_timeout": 5.0,
+        "timeout": float(os.getenv("AGGREGATION_SERVICE_TIMEOUT", "30")),
+        "http2": False,
+        "follow_redirects": False,
+    },
+}
+
+class HTTPClientPool:
+    """Long-lived httpx clients, one per upstream target, reused across requests"""
+
+    def __init__(self):
+        self._clients: Dict[str, httpx.AsyncClient] = {}
+
+    def _create_client(self, target: str) -> httpx.AsyncClient:
+        """Create a pooled client configured for the given target"""
+        config = UPSTREAM_CONFIG[target]
+        http2 = config["http2"] and HTTP2_AVAILABLE
+        if config["http2"] and not HTTP2_AVAILABLE:
+            logger.warning(f"h2 not installed, using HTTP/1.1 keep-alive for {target}")
+
+        return httpx.AsyncClient(
+            http2=http2,
+            follow_redirects=config["follow_redirects"],
+            timeout=httpx.Timeout(config["timeout"], connect=config["connect_timeout"]),
+            limits=httpx.Limits(
+                max_connections=HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+            ),
+        )
+
+    def start(self, *targets: str):
+        """Create clients for the given targets (idempotent)"""
+        for target in targets:
+            if target not in UPSTREAM_CONFIG:
+                raise ValueError(f"Unknown upstream target: {target}")
+            if target not in self._clients:
+                self._clients[target] = self._create_client(target)
+                logger.info(f"Opened pooled HTTP client for {target}")
+
+    def get(self, target: str) -> httpx.AsyncClient:
+        """Get the pooled client for a target, creating it lazily if needed"""
+        client = self._clients.get(target)
+        if client is None or client.is_closed:
+            self._clients.pop(target, None)
+            self.start(target)
+            client = self._clients[target]
+        return client
+
+    async def close(self):
+        """Close all pooled clients"""
+        for target, client in list(self._clients.items()):
+            try:
+                await client.aclose()
+                logger.info(f"Closed pooled HTTP client for {target}")
+            except Exception as e:
+                logger.error(f"Error closing HTTP client for {target}: {e}")
+        self._clients.clear()
+
+# Global client pool instance
+http_clients = HTTPClientPool()
+
+# Utility functions
+def start_http_clients(*targets: str):
+    """Open pooled clients for the given targets (call from service lifespan)"""
+    http_clients.start(*targets)
+
+async def close_http_clients():
+    """Close all pooled clients (call from service lifespan)"""
+    await http_clients.close()
+
+def get_http_client(target: str) -> httpx.AsyncClient:
+    """Get the shared client for an upstream target"""
+    return http_clients.get(target)
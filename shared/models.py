@@ -10,6 +10,7 @@ class DownloadStatus(str, Enum):
     DOWNLOADING = "downloading"
     COMPLETED = "completed"
     FAILED = "failed"
+    CANCELLED = "cancelled"
 
 class StorageProvider(str, Enum):
     LOCAL = "local"
@@ -131,6 +132,7 @@ class DownloadCreate(BaseModel):
     archive_identifier: str
     filename: str
     track_title: Optional[str] = None
+    priority: int = Field(default=0, ge=0, le=100)  # Higher starts sooner; 10 = "play next"
 
 class DownloadResponse(BaseModel):
     id: UUID
@@ -147,12 +149,31 @@ class DownloadResponse(BaseModel):
     download_completed_at: Optional[datetime] = None
     error_message: Optional[str] = None
     created_at: datetime
+    bytes_per_second: Optional[float] = None  # Live transfer rate while downloading
+    eta_seconds: Optional[float] = None
 
 class DownloadProgress(BaseModel):
     download_id: UUID
     progress: float = Field(ge=0.0, le=100.0)
     status: DownloadStatus
     message: Optional[str] = None
+    bytes_per_second: Optional[float] = None
+    eta_seconds: Optional[float] = None
+
+class DownloadJobResponse(BaseModel):
+    job_id: str
+    archive_identifier: str
+    format: Optional[str] = None
+    status: DownloadStatus  # completed once every file is; failed if any file stopped and none are active
+    progress: float = Field(default=0.0, ge=0.0, le=100.0)
+    total_files: int
+    completed_files: int
+    failed_files: int
+    total_size: int
+    bytes_downloaded: int
+    bytes_per_second: Optional[float] = None
+    eta_seconds: Optional[float] = None
+    download_ids: List[str]
 
 # WebSocket Models
 class WebSocketMessage(BaseModel):
@@ -0,0 +1,66 @@
+import json
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Iterable, Optional, Union
+
+import httpx
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from starlette.background import BackgroundTask
+
+# Streaming list format (Accept: application/x-ndjson): the first line is the
+# page header (total, page, per_page, total_pages, ...) and every following
+# line is one result, written as soon as it is ready.
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+def wants_ndjson(accept: Optional[str]) -> bool:
+    """Whether an Accept header asks for the streaming format"""
+    return bool(accept) and NDJSON_MEDIA_TYPE in accept
+
+def _default(value: Any):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def ndjson_line(record: Union[Dict[str, Any], BaseModel]) -> bytes:
+    """One record as an NDJSON line"""
+    if isinstance(record, BaseModel):
+        return record.model_dump_json().encode() + b"\n"
+    return json.dumps(record, default=_default, separators=(",", ":")).encode() + b"\n"
+
+async def ndjson_lines(header: Dict[str, Any], records: Union[Iterable, AsyncIterator]) -> AsyncIterator[bytes]:
+    """Header line followed by one line per record"""
+    yield ndjson_line(header)
+    if hasattr(records, "__aiter__"):
+        async for record in records:
+            yield ndjson_line(record)
+    else:
+        for record in records:
+            yield ndjson_line(record)
+
+def ndjson_response(header: Dict[str, Any], records: Union[Iterable, AsyncIterator]) -> StreamingResponse:
+    """Stream a page as NDJSON"""
+    return StreamingResponse(ndjson_lines(header, records), media_type=NDJSON_MEDIA_TYPE)
+
+async def iter_ndjson(response: httpx.Response) -> AsyncIterator[Dict[str, Any]]:
+    """Decode a streamed NDJSON response line by line"""
+    async for line in response.aiter_lines():
+        if line:
+            yield json.loads(line)
+
+def proxy_stream(response: httpx.Response) -> StreamingResponse:
+    """Relay an open upstream stream unchanged; the upstream response is closed when done"""
+    return StreamingResponse(
+        response.aiter_bytes(),
+        status_code=response.status_code,
+        media_type=response.headers.get("content-type"),
+        background=BackgroundTask(response.aclose)
+    )
+
+async def open_ndjson_stream(client: httpx.AsyncClient, url: str, params: Dict[str, Any]) -> httpx.Response:
+    """Start a streaming NDJSON request; error responses are read and raised"""
+    request = client.build_request("GET", url, params=params, headers={"Accept": NDJSON_MEDIA_TYPE})
+    response = await client.send(request, stream=True)
+    if response.is_error:
+        await response.aread()
+        response.raise_for_status()
+    return response
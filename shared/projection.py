@@ -0,0 +1,125 @@
+from typing import Any, Dict, List, Optional, Tuple
+
+from shared.models import ArchiveItem
+
+# Field projection for list endpoints. view=compact returns the fields list
+# screens render; fields=a,b,c picks exactly those (plus the id). A projection
+# of None means every field.
+
+VIEWS = ("compact", "full")
+
+ITEM_FIELDS = tuple(ArchiveItem.model_fields)
+COMPACT_ITEM_FIELDS = (
+    "identifier", "title", "artist", "date", "venue", "location",
+    "total_tracks", "total_size", "downloads"
+)
+
+# advancedsearch fields (fl[]) each ArchiveItem field is derived from. Venue and
+# location are parsed from the title, falling back to the venue/coverage
+# fields (and the description, when it is fetched). Search results carry no
+# file listing, so track fields have no source.
+ITEM_SOURCE_FIELDS = {
+    "identifier": ("identifier",),
+    "title": ("title",),
+    "artist": ("creator",),
+    "date": ("date",),
+    "venue": ("title", "venue"),
+    "location": ("title", "coverage"),
+    "description": ("description",),
+    "source": ("source",),
+    "taper": ("taper",),
+    "lineage": ("lineage",),
+    "total_tracks": (),
+    "total_size": (),
+    "tracks": (),
+    "downloads": ("downloads",),
+}
+
+CONCERT_FIELDS = (
+    "id", "concert_key", "artist", "date", "venue", "location", "title", "description",
+    "source", "taper", "lineage", "total_recordings", "total_tracks", "total_size",
+    "total_downloads", "indexed_at", "last_updated", "recordings"
+)
+COMPACT_CONCERT_FIELDS = (
+    "id", "concert_key", "artist", "date", "venue", "location", "title",
+    "total_recordings", "total_tracks", "total_size", "total_downloads", "recordings"
+)
+RECORDING_FIELDS = (
+    "id", "archive_identifier", "title", "description", "source", "taper", "lineage",
+    "total_tracks", "total_size", "tracks", "downloads", "created_at"
+)
+COMPACT_RECORDING_FIELDS = ("id", "archive_identifier", "title", "total_tracks", "total_size", "downloads")
+
+def resolve_fields(
+    view: Optional[str],
+    fields: Optional[str],
+    all_fields: Tuple[str, ...],
+    compact_fields: Tuple[str, ...],
+    required: Tuple[str, ...]
+) -> Optional[Tuple[str, ...]]:
+    """Fields to return for a view/fields request (None means all); raises ValueError on unknown names"""
+    if fields:
+        requested = {name.strip() for name in fields.split(",") if name.strip()}
+        unknown = sorted(requested - set(all_fields))
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+        selected = requested | set(required)
+    elif view == "compact":
+        selected = set(compact_fields)
+    elif view in (None, "full"):
+        return None
+    else:
+        raise ValueError(f"Unknown view: {view}")
+
+    if selected >= set(all_fields):
+        return None
+    return tuple(name for name in all_fields if name in selected)
+
+def item_projection(view: Optional[str], fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """Projection for ArchiveItem lists"""
+    return resolve_fields(view, fields, ITEM_FIELDS, COMPACT_ITEM_FIELDS, ("identifier",))
+
+def concert_projection(view: Optional[str], fields: Optional[str]) -> Tuple[Optional[Tuple[str, ...]], Optional[Tuple[str, ...]]]:
+    """(concert fields, recording fields) for concert lists; compact views also slim recordings"""
+    concert_fields = resolve_fields(view, fields, CONCERT_FIELDS, COMPACT_CONCERT_FIELDS, ("id",))
+    recording_fields = COMPACT_RECORDING_FIELDS if view == "compact" else None
+    return concert_fields, recording_fields
+
+def fetch_level(projection: Optional[Tuple[str, ...]]) -> str:
+    """Which upstream field set ('compact' or 'full') a projection needs
+
+    Items fetched for any projection are stored and indexed, so at least the
+    compact set is always fetched.
+    """
+    if projection is not None and set(projection) <= set(COMPACT_ITEM_FIELDS):
+        return "compact"
+    return "full"
+
+def upstream_fields(level: str) -> List[str]:
+    """advancedsearch fl[] list for a fetch level"""
+    item_fields = COMPACT_ITEM_FIELDS if level == "compact" else ITEM_FIELDS
+    source_fields = []
+    for name in item_fields:
+        for source in ITEM_SOURCE_FIELDS[name]:
+            if source not in source_fields:
+                source_fields.append(source)
+    return source_fields
+
+def project(record: Dict[str, Any], fields: Optional[Tuple[str, ...]]) -> Dict[str, Any]:
+    """Keep only the projected keys of a record"""
+    if fields is None:
+        return record
+    return {name: record.get(name) for name in fields}
+
+def project_concert(
+    concert: Dict[str, Any],
+    fields: Optional[Tuple[str, ...]],
+    recording_fields: Optional[Tuple[str, ...]]
+) -> Dict[str, Any]:
+    """Project a concert dict and its recordings"""
+    projected = project(concert, fields)
+    if recording_fields is not None and projected.get("recordings"):
+        if projected is concert:
+            projected = dict(concert)  # Cached concerts are shared; don't modify them
+        projected["recordings"] = [project(recording, recording_fields) for recording in projected["recordings"]]
+    return projected
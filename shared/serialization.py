@@ -0,0 +1,113 @@
+import os
+import json
+import zlib
+import logging
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Optional fast/compact codecs
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+class PayloadSerializer:
+    """Base class for cache payload encodings
+
+    Encoded payloads start with a one-byte format version so stored rows can be
+    decoded after the default serializer changes.
+    """
+    name = "base"
+    version = 0
+
+    def dumps(self, obj: Any) -> bytes:
+        raise NotImplementedError
+
+    def loads(self, data: bytes) -> Any:
+        raise NotImplementedError
+
+class JSONZlibSerializer(PayloadSerializer):
+    """JSON (orjson when installed) compressed with zlib"""
+    name = "json-zlib"
+    version = 1
+
+    def __init__(self, level: int = 3):
+        self.level = level
+
+    def dumps(self, obj: Any) -> bytes:
+        if orjson:
+            raw = orjson.dumps(obj)
+        else:
+            raw = json.dumps(obj, separators=(",", ":")).encode("utf-8")
+        return zlib.compress(raw, self.level)
+
+    def loads(self, data: bytes) -> Any:
+        raw = zlib.decompress(data)
+        return orjson.loads(raw) if orjson else json.loads(raw)
+
+class MsgpackZstdSerializer(PayloadSerializer):
+    """msgpack compressed with zstd (requires msgpack and zstandard)"""
+    name = "msgpack-zstd"
+    version = 2
+
+    def __init__(self, level: int = 3):
+        self.level = level
+        self._compressor = zstandard.ZstdCompressor(level=level)
+        self._decompressor = zstandard.ZstdDecompressor()
+
+    def dumps(self, obj: Any) -> bytes:
+        return self._compressor.compress(msgpack.packb(obj, use_bin_type=True))
+
+    def loads(self, data: bytes) -> Any:
+        return msgpack.unpackb(self._decompressor.decompress(data), raw=False)
+
+def _available_serializers() -> Dict[str, PayloadSerializer]:
+    serializers = {JSONZlibSerializer.name: JSONZlibSerializer()}
+    if msgpack and zstandard:
+        serializers[MsgpackZstdSerializer.name] = MsgpackZstdSerializer()
+    return serializers
+
+SERIALIZERS = _available_serializers()
+SERIALIZERS_BY_VERSION = {s.version: s for s in SERIALIZERS.values()}
+
+# Prefer msgpack+zstd (fastest encode, smallest rows; see benchmarks/bench_cache_serialization.py)
+DEFAULT_SERIALIZER = MsgpackZstdSerializer.name if MsgpackZstdSerializer.name in SERIALIZERS else JSONZlibSerializer.name
+CACHE_SERIALIZER = os.getenv("CACHE_SERIALIZER", DEFAULT_SERIALIZER)
+if CACHE_SERIALIZER not in SERIALIZERS:
+    logger.warning(f"Cache serializer {CACHE_SERIALIZER} unavailable, using {JSONZlibSerializer.name}")
+    CACHE_SERIALIZER = JSONZlibSerializer.name
+
+def get_serializer(name: Optional[str] = None) -> PayloadSerializer:
+    """Get a serializer by name (defaults to CACHE_SERIALIZER)"""
+    return SERIALIZERS[name or CACHE_SERIALIZER]
+
+def encode_payload(obj: Any, serializer: Optional[PayloadSerializer] = None) -> bytes:
+    """Encode an object as version byte + serialized body"""
+    serializer = serializer or get_serializer()
+    return bytes([serializer.version]) + serializer.dumps(obj)
+
+def decode_payload(data: Any) -> Any:
+    """Decode a stored payload
+
+    Rows written before versioned payloads hold plain JSON text, which never
+    starts with a registered version byte.
+    """
+    if isinstance(data, str):
+        return json.loads(data)
+
+    data = bytes(data)
+    serializer = SERIALIZERS_BY_VERSION.get(data[0]) if data else None
+    if serializer is None:
+        return json.loads(data)
+    return serializer.loads(data[1:])
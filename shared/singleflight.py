@@ -0,0 +1,55 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+class SingleFlight:
+    """Coalesce concurrent calls that share a key into one in-flight execution"""
+
+    def __init__(self, name: str = "singleflight"):
+        self.name = name
+        self._calls: Dict[str, asyncio.Task] = {}
+        self.executions = 0
+        self.coalesced = 0
+
+    async def do(self, key: str, func: Callable[[], Awaitable[Any]]) -> Any:
+        """Run func for key, or wait for the call already in flight for key.
+
+        The shared call runs as its own task, so a caller that disconnects
+        does not cancel the fetch for everyone else waiting on it.
+        """
+        task = self._calls.get(key)
+        if task is not None:
+            self.coalesced += 1
+            logger.info(f"{self.name}: joined in-flight call for key {key}")
+        else:
+            self.executions += 1
+            task = asyncio.ensure_future(func())
+            self._calls[key] = task
+            task.add_done_callback(lambda t: self._finish(key, t))
+
+        return await asyncio.shield(task)
+
+    def _finish(self, key: str, task: asyncio.Task):
+        """Forget a finished call and mark its exception as retrieved"""
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        if not task.cancelled():
+            task.exception()
+
+    def is_in_flight(self, key: str) -> bool:
+        """Check whether a call for key is currently executing"""
+        return key in self._calls
+
+    def in_flight(self) -> int:
+        """Number of calls currently executing"""
+        return len(self._calls)
+
+    def stats(self) -> Dict[str, int]:
+        """Get coalescing statistics"""
+        return {
+            "in_flight": self.in_flight(),
+            "executions": self.executions,
+            "coalesced": self.coalesced,
+        }
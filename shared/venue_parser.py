@@ -0,0 +1,84 @@
+import os
+import re
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+# Internet Archive has no dedicated venue/location fields on search results, so
+# they're parsed from the title ("Artist Live at VENUE, LOCATION on DATE"),
+# falling back to venue keywords in the first lines of the description.
+
+TITLE_VENUE_PATTERN = re.compile(r"(?:Live\s+)?at\s+(.+?)(?:\s+on\s+\d{4}-\d{2}-\d{2}|\s*$)", re.IGNORECASE)
+DESCRIPTION_VENUE_PATTERN = re.compile(
+    r"([A-Z][a-z\s]+(?:Amphitheater|Theater|Arena|Stadium|Center|Hall|Club|Bar|Resort|Festival))"
+)
+TRAILING_DATE_PATTERN = re.compile(r"\s+on\s+\d{4}-\d{2}-\d{2}$")
+TRAILING_PLACE_PATTERN = re.compile(r"\s*-\s*[^-]+$")  # city/state suffix
+NON_VENUE_WORDS_PATTERN = re.compile(r"\b(?:Festival|Resort)\b")
+
+DESCRIPTION_LINES = 3  # Only the first lines of a description are searched
+VENUE_PARSER_CACHE_SIZE = int(os.getenv("VENUE_PARSER_CACHE_SIZE", "50000"))
+
+def _text(value: Any) -> str:
+    """IA fields can be repeated; join lists into one string"""
+    if value is None:
+        return ""
+    if isinstance(value, list):
+        return "\n".join(str(v) for v in value)
+    return str(value)
+
+def description_prefix(description: Any) -> str:
+    """The part of a description the parser looks at (its first lines)"""
+    return "\n".join(_text(description).split("\n", DESCRIPTION_LINES)[:DESCRIPTION_LINES])
+
+@lru_cache(maxsize=VENUE_PARSER_CACHE_SIZE)
+def _parse(title: str, prefix: str) -> Tuple[Optional[str], Optional[str]]:
+    venue = None
+    location = None
+
+    match = TITLE_VENUE_PATTERN.search(title)
+    if match:
+        venue_location_part = match.group(1).strip()
+
+        # Split by first comma to separate venue and location
+        if "," in venue_location_part:
+            venue, location = venue_location_part.split(",", 1)
+            venue = venue.strip()
+            location = location.strip()
+        else:
+            venue = venue_location_part
+
+    if not venue and prefix:
+        for line in prefix.split("\n"):
+            venue_match = DESCRIPTION_VENUE_PATTERN.search(line)
+            if venue_match:
+                venue = venue_match.group(1).strip()
+                break
+
+    if venue:
+        venue = TRAILING_DATE_PATTERN.sub("", venue)
+        venue = TRAILING_PLACE_PATTERN.sub("", venue).strip()
+        venue = NON_VENUE_WORDS_PATTERN.sub("", venue).strip()
+
+    return venue, location
+
+def parse_venue_location(title: Any, description: Any = None) -> Tuple[Optional[str], Optional[str]]:
+    """Extract (venue, location) from an item's title and description
+
+    Results are memoized on (title, description prefix), so items seen on
+    earlier pages cost a dict lookup.
+    """
+    return _parse(_text(title), description_prefix(description))
+
+def parse_venue_locations(docs: List[Dict[str, Any]]) -> List[Tuple[Optional[str], Optional[str]]]:
+    """Extract (venue, location) for a whole advancedsearch page of docs"""
+    parse = _parse
+    return [parse(_text(doc.get("title")), description_prefix(doc.get("description"))) for doc in docs]
+
+def venue_parser_stats() -> Dict[str, Any]:
+    """Memo hit/miss statistics"""
+    info = _parse.cache_info()
+    return {"hits": info.hits, "misses": info.misses, "size": info.currsize, "max_size": info.maxsize}
+
+def clear_venue_parser_cache():
+    """Forget memoized results"""
+    _parse.cache_clear()